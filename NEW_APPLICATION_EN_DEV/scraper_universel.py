@@ -7,9 +7,31 @@ is performed on a page from https://books.toscrape.com/.
 
 Architecture
 ------------
-- ``extract_fields`` : pure function containing the scraping logic.
+- ``extract_fields`` : pure function containing the scraping logic. The
+  page is parsed once by the selected backend (see below) and that tree
+  answers every CSS field; XPath and structured data fields use lxml.
+- Backends : ``selectolax`` (lexbor, optional dependency), ``lxml``
+  (``cssselect``, plain CSS fields matched together in a single walk of
+  the tree, see ``core.css_engine``) and ``bs4``, the BeautifulSoup
+  reference implementation. They return identical values; the fastest
+  available one is used unless ``backend=`` or
+  :func:`set_default_backend` says otherwise.
 - ``scrap_fiche_generique`` : wrapper allowing a mapping dict or mapping
   file.
+- ``extract_fields_many`` : batch version sharing a pooled session, with
+  bounded concurrency and a per-host limit. Results are streamed back as
+  records carrying either the fields or the error. Given a
+  ``core.templates.TemplateIndex`` instead of a mapping, each page is
+  routed to the mapping of its closest template (see
+  :func:`learn_template`).
+- ``suggest_blocks_many`` : ranks the description candidates of pages
+  (``core.blocks``) to propose a mapping for a new site, in batch.
+- ``generalize_selector`` : turns a selector picked on one page into the
+  simplest one finding the same block on sample pages of the site
+  (``core.generalize``).
+- ``aextract_fields`` / ``aextract_fields_many`` : asyncio versions built
+  on ``aiohttp`` (optional dependency); parsing runs in an executor so the
+  event loop is never blocked.
 - ``main`` : command line interface. If called without parameters, the
   demo run is triggered. Otherwise ``--url`` and a mapping definition
   are expected.
@@ -19,9 +41,27 @@ CLI usage
 
 ``python -m NEW_APPLICATION_EN_DEV.scraper_universel --url URL --mapping-file map.json``
 
+With ``--urls-file urls.txt`` instead of ``--url`` every URL of the file
+is scraped in one process and one JSON record is printed per line
+(NDJSON), see :func:`extract_fields_many`.
+
 Known limitations
 -----------------
-- Optional dependency ``lxml`` is required for XPath extraction.
+- The ``clean`` option of a mapping value drops boilerplate lines. It is
+  ``true`` for the default rules, the name of a rule set registered with
+  ``core.text_cleaning.register_rule_set`` (or ``--cleaning-rules``) or an
+  inline rule set such as ``{"extra_keywords": ["garantie"]}``.
+- A mapping value may read the structured data of the page instead of
+  the DOM: ``{"jsonld": "offers.price"}``, ``{"microdata": "name"}`` or
+  ``{"og": "title"}``. With an additional ``selector`` key, the CSS
+  selector is used as fallback when the structured value is missing.
+- Optional dependency ``lxml`` is required for XPath extraction. Without
+  it (or without ``cssselect``) and without ``selectolax`` CSS fields fall
+  back to BeautifulSoup. Selectors a backend cannot parse (soupsieve
+  extensions such as ``:-soup-contains``) fall back to the next one.
+- selectolax builds the tree like an HTML5 browser while lxml and the
+  BeautifulSoup reference use libxml2, so badly nested markup (tables,
+  ``<p>`` inside ``<p>``) may give different trees.
 - Only the first matching element was previously returned (now lists are
   supported).
 """
@@ -44,24 +84,128 @@ Known limitations
 from __future__ import annotations
 
 import argparse
+import asyncio
+import codecs
 import json
 import logging
+import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional, Union
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Union,
+)
+from urllib.parse import urlsplit
 
 import requests
 from bs4 import BeautifulSoup
 
 try:
-    from lxml import html  # type: ignore
+    from lxml import etree, html  # type: ignore
     from lxml.html import HtmlElement  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
+    etree = None
     html = None
     HtmlElement = Any  # type: ignore
 
+try:
+    from lxml.cssselect import CSSSelector  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    CSSSelector = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    LexborHTMLParser = None
+
+try:
+    import aiohttp  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+from core.blocks import MIN_WORDS, rank_blocks
+from core.css_engine import MultiSelector
+from core.generalize import (
+    candidate_selectors,
+    element_signature,
+    page_coverage,
+    select_all,
+)
+from core.structured_data import extract_structured_data, lookup
+from core.templates import TemplateIndex, page_fingerprint
+from core.text_cleaning import get_cleaner, load_rule_sets
+
 logger = logging.getLogger(__name__)
 
+# Mapping keys reading the structured data of the page instead of the DOM.
+_STRUCTURED_KEYS = ("jsonld", "microdata", "og")
+
+# Parser backends, fastest first. ``bs4`` is the reference implementation.
+BACKENDS = ("selectolax", "lxml", "bs4")
+_default_backend: Optional[str] = None
+
+# Serialisation rules of BeautifulSoup's ``decode_contents`` (minimal
+# formatter), reproduced by the other backends for ``raw_html`` fields.
+_VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen",
+    "link", "menuitem", "meta", "param", "source", "track", "wbr",
+    "basefont", "bgsound", "command", "frame", "image", "isindex",
+    "nextid", "spacer",
+})
+_LIST_ATTRIBUTES = {
+    "*": {"class", "accesskey", "dropzone"},
+    "a": {"rel", "rev"},
+    "link": {"rel", "rev"},
+    "td": {"headers"},
+    "th": {"headers"},
+    "form": {"accept-charset"},
+    "object": {"archive"},
+    "area": {"rel"},
+    "icon": {"sizes"},
+    "iframe": {"sandbox"},
+    "output": {"for"},
+}
+_RAW_TEXT_TAGS = {"script", "style"}
+
+# Smallest number of CSS fields matched in a single walk of the tree.
+_WALK_MIN_FIELDS = 3
+
+# Text inside these tags, at any depth, is ignored by
+# ``BeautifulSoup.get_text`` (ruby annotations included).
+_NON_TEXT_TAGS = {"script", "style", "template", "rt", "rp"}
+# Text nodes of an lxml element outside of the tags above.
+_VISIBLE_TEXT = etree.XPath(
+    ".//text()[not(%s)]"
+    % " or ".join(f"ancestor::{tag}" for tag in sorted(_NON_TEXT_TAGS))
+) if etree is not None else None
+
+_META_CHARSET_RE = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([\w.:-]+)""", re.I
+)
+_HEADER_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+_BOMS = (
+    (b"\xef\xbb\xbf", "utf-8"),
+    (b"\xff\xfe", "utf-16-le"),
+    (b"\xfe\xff", "utf-16-be"),
+)
+
 
 # ---------------------------------------------------------------------------
 # utility helpers
@@ -103,37 +247,429 @@ def _load_mapping(
         raise ValueError(f"Invalid JSON mapping: {exc}") from exc
 
 
-def clean_description(text: str) -> str:
-    lines = text.splitlines()
-    ignored_keywords = [
-        "livraison",
-        "retour",
-        "contact",
-        "paiement",
-        "bob crew",
-        "service client",
-    ]
-    return "\n".join(
-        line
-        for line in lines
-        if len(line.strip()) > 30
-        and not any(kw in line.lower() for kw in ignored_keywords)
-    )
+def clean_description(text: str, rules: Any = None) -> str:
+    """Drop boilerplate lines from *text*.
 
+    *rules* selects the rule set (default, registered name or dict), see
+    :mod:`core.text_cleaning`.
+    """
+
+    return get_cleaner(rules).clean(text)
+
+
+def _sniff_encoding(
+    content: bytes, content_type: Optional[str] = None, partial: bool = False
+) -> str:
+    """Return the charset of *content* without decoding the whole page.
+
+    The byte order mark wins, then the HTTP ``Content-Type`` charset, then
+    a ``<meta charset>`` declaration found in the first kilobytes. Pages
+    without any declaration are assumed to be UTF-8 and fall back to
+    windows-1252 when they are not valid UTF-8. *partial* tells that
+    *content* is only the beginning of the page, which may end in the
+    middle of a multi-byte character.
+    """
+
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding
+    if content_type:
+        match = _HEADER_CHARSET_RE.search(content_type)
+        if match:
+            return _normalise_encoding(match.group(1))
+    match = _META_CHARSET_RE.search(content[:4096])
+    if match:
+        return _normalise_encoding(match.group(1).decode("ascii", "ignore"))
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(
+            content, final=not partial
+        )
+    except UnicodeDecodeError:
+        return "cp1252"
+    return "utf-8"
+
+
+def _normalise_encoding(label: str) -> str:
+    """Return a Python codec name for the charset *label*."""
+
+    try:
+        name = codecs.lookup(label).name
+    except LookupError:
+        return "utf-8"
+    # Browsers decode pages labelled latin-1 as windows-1252.
+    return "cp1252" if name in {"latin-1", "iso8859-1", "ascii"} else name
 
-def _extract_with_css(
-    soup: BeautifulSoup, selector: Union[str, Dict[str, Any]]
-) -> Optional[Union[str, list[str]]]:
-    """Return the text of the first match or a list for multiple matches."""
 
-    options: Dict[str, Any] = {}
-    css = selector
+def available_backends() -> list[str]:
+    """Return the parser backends usable here, fastest first."""
+
+    usable = {
+        "selectolax": LexborHTMLParser is not None,
+        "lxml": html is not None and CSSSelector is not None,
+        "bs4": True,
+    }
+    return [name for name in BACKENDS if usable[name]]
+
+
+def set_default_backend(backend: Optional[str]) -> None:
+    """Select the backend used when a call does not pass ``backend``.
+
+    ``None`` restores the automatic choice: the fastest available backend,
+    or lxml for pages already parsed by lxml (streamed downloads).
+    """
+
+    global _default_backend
+    if backend is not None:
+        _check_backend(backend)
+    _default_backend = backend
+
+
+def _check_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend {backend!r}, expected one of {BACKENDS}"
+        )
+    if backend not in available_backends():
+        raise ValueError(f"Backend {backend!r} is not installed")
+
+
+def _resolve_backend(
+    backend: Optional[str], doc: "_PageDocument", mapping: Dict[str, Any]
+) -> str:
+    """Return the backend to use for *doc* given the caller's choice.
+
+    The automatic choice keeps lxml when *doc* already has an lxml tree or
+    when *mapping* needs one anyway (XPath or structured data fields).
+    """
+
+    if backend is None:
+        backend = _default_backend
+    if backend is not None:
+        _check_backend(backend)
+        return backend
+    backends = available_backends()
+    if "lxml" in backends and (
+        doc._tree_built
+        or any(
+            _structured_key(selector) is not None
+            or (isinstance(selector, str) and selector.lstrip()[:1] == "/")
+            for selector in mapping.values()
+        )
+    ):
+        return "lxml"
+    return backends[0]
+
+
+class _PageDocument:
+    """Page parsed once and shared by every field of a mapping.
+
+    Every tree is built on first access: the lxml tree answers CSS and
+    XPath fields, the selectolax (lexbor) tree CSS fields of the
+    ``selectolax`` backend and the BeautifulSoup tree the ``bs4`` backend
+    or selectors only soupsieve understands.
+    """
+
+    def __init__(
+        self,
+        content: bytes,
+        content_type: Optional[str] = None,
+        *,
+        encoding: Optional[str] = None,
+        tree: Optional[HtmlElement] = None,
+    ):
+        self.content = content
+        self.encoding = encoding or _sniff_encoding(content, content_type)
+        self._tree = tree
+        self._tree_built = tree is not None
+        self._soup: Optional[BeautifulSoup] = None
+        self._lexbor: Any = None
+        self._structured: Optional[Dict[str, Any]] = None
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    @property
+    def tree(self) -> Optional[HtmlElement]:
+        if not self._tree_built:
+            self._tree_built = True
+            if html is not None and self.content.strip():
+                try:
+                    try:
+                        parser = html.HTMLParser(encoding=self.encoding)
+                    except LookupError:
+                        # Python codec names such as ``euc_jp`` are unknown
+                        # to libxml2: parse the decoded text instead.
+                        self._tree = html.document_fromstring(self.text)
+                    else:
+                        self._tree = html.document_fromstring(
+                            self.content, parser=parser
+                        )
+                except (etree.ParserError, ValueError) as exc:
+                    logger.debug("lxml could not parse the page: %s", exc)
+        return self._tree
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        if self._soup is None:
+            bs_parser = "lxml" if html else "html.parser"
+            self._soup = BeautifulSoup(self.text, bs_parser)
+        return self._soup
+
+    @property
+    def lexbor(self) -> Any:
+        if self._lexbor is None:
+            self._lexbor = LexborHTMLParser(self.text)
+        return self._lexbor
+
+    @property
+    def structured(self) -> Dict[str, Any]:
+        """JSON-LD, microdata and OpenGraph blocks, parsed once."""
+        if self._structured is None:
+            tree = self.tree
+            self._structured = extract_structured_data(
+                tree if tree is not None else self.content
+            )
+        return self._structured
+
+
+def _split_css_selector(
+    selector: Union[str, Dict[str, Any]]
+) -> tuple[Optional[str], Dict[str, Any]]:
+    """Return the CSS expression and the options of a mapping value."""
+
     if isinstance(selector, dict):
         css = selector.get("selector")
         if not isinstance(css, str):
             logger.error("Invalid mapping: missing selector in %s", selector)
-            return None
-        options = selector
+            return None, {}
+        return css, selector
+    return selector, {}
+
+
+@lru_cache(maxsize=512)
+def _compile_css(css: str) -> Any:
+    """Return a compiled ``CSSSelector`` or ``None`` if cssselect fails."""
+
+    if CSSSelector is None:
+        return None
+    try:
+        return CSSSelector(css)
+    except Exception as exc:  # unsupported or malformed selector
+        logger.debug("cssselect cannot compile %s: %s", css, exc)
+        return None
+
+
+def _lxml_text(elem: HtmlElement) -> str:
+    """Return the text of *elem* like ``get_text("\\n", strip=True)``."""
+
+    parts = []
+    for node in _VISIBLE_TEXT(elem):
+        node = node.strip()
+        if node:
+            parts.append(node)
+    return "\n".join(parts)
+
+
+def _values_from_elements(
+    elems: list[HtmlElement], options: Dict[str, Any]
+) -> Optional[Union[str, list[str]]]:
+    """Return the value of a CSS field from its matched lxml elements."""
+
+    values: list[str] = []
+    for elem in elems:
+        target = elem
+        if options.get("first_paragraph"):
+            first = elem.xpath("descendant::p[1]")
+            if first:
+                target = first[0]
+        if target.tag == "img" and "src" in target.attrib:
+            values.append(target.attrib["src"].strip())
+            continue
+
+        if options.get("raw_html"):
+            text = _lxml_inner_html(target)
+        else:
+            text = _lxml_text(target)
+        if options.get("clean"):
+            text = clean_description(text, options["clean"])
+        if text:
+            values.append(text)
+
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def _escape_markup(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _start_tag(
+    tag: str, attrs: Iterable[tuple[str, Optional[str]]], empty: bool
+) -> str:
+    """Return the start tag of *tag* as BeautifulSoup serialises it."""
+
+    parts = [tag]
+    for name, value in sorted(attrs, key=lambda item: item[0]):
+        value = value or ""
+        if name in _LIST_ATTRIBUTES["*"] or name in _LIST_ATTRIBUTES.get(
+            tag, ()
+        ):
+            value = " ".join(value.split())
+        value = _escape_markup(value)
+        quote = '"'
+        if '"' in value:
+            if "'" in value:
+                value = value.replace('"', "&quot;")
+            else:
+                quote = "'"
+        parts.append(f"{name}={quote}{value}{quote}")
+    return "<" + " ".join(parts) + ("/>" if empty else ">")
+
+
+def _lxml_inner_html(elem: HtmlElement) -> str:
+    """Return the content of *elem* as BeautifulSoup's ``decode_contents``.
+
+    libxml2 stores minimized boolean attributes with their name as value,
+    so ``<input checked>`` is rendered ``checked="checked"`` instead of
+    ``checked=""``.
+    """
+
+    raw = elem.tag in _RAW_TEXT_TAGS
+    parts = []
+    if elem.text:
+        parts.append(elem.text if raw else _escape_markup(elem.text))
+    for child in elem:
+        if isinstance(child.tag, str):
+            empty = (
+                child.tag in _VOID_TAGS and not len(child) and not child.text
+            )
+            parts.append(_start_tag(child.tag, child.items(), empty))
+            if not empty:
+                parts.append(_lxml_inner_html(child))
+                parts.append(f"</{child.tag}>")
+        elif child.tag is etree.Comment:
+            parts.append(f"<!--{child.text or ''}-->")
+        else:
+            parts.append(
+                etree.tostring(child, encoding=str, with_tail=False)
+            )
+        if child.tail:
+            parts.append(child.tail if raw else _escape_markup(child.tail))
+    return "".join(parts)
+
+
+def _lexbor_inner_html(node: Any) -> str:
+    """selectolax counterpart of :func:`_lxml_inner_html`.
+
+    The content of ``<template>`` elements is not part of the lexbor tree
+    and is therefore left out.
+    """
+
+    raw = node.tag in _RAW_TEXT_TAGS
+    parts = []
+    for child in node.iter(include_text=True):
+        tag = child.tag
+        if tag == "-text":
+            text = child.text_content or ""
+            parts.append(text if raw else _escape_markup(text))
+        elif tag == "-comment":
+            # ``comment_content`` is stripped, ``html`` is verbatim.
+            parts.append(child.html)
+        elif not tag.startswith("-"):
+            empty = tag in _VOID_TAGS and child.child is None
+            parts.append(_start_tag(tag, child.attributes.items(), empty))
+            if not empty:
+                parts.append(_lexbor_inner_html(child))
+                parts.append(f"</{tag}>")
+    return "".join(parts)
+
+
+def _lexbor_text(node: Any) -> str:
+    """Return the text of a lexbor *node* like :func:`_lxml_text`."""
+
+    parent = node
+    while parent is not None:
+        if parent.tag in _NON_TEXT_TAGS:
+            return ""
+        parent = parent.parent
+    parts = []
+    # Depth-first walk skipping the subtrees of the non-text tags.
+    stack = [node.child] if node.child is not None else []
+    while stack:
+        child = stack.pop()
+        if child.next is not None:
+            stack.append(child.next)
+        if child.tag == "-text":
+            text = (child.text_content or "").strip()
+            if text:
+                parts.append(text)
+        elif child.tag not in _NON_TEXT_TAGS and child.child is not None:
+            stack.append(child.child)
+    return "\n".join(parts)
+
+
+def _extract_with_selectolax(
+    tree: Any, css: str, options: Dict[str, Any]
+) -> Optional[Union[str, list[str]]]:
+    """selectolax counterpart of :func:`_extract_with_css`.
+
+    Raises ``SelectolaxError`` for selectors lexbor cannot parse.
+    """
+
+    elems = tree.css(css)
+    if not elems:
+        return None
+
+    values: list[str] = []
+    for elem in elems:
+        target = elem
+        if options.get("first_paragraph"):
+            # ``css_first`` would also match *elem* itself.
+            descendants = elem.traverse()
+            next(descendants)
+            first = next((n for n in descendants if n.tag == "p"), None)
+            if first is not None:
+                target = first
+        if target.tag == "img" and "src" in target.attributes:
+            values.append((target.attributes["src"] or "").strip())
+            continue
+
+        if options.get("raw_html"):
+            text = _lexbor_inner_html(target)
+        else:
+            text = _lexbor_text(target)
+        if options.get("clean"):
+            text = clean_description(text, options["clean"])
+        if text:
+            values.append(text)
+
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def _extract_with_cssselect(
+    tree: HtmlElement, css: str, options: Dict[str, Any]
+) -> Optional[Union[str, list[str]]]:
+    """lxml counterpart of :func:`_extract_with_css`."""
+
+    compiled = _compile_css(css)
+    elems = compiled(tree)
+    if not elems:
+        return None
+    return _values_from_elements(elems, options)
+
+
+def _extract_with_css(
+    soup: BeautifulSoup, selector: Union[str, Dict[str, Any]]
+) -> Optional[Union[str, list[str]]]:
+    """Return the text of the first match or a list for multiple matches."""
+
+    css, options = _split_css_selector(selector)
+    if css is None:
+        return None
 
     try:
         elems = soup.select(css) if isinstance(css, str) else []
@@ -159,7 +695,7 @@ def _extract_with_css(
         else:
             text = target.get_text(separator="\n", strip=True)
         if options.get("clean"):
-            text = clean_description(text)
+            text = clean_description(text, options["clean"])
         if text:
             values.append(text)
 
@@ -195,6 +731,378 @@ def _extract_with_xpath(
     return values[0] if len(values) == 1 else values
 
 
+def _structured_key(selector: Union[str, Dict[str, Any]]) -> Optional[str]:
+    """Return the structured data source referenced by *selector*."""
+
+    if isinstance(selector, dict):
+        for key in _STRUCTURED_KEYS:
+            if isinstance(selector.get(key), str):
+                return key
+    return None
+
+
+def _extract_structured(
+    doc: _PageDocument, source: str, path: str
+) -> Optional[Union[str, list[str]]]:
+    """Return the value of *path* in the structured data of *doc*."""
+
+    value = lookup(doc.structured, source, path)
+    if value is None or isinstance(value, dict):
+        return value
+    values = value if isinstance(value, list) else [value]
+    texts = [str(v).strip() for v in values if not isinstance(v, dict)]
+    texts = [t for t in texts if t]
+    if not texts:
+        return None
+    return texts[0] if len(texts) == 1 else texts
+
+
+def _extract_field(
+    doc: _PageDocument,
+    selector: Union[str, Dict[str, Any]],
+    backend: str = "lxml",
+) -> Optional[Union[str, list[str]]]:
+    """Evaluate one mapping value against the shared parsed *doc*.
+
+    CSS selectors the *backend* cannot evaluate fall back to lxml, then to
+    BeautifulSoup; XPath and structured fields always use lxml.
+    """
+
+    if isinstance(selector, str) and selector.lstrip().startswith("/"):
+        return _extract_with_xpath(doc.tree, selector)
+    source = _structured_key(selector)
+    if source is not None:
+        value = _extract_structured(doc, source, selector[source])
+        if value or "selector" not in selector:
+            return value
+
+    css, options = _split_css_selector(selector)
+    if css is None:
+        return None
+    if backend == "selectolax":
+        try:
+            return _extract_with_selectolax(doc.lexbor, css, options)
+        except Exception as exc:  # selector outside lexbor's syntax
+            logger.debug("selectolax cannot evaluate %s: %s", css, exc)
+    if backend != "bs4":
+        tree = doc.tree
+        if tree is not None and _compile_css(css) is not None:
+            return _extract_with_cssselect(tree, css, options)
+    return _extract_with_css(doc.soup, selector)
+
+
+def _walk_fields(mapping: Dict[str, Any]) -> tuple[tuple[str, str], ...]:
+    """Return the ``(field, css)`` pairs eligible for the single walk."""
+
+    pairs = []
+    for field, selector in mapping.items():
+        if isinstance(selector, str) and selector.lstrip().startswith("/"):
+            continue
+        if _structured_key(selector) is not None:
+            continue
+        css, _ = _split_css_selector(selector)
+        if css is not None:
+            pairs.append((field, css))
+    return tuple(pairs)
+
+
+@lru_cache(maxsize=128)
+def _compile_walk(pairs: tuple[tuple[str, str], ...]) -> Any:
+    """Return a :class:`MultiSelector` for *pairs* or ``None``.
+
+    Below ``_WALK_MIN_FIELDS`` supported selectors one ``CSSSelector`` per
+    field is cheaper than walking the tree in Python.
+    """
+
+    engine = MultiSelector(dict(pairs))
+    if len(engine.names) < _WALK_MIN_FIELDS:
+        return None
+    return engine
+
+
+def _extract_document(
+    doc: _PageDocument,
+    mapping: Dict[str, Any],
+    backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Return the fields of *mapping* evaluated on *doc*.
+
+    *backend* is one of :data:`BACKENDS`; ``None`` uses the default (see
+    :func:`set_default_backend`). With lxml, plain CSS fields are matched
+    together in one walk of the tree (see :mod:`core.css_engine`); the
+    other fields are evaluated one by one.
+    """
+
+    backend = _resolve_backend(backend, doc, mapping)
+    matches: Dict[str, list[HtmlElement]] = {}
+    if backend == "lxml" and doc.tree is not None:
+        engine = _compile_walk(_walk_fields(mapping))
+        if engine is not None:
+            matches = engine.select(doc.tree)
+
+    data: Dict[str, Any] = {}
+    for field, selector in mapping.items():
+        if field in matches:
+            _, options = _split_css_selector(selector)
+            value = _values_from_elements(matches[field], options)
+        else:
+            value = _extract_field(doc, selector, backend)
+        if not value:
+            logger.warning("Champ manquant: %s via %s", field, selector)
+        data[field] = value
+    return data
+
+
+def _check_mapping(mapping: Any) -> None:
+    """Raise ``ValueError`` unless *mapping* is a valid field mapping."""
+
+    if not isinstance(mapping, dict) or not all(
+        isinstance(k, str) and isinstance(v, (str, dict))
+        for k, v in mapping.items()
+    ):
+        raise ValueError(
+            "mapping must be a dict with str keys and str or dict values"
+        )
+    for selector in mapping.values():
+        if isinstance(selector, dict) and selector.get("clean"):
+            get_cleaner(selector["clean"])
+
+
+def _prepare_mapping(mapping: Any) -> Dict[str, Any]:
+    """Validate *mapping* and compile its CSS selectors once.
+
+    Batch and asyncio APIs call this before dispatching work so that every
+    page of the batch reuses the same compiled selectors. A
+    :class:`~core.templates.TemplateIndex` prepares every mapping it holds.
+    """
+
+    if isinstance(mapping, TemplateIndex):
+        for entry in mapping.templates.values():
+            _prepare_mapping(entry["mapping"])
+        return mapping
+    _check_mapping(mapping)
+    for selector in mapping.values():
+        if isinstance(selector, str) and selector.lstrip().startswith("/"):
+            continue
+        if _structured_key(selector) and "selector" not in selector:
+            continue
+        css, _ = _split_css_selector(selector)
+        if css is not None:
+            _compile_css(css)
+    _compile_walk(_walk_fields(mapping))
+    return mapping
+
+
+def _extract_bytes(
+    content: bytes,
+    content_type: Optional[str],
+    mapping: Dict[str, Any],
+    backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Parse *content* and evaluate *mapping*; used by executors."""
+
+    doc = _PageDocument(content, content_type)
+    return _extract_document(doc, mapping, backend)
+
+
+def _fetch_document(
+    url: str,
+    *,
+    session: Optional[requests.Session] = None,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+) -> _PageDocument:
+    """Download *url* and wrap the raw bytes in a :class:`_PageDocument`.
+
+    ``requests`` exceptions are propagated to the caller.
+    """
+
+    req_kwargs: Dict[str, Any] = {"timeout": timeout}
+    if user_agent:
+        req_kwargs["headers"] = {"User-Agent": user_agent}
+    getter = session.get if session is not None else requests.get
+    resp = getter(url, **req_kwargs)
+    resp.raise_for_status()
+    return _PageDocument(resp.content, resp.headers.get("Content-Type"))
+
+
+def _field_probe(selector: Union[str, Dict[str, Any]]) -> Any:
+    """Return a callable listing the nodes matched by *selector*.
+
+    ``None`` is returned when the selector cannot be checked on the
+    partial lxml tree built while streaming.
+    """
+
+    if isinstance(selector, str) and selector.lstrip().startswith("/"):
+        try:
+            return etree.XPath(selector)
+        except etree.XPathError:
+            return None
+    if _structured_key(selector):
+        # JSON-LD blocks are often at the end of the body.
+        return None
+    css, _ = _split_css_selector(selector)
+    return _compile_css(css) if css is not None else None
+
+
+def _probe_resolved(probe: Any, root: HtmlElement, open_elems: set) -> bool:
+    """Tell whether *probe* matches a node whose end tag was parsed."""
+
+    try:
+        nodes = probe(root)
+    except Exception:
+        return False
+    if not isinstance(nodes, list):
+        return False
+    for node in nodes:
+        elem = node
+        if not isinstance(node, etree._Element):
+            elem = node.getparent() if hasattr(node, "getparent") else None
+        if elem is not None and elem not in open_elems:
+            return True
+    return False
+
+
+def _stream_document(
+    url: str,
+    mapping: Dict[str, Any],
+    *,
+    session: Optional[requests.Session] = None,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = 65536,
+) -> _PageDocument:
+    """Download *url* chunk by chunk into an incremental lxml parser.
+
+    The connection is closed as soon as every field of *mapping* matches
+    a completely parsed element, or once *max_bytes* were received. The
+    returned document holds the partial tree and the bytes read so far.
+    """
+
+    req_kwargs: Dict[str, Any] = {"timeout": timeout, "stream": True}
+    if user_agent:
+        req_kwargs["headers"] = {"User-Agent": user_agent}
+    getter = session.get if session is not None else requests.get
+    resp = getter(url, **req_kwargs)
+    try:
+        resp.raise_for_status()
+        content_type = resp.headers.get("Content-Type")
+        chunks = resp.iter_content(chunk_size)
+        buf = bytearray()
+        for chunk in chunks:
+            buf += chunk
+            if len(buf) >= 4096:
+                break
+        if html is None:
+            for chunk in chunks:
+                buf += chunk
+            return _PageDocument(bytes(buf), content_type)
+
+        encoding = _sniff_encoding(bytes(buf), content_type, partial=True)
+        parser = etree.HTMLPullParser(
+            events=("start", "end"), encoding=encoding
+        )
+        parser.set_element_class_lookup(html.HtmlElementClassLookup())
+        probes = [_field_probe(selector) for selector in mapping.values()]
+        # A field that cannot be probed disables the early stop.
+        pending = probes if all(probes) else None
+        root: Optional[HtmlElement] = None
+        open_elems: set = set()
+        stopped = False
+        parser.feed(bytes(buf))
+        while True:
+            closed_any = False
+            for event, elem in parser.read_events():
+                if root is None:
+                    root = elem
+                if event == "start":
+                    open_elems.add(elem)
+                else:
+                    open_elems.discard(elem)
+                    closed_any = True
+            if pending is not None and root is not None and closed_any:
+                pending = [
+                    probe
+                    for probe in pending
+                    if not _probe_resolved(probe, root, open_elems)
+                ]
+                if not pending:
+                    stopped = True
+                    break
+            if max_bytes and len(buf) >= max_bytes:
+                stopped = True
+                break
+            chunk = next(chunks, None)
+            if chunk is None:
+                break
+            buf += chunk
+            parser.feed(chunk)
+    finally:
+        resp.close()
+
+    try:
+        tree = parser.close()
+    except etree.ParserError:
+        tree = None
+    logger.debug(
+        "Streamed %d bytes from %s (%s)",
+        len(buf),
+        url,
+        "stopped early" if stopped else "complete",
+    )
+    return _PageDocument(bytes(buf), encoding=encoding, tree=tree)
+
+
+def _load_document(
+    url: str,
+    mapping: Dict[str, Any],
+    *,
+    session: Optional[requests.Session] = None,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+    stream: bool = False,
+    max_bytes: Optional[int] = None,
+) -> _PageDocument:
+    """Fetch *url* fully or through :func:`_stream_document`."""
+
+    if stream or max_bytes:
+        return _stream_document(
+            url,
+            mapping,
+            session=session,
+            timeout=timeout,
+            user_agent=user_agent,
+            max_bytes=max_bytes,
+        )
+    return _fetch_document(
+        url, session=session, timeout=timeout, user_agent=user_agent
+    )
+
+
+def _route_document(
+    doc: _PageDocument, index: TemplateIndex, url: str
+) -> tuple[Optional[str], Optional[Dict[str, Any]], float]:
+    """Return ``(template, mapping, score)`` for *doc* from *index*.
+
+    Pages matching no template are recorded in the index for review and
+    ``(None, None, 0.0)`` is returned.
+    """
+
+    tree = doc.tree
+    fingerprint = page_fingerprint(tree) if tree is not None else frozenset()
+    found = index.match(fingerprint)
+    if found is None:
+        logger.info("Template inconnu pour %s", url)
+        index.record_unknown(url, fingerprint)
+        return None, None, 0.0
+    return found
+
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
 # ---------------------------------------------------------------------------
 # public API
 # ---------------------------------------------------------------------------
@@ -207,6 +1115,10 @@ def extract_fields(
     timeout: int = 10,
     user_agent: Optional[str] = None,
     verbose: bool = False,
+    session: Optional[requests.Session] = None,
+    stream: bool = False,
+    max_bytes: Optional[int] = None,
+    backend: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Download *url* and return the fields defined in *mapping*.
 
@@ -223,48 +1135,40 @@ def extract_fields(
         Optional user agent header used for the request.
     verbose:
         When ``True`` debug information is logged.
+    session:
+        Optional :class:`requests.Session` reused for the request, see
+        :func:`make_session`.
+    stream:
+        Parse the body while it is downloaded and close the connection as
+        soon as every field matched a complete element. Fields matching
+        several elements only list those received before that point.
+    max_bytes:
+        Stop downloading after this many bytes. Implies *stream*.
+    backend:
+        Parser backend among :data:`BACKENDS` (``"selectolax"``,
+        ``"lxml"`` or the reference ``"bs4"``). ``None`` uses the default
+        set with :func:`set_default_backend`, else the fastest available.
     """
-    if not isinstance(mapping, dict) or not all(
-        isinstance(k, str) and isinstance(v, (str, dict)) for k, v in mapping.items()
-    ):
-        raise ValueError(
-            "mapping must be a dict with str keys and str or dict values"
-        )
-
-    headers = {"User-Agent": user_agent} if user_agent else None
+    _check_mapping(mapping)
+    if backend is not None:
+        _check_backend(backend)
     if verbose:
         logger.setLevel(logging.DEBUG)
 
-    req_kwargs = {"timeout": timeout}
-    if headers:
-        req_kwargs["headers"] = headers
-
     try:
-        resp = requests.get(url, **req_kwargs)
-        resp.raise_for_status()
+        doc = _load_document(
+            url,
+            mapping,
+            session=session,
+            timeout=timeout,
+            user_agent=user_agent,
+            stream=stream,
+            max_bytes=max_bytes,
+        )
     except requests.exceptions.RequestException as err:
         logger.error("Failed to fetch %s: %s", url, err)
         return {}
-
-    page = resp.text
-    bs_parser = "lxml" if html else "html.parser"
-    soup = BeautifulSoup(page, bs_parser)
-    tree = html.fromstring(page) if html else None
-
-    data: Dict[str, Any] = {}
-    for field, selector in mapping.items():
-        value: Optional[Union[str, list[str]]] = None
-        if isinstance(selector, dict):
-            value = _extract_with_css(soup, selector)
-        elif isinstance(selector, str) and selector.lstrip().startswith("/"):
-            value = _extract_with_xpath(tree, selector)
-        else:
-            value = _extract_with_css(soup, selector)
-
-        if not value:
-            logger.warning("Champ manquant: %s via %s", field, selector)
-        data[field] = value
-    return data
+    return _extract_document(doc, mapping, backend)
 
 
 def scrap_fiche_generique(
@@ -275,15 +1179,720 @@ def scrap_fiche_generique(
     timeout: int = 10,
     user_agent: Optional[str] = None,
     verbose: bool = False,
+    stream: bool = False,
+    max_bytes: Optional[int] = None,
+    backend: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Backward compatible wrapper around :func:`extract_fields`."""
 
     resolved = _load_mapping(mapping, mapping_file)
     return extract_fields(
-        url, resolved, timeout=timeout, user_agent=user_agent, verbose=verbose
+        url,
+        resolved,
+        timeout=timeout,
+        user_agent=user_agent,
+        verbose=verbose,
+        stream=stream,
+        max_bytes=max_bytes,
+        backend=backend,
     )
 
 
+def make_session(
+    pool_size: int = 10, user_agent: Optional[str] = None
+) -> requests.Session:
+    """Return a pooled :class:`requests.Session` for batch extraction.
+
+    The HTTP adapter keeps up to *pool_size* connections per host so that
+    concurrent workers reuse connections instead of opening new ones.
+    """
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    return session
+
+
+def _extract_record(
+    index: int,
+    url: str,
+    mapping: Dict[str, Any],
+    session: requests.Session,
+    timeout: int,
+    stream: bool = False,
+    max_bytes: Optional[int] = None,
+    backend: Optional[str] = None,
+    user_agent: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Fetch and extract one URL of a batch, never raising.
+
+    *user_agent* is sent with the request, leaving *session* unchanged.
+    """
+
+    start = time.perf_counter()
+    record: Dict[str, Any] = {
+        "index": index,
+        "url": url,
+        "data": None,
+        "error": None,
+    }
+    try:
+        if isinstance(mapping, TemplateIndex):
+            doc = _fetch_document(
+                url, session=session, timeout=timeout, user_agent=user_agent
+            )
+            name, mapping, score = _route_document(doc, mapping, url)
+            record["template"] = name
+            record["score"] = round(score, 3)
+            if mapping is None:
+                record["elapsed"] = round(time.perf_counter() - start, 3)
+                return record
+        elif stream or max_bytes:
+            doc = _stream_document(
+                url,
+                mapping,
+                session=session,
+                timeout=timeout,
+                user_agent=user_agent,
+                max_bytes=max_bytes,
+            )
+        else:
+            doc = _fetch_document(
+                url, session=session, timeout=timeout, user_agent=user_agent
+            )
+        record["data"] = _extract_document(doc, mapping, backend)
+    except requests.exceptions.RequestException as err:
+        logger.error("Failed to fetch %s: %s", url, err)
+        record["error"] = f"{type(err).__name__}: {err}"
+    except Exception as err:  # one broken page must not stop the batch
+        logger.exception("Extraction failed for %s", url)
+        record["error"] = f"{type(err).__name__}: {err}"
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def _run_batch(
+    urls: Iterable[str],
+    task: Callable[[int, str], Dict[str, Any]],
+    *,
+    workers: int,
+    per_host: int,
+    ordered: bool,
+) -> Iterator[Dict[str, Any]]:
+    """Run ``task(index, url)`` for every URL and yield its records.
+
+    At most *workers* tasks run at once and at most *per_host* for the
+    same host. *urls* is consumed lazily. Tasks return a record dict
+    carrying its ``index``; records are yielded in completion order or,
+    with *ordered*, in input order.
+    """
+
+    workers = max(1, workers)
+    per_host = max(1, per_host)
+    url_iter = enumerate(urls)
+    exhausted = False
+    lookahead = workers * 4
+    waiting: Dict[str, deque] = {}
+    n_waiting = 0
+    host_active: Dict[str, int] = {}
+    running: Dict[Future, str] = {}
+    done_records: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while not exhausted and n_waiting < lookahead:
+                try:
+                    index, url = next(url_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                waiting.setdefault(_host(url), deque()).append((index, url))
+                n_waiting += 1
+
+            for host, queue in waiting.items():
+                while (
+                    queue
+                    and len(running) < workers
+                    and host_active.get(host, 0) < per_host
+                ):
+                    index, url = queue.popleft()
+                    n_waiting -= 1
+                    host_active[host] = host_active.get(host, 0) + 1
+                    future = executor.submit(task, index, url)
+                    running[future] = host
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                host = running.pop(future)
+                host_active[host] -= 1
+                record = future.result()
+                if not ordered:
+                    yield record
+                    continue
+                done_records[record["index"]] = record
+                while next_index in done_records:
+                    yield done_records.pop(next_index)
+                    next_index += 1
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def extract_fields_many(
+    urls: Iterable[str],
+    mapping: Dict[str, Any],
+    *,
+    workers: int = 8,
+    per_host: int = 2,
+    ordered: bool = False,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+    stream: bool = False,
+    max_bytes: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Extract *mapping* from every URL of *urls* concurrently.
+
+    Records are yielded as soon as they are available (or in input order
+    when *ordered* is ``True``). Each record is a dict with the keys
+    ``index`` (position in *urls*), ``url``, ``data`` (the extracted
+    fields or ``None``), ``error`` (``None`` or a message) and
+    ``elapsed`` (seconds).
+
+    Parameters
+    ----------
+    urls:
+        Iterable of page URLs, consumed lazily.
+    mapping:
+        Mapping applied to every page, or a
+        :class:`~core.templates.TemplateIndex` choosing the mapping of
+        each page from its template fingerprint. Records then also carry
+        ``template`` (``None`` for unknown templates, recorded in the
+        index) and ``score``.
+    workers:
+        Maximum number of requests in flight.
+    per_host:
+        Maximum number of requests in flight for a single host.
+    ordered:
+        Yield records in input order instead of completion order.
+    session:
+        Shared session; one sized for *workers* is created otherwise.
+    stream, max_bytes:
+        Early-terminating download, see :func:`extract_fields`.
+    backend:
+        Parser backend, see :func:`extract_fields`.
+    """
+
+    _prepare_mapping(mapping)
+    if backend is not None:
+        _check_backend(backend)
+    if isinstance(mapping, TemplateIndex) and (stream or max_bytes):
+        raise ValueError("stream needs a single mapping, not a template index")
+    workers = max(1, workers)
+    own_session = session is None
+    if session is None:
+        session = make_session(workers, user_agent)
+
+    def task(index: int, url: str) -> Dict[str, Any]:
+        return _extract_record(
+            index, url, mapping, session, timeout, stream, max_bytes, backend,
+            user_agent,
+        )
+
+    try:
+        yield from _run_batch(
+            urls, task, workers=workers, per_host=per_host, ordered=ordered
+        )
+    finally:
+        if own_session:
+            session.close()
+
+
+def learn_template(
+    index: TemplateIndex,
+    name: str,
+    mapping: Dict[str, Any],
+    urls: Iterable[str],
+    *,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> int:
+    """Add the pages of *urls* to *index* as samples of template *name*.
+
+    Returns the number of pages fingerprinted; pages that cannot be
+    fetched are logged and skipped.
+    """
+
+    _prepare_mapping(mapping)
+    learned = 0
+    for url in urls:
+        try:
+            doc = _fetch_document(
+                url, session=session, timeout=timeout, user_agent=user_agent
+            )
+        except requests.exceptions.RequestException as err:
+            logger.error("Failed to fetch %s: %s", url, err)
+            continue
+        tree = doc.tree
+        if tree is None:
+            continue
+        index.add(name, mapping, page_fingerprint(tree), url)
+        learned += 1
+    return learned
+
+
+def _suggest_record(
+    index: int,
+    url: str,
+    session: requests.Session,
+    timeout: int,
+    top_k: int,
+    min_words: int,
+    user_agent: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Fetch one URL and rank its description candidates, never raising."""
+
+    start = time.perf_counter()
+    record: Dict[str, Any] = {
+        "index": index,
+        "url": url,
+        "blocks": None,
+        "mapping": None,
+        "error": None,
+    }
+    try:
+        doc = _fetch_document(
+            url, session=session, timeout=timeout, user_agent=user_agent
+        )
+        tree = doc.tree
+        blocks = []
+        if tree is not None:
+            blocks = rank_blocks(tree, top_k=top_k, min_words=min_words)
+        record["blocks"] = [
+            {
+                "selector": block.selector,
+                "score": round(block.score, 3),
+                "words": block.words,
+                "link_density": round(block.link_density, 3),
+                "snippet": block.snippet,
+            }
+            for block in blocks
+        ]
+        if blocks:
+            record["mapping"] = {"description": blocks[0].selector}
+    except requests.exceptions.RequestException as err:
+        logger.error("Failed to fetch %s: %s", url, err)
+        record["error"] = f"{type(err).__name__}: {err}"
+    except Exception as err:  # one broken page must not stop the batch
+        logger.exception("Block ranking failed for %s", url)
+        record["error"] = f"{type(err).__name__}: {err}"
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def suggest_blocks_many(
+    urls: Iterable[str],
+    *,
+    top_k: int = 5,
+    min_words: int = MIN_WORDS,
+    workers: int = 8,
+    per_host: int = 2,
+    ordered: bool = False,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Rank the description candidates of every page of *urls*.
+
+    Headless version of the block selector window, used to find the
+    mapping of a new site in batch. Pages are fetched like in
+    :func:`extract_fields_many` and each record carries ``index``,
+    ``url``, ``blocks`` (the *top_k* best blocks, best first, as dicts
+    with ``selector``, ``score``, ``words``, ``link_density`` and
+    ``snippet``), ``mapping`` (``{"description": <best selector>}`` or
+    ``None``), ``error`` and ``elapsed``. See
+    :func:`core.blocks.rank_blocks` for the scoring.
+    """
+
+    workers = max(1, workers)
+    own_session = session is None
+    if session is None:
+        session = make_session(workers, user_agent)
+
+    def task(index: int, url: str) -> Dict[str, Any]:
+        return _suggest_record(
+            index, url, session, timeout, top_k, min_words, user_agent
+        )
+
+    try:
+        yield from _run_batch(
+            urls, task, workers=workers, per_host=per_host, ordered=ordered
+        )
+    finally:
+        if own_session:
+            session.close()
+
+
+def _coverage_record(
+    index: int,
+    url: str,
+    signature: Any,
+    candidates: List[str],
+    session: requests.Session,
+    timeout: int,
+    user_agent: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Fetch one sample page and check every candidate, never raising."""
+
+    start = time.perf_counter()
+    record: Dict[str, Any] = {
+        "index": index,
+        "url": url,
+        "covered": None,
+        "error": None,
+    }
+    try:
+        doc = _fetch_document(
+            url, session=session, timeout=timeout, user_agent=user_agent
+        )
+        tree = doc.tree
+        if tree is None:
+            raise ValueError("empty page")
+        record["covered"] = page_coverage(tree, signature, candidates)
+    except requests.exceptions.RequestException as err:
+        logger.error("Failed to fetch %s: %s", url, err)
+        record["error"] = f"{type(err).__name__}: {err}"
+    except Exception as err:  # one broken page must not stop the batch
+        logger.exception("Selector check failed for %s", url)
+        record["error"] = f"{type(err).__name__}: {err}"
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def generalize_selector(
+    selector: str,
+    reference_url: str,
+    sample_urls: Iterable[str],
+    *,
+    content: Union[str, bytes, None] = None,
+    workers: int = 8,
+    per_host: int = 2,
+    timeout: int = 10,
+    user_agent: Optional[str] = None,
+    session: Optional[requests.Session] = None,
+) -> Dict[str, Any]:
+    """Find the simplest selector of a block valid on every sample page.
+
+    *selector* designates the block on the page *reference_url* (whose
+    HTML may be given as *content*, e.g. the page shown in the block
+    selector window). The alternative selectors of that block (see
+    :func:`core.generalize.candidate_selectors`) are checked on every
+    page of *sample_urls*, fetched concurrently like in
+    :func:`extract_fields_many`, along with *selector* itself.
+
+    The report is a dict with ``selector``, ``reference``, ``pages``
+    (sample pages checked), ``errors`` (``{"url", "error"}`` of the
+    pages that could not be checked), ``candidates`` (``{"selector",
+    "coverage", "missing"}`` with the share of pages where the block is
+    found and the URLs where it is not, best coverage first, then
+    simplest) and ``best``: the simplest selector covering every page,
+    or ``None``.
+
+    Raises ``ValueError`` when *selector* matches nothing on the
+    reference page.
+    """
+
+    workers = max(1, workers)
+    own_session = session is None
+    if session is None:
+        session = make_session(workers, user_agent)
+    try:
+        if content is None:
+            doc = _fetch_document(
+                reference_url,
+                session=session,
+                timeout=timeout,
+                user_agent=user_agent,
+            )
+        elif isinstance(content, str):
+            doc = _PageDocument(content.encode("utf-8"), encoding="utf-8")
+        else:
+            doc = _PageDocument(content)
+        tree = doc.tree
+        matches = []
+        if tree is not None:
+            matches = select_all(tree, [selector])[selector]
+        if not matches:
+            raise ValueError(
+                f"{selector!r} matches nothing on {reference_url}"
+            )
+        element = matches[0]
+        signature = element_signature(element)
+        candidates = candidate_selectors(tree, element)
+        if selector not in candidates:
+            # Reported too, to show where the picked selector fails.
+            candidates.append(selector)
+
+        def task(index: int, url: str) -> Dict[str, Any]:
+            return _coverage_record(
+                index, url, signature, candidates, session, timeout,
+                user_agent,
+            )
+
+        missing: Dict[str, List[str]] = {css: [] for css in candidates}
+        errors = []
+        pages = 0
+        for record in _run_batch(
+            sample_urls, task, workers=workers, per_host=per_host,
+            ordered=True,
+        ):
+            if record["error"] is not None:
+                errors.append({"url": record["url"], "error": record["error"]})
+                continue
+            pages += 1
+            for css, covered in record["covered"].items():
+                if not covered:
+                    missing[css].append(record["url"])
+    finally:
+        if own_session:
+            session.close()
+
+    # ``candidates`` is sorted simplest first and sorting is stable.
+    report = [
+        {
+            "selector": css,
+            "coverage": (
+                round(1 - len(missing[css]) / pages, 3) if pages else 0.0
+            ),
+            "missing": missing[css],
+        }
+        for css in candidates
+    ]
+    report.sort(key=lambda c: -c["coverage"])
+    best = next(
+        (c["selector"] for c in report if pages and not c["missing"]), None
+    )
+    return {
+        "selector": selector,
+        "reference": reference_url,
+        "pages": pages,
+        "errors": errors,
+        "candidates": report,
+        "best": best,
+    }
+
+
+# ---------------------------------------------------------------------------
+# asyncio API
+# ---------------------------------------------------------------------------
+
+
+def _require_aiohttp() -> None:
+    if aiohttp is None:
+        raise ImportError("aiohttp required for the asyncio API")
+
+
+def _make_async_session(
+    limit: int, per_host: int, user_agent: Optional[str] = None
+) -> "aiohttp.ClientSession":
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=per_host)
+    headers = {"User-Agent": user_agent} if user_agent else None
+    return aiohttp.ClientSession(connector=connector, headers=headers)
+
+
+async def _afetch(
+    session: "aiohttp.ClientSession", url: str, timeout: float
+) -> tuple[bytes, Optional[str]]:
+    """Return the raw body and ``Content-Type`` of *url*."""
+
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    async with session.get(url, timeout=client_timeout) as resp:
+        resp.raise_for_status()
+        content = await resp.read()
+        return content, resp.headers.get("Content-Type")
+
+
+async def _aparse(
+    content: bytes,
+    content_type: Optional[str],
+    mapping: Dict[str, Any],
+    executor: Optional[Executor],
+    backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run the CPU bound extraction outside of the event loop."""
+
+    # Child processes do not see set_default_backend() calls.
+    if backend is None:
+        backend = _default_backend
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, _extract_bytes, content, content_type, mapping, backend
+    )
+
+
+async def aextract_fields(
+    url: str,
+    mapping: Dict[str, Any],
+    *,
+    timeout: float = 10,
+    user_agent: Optional[str] = None,
+    session: Optional["aiohttp.ClientSession"] = None,
+    executor: Optional[Executor] = None,
+    backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Asyncio counterpart of :func:`extract_fields`.
+
+    The page is downloaded with ``aiohttp`` and parsed in *executor* (the
+    loop default thread pool when ``None``; a ``ProcessPoolExecutor`` can
+    be given to take parsing off the GIL). Fetch errors are logged and an
+    empty dict is returned, like the blocking version.
+    """
+
+    _require_aiohttp()
+    _prepare_mapping(mapping)
+    if backend is not None:
+        _check_backend(backend)
+    own_session = session is None
+    if session is None:
+        session = _make_async_session(1, 1, user_agent)
+    try:
+        content, content_type = await _afetch(session, url, timeout)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        logger.error("Failed to fetch %s: %s", url, err)
+        return {}
+    finally:
+        if own_session:
+            await session.close()
+    return await _aparse(content, content_type, mapping, executor, backend)
+
+
+async def _aextract_record(
+    index: int,
+    url: str,
+    mapping: Dict[str, Any],
+    session: "aiohttp.ClientSession",
+    timeout: float,
+    executor: Optional[Executor],
+    backend: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Async counterpart of :func:`_extract_record`, never raising."""
+
+    start = time.perf_counter()
+    record: Dict[str, Any] = {
+        "index": index,
+        "url": url,
+        "data": None,
+        "error": None,
+    }
+    try:
+        content, content_type = await _afetch(session, url, timeout)
+        record["data"] = await _aparse(
+            content, content_type, mapping, executor, backend
+        )
+    except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+        logger.error("Failed to fetch %s: %s", url, err)
+        record["error"] = f"{type(err).__name__}: {err}"
+    except Exception as err:  # one broken page must not stop the batch
+        logger.exception("Extraction failed for %s", url)
+        record["error"] = f"{type(err).__name__}: {err}"
+    record["elapsed"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+async def aextract_fields_many(
+    urls: Iterable[str],
+    mapping: Dict[str, Any],
+    *,
+    concurrency: int = 100,
+    per_host: int = 8,
+    ordered: bool = False,
+    timeout: float = 10,
+    user_agent: Optional[str] = None,
+    session: Optional["aiohttp.ClientSession"] = None,
+    executor: Optional[Executor] = None,
+    backend: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Asyncio counterpart of :func:`extract_fields_many`.
+
+    Yields the same records. *concurrency* bounds the fetches in flight
+    and, when no *session* is given, sizes the ``aiohttp`` connector
+    together with *per_host*. *urls* is consumed lazily, so very large
+    catalogues keep a constant memory footprint.
+    """
+
+    _require_aiohttp()
+    _prepare_mapping(mapping)
+    if backend is not None:
+        _check_backend(backend)
+    concurrency = max(1, concurrency)
+    own_session = session is None
+    if session is None:
+        session = _make_async_session(
+            concurrency, max(1, per_host), user_agent
+        )
+
+    pending: set[asyncio.Task] = set()
+    done_records: Dict[int, Dict[str, Any]] = {}
+    next_index = 0
+    url_iter = enumerate(urls)
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    index, url = next(url_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(
+                    asyncio.ensure_future(
+                        _aextract_record(
+                            index,
+                            url,
+                            mapping,
+                            session,
+                            timeout,
+                            executor,
+                            backend,
+                        )
+                    )
+                )
+            if not pending:
+                break
+            finished, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in finished:
+                record = task.result()
+                if not ordered:
+                    yield record
+                    continue
+                done_records[record["index"]] = record
+                while next_index in done_records:
+                    yield done_records.pop(next_index)
+                    next_index += 1
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if own_session:
+            await session.close()
+
+
 def _selftest() -> None:
     """Run a minimal test suite on the module."""
     import unittest
@@ -292,6 +1901,8 @@ def _selftest() -> None:
     class DummyResponse:
         def __init__(self, text: str):
             self.text = text
+            self.content = text.encode("utf-8")
+            self.headers = {"Content-Type": "text/html; charset=utf-8"}
 
         def raise_for_status(self) -> None:  # pragma: no cover - dummy
             pass
@@ -321,6 +1932,15 @@ def _selftest() -> None:
 # ---------------------------------------------------------------------------
 
 
+def _read_urls(path: str) -> Iterator[str]:
+    """Yield the URLs of *path*, skipping blank lines and ``#`` comments."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                yield line
+
+
 def main(argv: Optional[list[str]] = None) -> None:
     """Entry point for the command line interface."""
     if argv is None:
@@ -342,8 +1962,12 @@ def main(argv: Optional[list[str]] = None) -> None:
 
     parser = argparse.ArgumentParser(description="Universal scraper")
     parser.add_argument("--url", required=False, help="URL of the page")
+    parser.add_argument(
+        "--urls-file",
+        help="text file with one URL per line; prints one JSON per line",
+    )
     parser.add_argument("--self-test", action="store_true", help="run self tests")
-    group = parser.add_mutually_exclusive_group(required=True)
+    group = parser.add_mutually_exclusive_group()
     group.add_argument(
         "--mapping-file",
         help="JSON or YAML mapping file",
@@ -361,6 +1985,76 @@ def main(argv: Optional[list[str]] = None) -> None:
         action="store_true",
         help="enable debug logs",
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="stop downloading once every field is found",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        help="stop downloading after this many bytes (implies --stream)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="concurrent requests with --urls-file",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=2,
+        help="concurrent requests per host with --urls-file",
+    )
+    parser.add_argument(
+        "--ordered",
+        action="store_true",
+        help="keep the input order with --urls-file",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        help="HTML parser backend (default: fastest available)",
+    )
+    parser.add_argument(
+        "--cleaning-rules",
+        help="JSON file of named cleaning rule sets for the clean option",
+    )
+    parser.add_argument(
+        "--templates",
+        help="template index (JSON); picks the mapping of each page when "
+        "no mapping is given and records unknown templates",
+    )
+    parser.add_argument(
+        "--learn-template",
+        metavar="NAME",
+        help="add the pages to --templates as samples of NAME (with a "
+        "mapping)",
+    )
+    parser.add_argument(
+        "--review-templates",
+        action="store_true",
+        help="print the clusters of unknown pages of --templates",
+    )
+    parser.add_argument(
+        "--suggest-blocks",
+        action="store_true",
+        help="rank the description candidates of the pages instead of "
+        "extracting a mapping",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="candidates per page with --suggest-blocks",
+    )
+    parser.add_argument(
+        "--generalize",
+        metavar="SELECTOR",
+        help="find the simplest selector of the block SELECTOR of --url "
+        "that also finds it on every page of --urls-file",
+    )
     args = parser.parse_args(argv)
 
     logging.basicConfig(level=logging.INFO)
@@ -369,16 +2063,125 @@ def main(argv: Optional[list[str]] = None) -> None:
         _selftest()
         return
 
-    if not args.url:
+    if (args.learn_template or args.review_templates) and not args.templates:
+        parser.error("--learn-template/--review-templates need --templates")
+    index = TemplateIndex.load(args.templates) if args.templates else None
+    if args.review_templates:
+        clusters = [
+            {"size": c["size"], "urls": c["urls"]}
+            for c in index.unknown_clusters()
+        ]
+        print(json.dumps(clusters, ensure_ascii=False, indent=2))
+        return
+    if args.generalize:
+        if not args.url or not args.urls_file:
+            parser.error("--generalize needs --url and --urls-file")
+        if args.verbose:
+            logger.setLevel(logging.DEBUG)
+        try:
+            report = generalize_selector(
+                args.generalize,
+                args.url,
+                _read_urls(args.urls_file),
+                workers=args.workers,
+                per_host=args.per_host,
+                user_agent=args.user_agent,
+            )
+        except (ValueError, requests.exceptions.RequestException) as err:
+            parser.error(str(err))
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+    if args.suggest_blocks:
+        if args.url and args.urls_file:
+            parser.error("--url and --urls-file are mutually exclusive")
+        if not args.url and not args.urls_file:
+            parser.error("--suggest-blocks needs --url or --urls-file")
+        if args.verbose:
+            logger.setLevel(logging.DEBUG)
+        records = suggest_blocks_many(
+            _read_urls(args.urls_file) if args.urls_file else [args.url],
+            top_k=args.top,
+            workers=args.workers,
+            per_host=args.per_host,
+            ordered=args.ordered,
+            user_agent=args.user_agent,
+        )
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        return
+    has_mapping = bool(args.mapping or args.mapping_file)
+    if not has_mapping and (index is None or args.learn_template):
+        parser.error("--mapping or --mapping-file is required")
+    if has_mapping and index is not None and not args.learn_template:
+        parser.error("--templates picks the mapping, drop --mapping")
+
+    if args.url and args.urls_file:
+        parser.error("--url and --urls-file are mutually exclusive")
+    if not args.url and not args.urls_file:
         parser.error("--url is required unless --self-test is used")
 
+    if args.cleaning_rules:
+        load_rule_sets(args.cleaning_rules)
     mapping = json.loads(args.mapping) if args.mapping else None
+    urls = _read_urls(args.urls_file) if args.urls_file else [args.url]
+    if args.learn_template:
+        resolved = _load_mapping(mapping, args.mapping_file)
+        learned = learn_template(
+            index,
+            args.learn_template,
+            resolved,
+            urls,
+            user_agent=args.user_agent,
+        )
+        index.save(args.templates)
+        print(json.dumps({"template": args.learn_template, "pages": learned}))
+        return
+    if index is not None:
+        if args.verbose:
+            logger.setLevel(logging.DEBUG)
+        records = extract_fields_many(
+            urls,
+            index,
+            workers=args.workers,
+            per_host=args.per_host,
+            ordered=args.ordered,
+            user_agent=args.user_agent,
+            backend=args.backend,
+        )
+        try:
+            for record in records:
+                print(json.dumps(record, ensure_ascii=False), flush=True)
+        finally:
+            index.save(args.templates)
+        return
+    if args.urls_file:
+        if args.verbose:
+            logger.setLevel(logging.DEBUG)
+        resolved = _load_mapping(mapping, args.mapping_file)
+        records = extract_fields_many(
+            urls,
+            resolved,
+            workers=args.workers,
+            per_host=args.per_host,
+            ordered=args.ordered,
+            user_agent=args.user_agent,
+            stream=args.stream,
+            max_bytes=args.max_bytes,
+            backend=args.backend,
+        )
+        for record in records:
+            print(json.dumps(record, ensure_ascii=False), flush=True)
+        return
+
     data = scrap_fiche_generique(
         args.url,
         mapping,
         mapping_file=args.mapping_file,
         user_agent=args.user_agent,
         verbose=args.verbose,
+        stream=args.stream,
+        max_bytes=args.max_bytes,
+        backend=args.backend,
     )
     print(json.dumps(data, ensure_ascii=False))
 
@@ -27,6 +27,8 @@ logger = logging.getLogger(__name__)
 # Make sure the scraper module is importable when launched from this folder or
 # its parent directory.
 sys.path.append(os.path.dirname(__file__))
+# ``core`` (shared structured data parsing) lives at the repository root.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 try:  # Try local import first
     from scraper_universel import extract_fields
 except ModuleNotFoundError:  # Fallback when launched from parent directory
@@ -3,10 +3,12 @@ import re
 import sys
 import time
 import math
+import multiprocessing
+import tempfile
+import threading
 
 from PySide6.QtCore import (
     Signal,
-    QObject,
     QThread,
     Qt,
     QSettings,
@@ -20,6 +22,7 @@ from PySide6.QtWidgets import (
     QLineEdit,
     QMainWindow,
     QMessageBox,
+    QProgressBar,
     QPushButton,
     QCheckBox,
     QSlider,
@@ -43,21 +46,43 @@ from PySide6.QtGui import (
 )
 import importlib.util
 import subprocess
-import qtawesome as qta
-
-from core.scraper import (
-    export_fiches_concurrents_json,
-    scrap_fiches_concurrents,
-    scrap_produits_par_ids,
+from typing import Callable
+
+from core.cancellation import CancelToken
+from core.id_index import IdIndex
+from core.jobs import (
+    DEFAULT_DOWNLOADS,
+    DEFAULT_DRIVERS,
+    QUEUED,
+    RUNNING,
+    Job,
+    JobQueue,
+    ResourceBudget,
+)
+from core.links import LinkMap
+from core.metrics import SessionMetrics
+from core.progress import (
+    ITEM_FINISHED,
+    ITEM_STARTED,
+    STARTED,
+    ProgressEvent,
 )
-from core.utils import charger_liens_avec_id_fichier
-from ui.widgets import AnimatedProgressBar
-from qt_material import apply_stylesheet
+from core.session import CRASHED, EVENT, LOG, SessionProcess, run_session
+from core.utils import charger_liens_avec_id_fichier, lazy_import
+from ui.widgets import AnimatedProgressBar, IdListView, LogView, ResultsView
 import logging
 
 
 logger = logging.getLogger(__name__)
 
+# Heavy modules (selenium, pandas, icon fonts) are only imported when
+# first used, see tests/test_startup.py.
+qta = lazy_import("qtawesome")
+
+
+# Whole log of the running application, see ``MainWindow.copy_log``.
+LOG_FILE = os.path.join(tempfile.gettempdir(), "scraping_produit.log")
+
 DARK_STYLE = """
 QMainWindow { background-color: #2b2b2b; color: #eee; }
 QWidget { background-color: #2b2b2b; color: #eee; }
@@ -102,21 +127,77 @@ QTabBar::tab:selected { background: #0078d7; }
 """
 
 
-class EmittingStream(QObject):
-    text_written = Signal(str)
+def _latency(stats: dict, name: str) -> str:
+    p50, p95 = stats[f"{name}_p50"], stats[f"{name}_p95"]
+    if p50 is None:
+        return "-"
+    return f"{p50:.2f} / {p95:.2f}"
+
+
+def _size(count: int) -> str:
+    for unit in ("o", "Ko", "Mo"):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} Go"
+
+
+# Columns of the metrics table: header and formatting of a
+# ``SessionMetrics.snapshot`` entry.
+METRICS_COLUMNS = (
+    ("Action / hôte", None),
+    ("Pages/min", lambda s: f"{s['pages_per_minute']:.1f}"),
+    ("Chargement p50/p95 (s)", lambda s: _latency(s, "load")),
+    ("Analyse p50/p95 (s)", lambda s: _latency(s, "parse")),
+    ("Téléchargé", lambda s: _size(s["bytes"])),
+    ("Erreurs", lambda s: f"{s['error_rate']:.0%}"),
+)
+
+
+class SignalLogHandler(logging.Handler):
+    """Forward log records to a Qt signal, safe from any thread."""
+
+    def __init__(self, signal) -> None:
+        super().__init__()
+        self.signal = signal
+        self.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.signal.emit(self.format(record) + "\n")
+        except Exception:  # pragma: no cover - same policy as logging
+            self.handleError(record)
+
+
+# Workers running at once share the log handler of the window: it stays
+# on the root logger until the last of them ends.
+_handler_users: dict[logging.Handler, int] = {}
+_handler_lock = threading.Lock()
 
-    def write(self, text: str) -> None:
-        if text:
-            self.text_written.emit(str(text))
-            sys.__stdout__.write(str(text))
 
-    def flush(self) -> None:  # pragma: no cover - no logic
-        sys.__stdout__.flush()
+def _attach_handler(handler: logging.Handler) -> None:
+    with _handler_lock:
+        if not _handler_users.get(handler):
+            logging.getLogger().addHandler(handler)
+        _handler_users[handler] = _handler_users.get(handler, 0) + 1
+
+
+def _detach_handler(handler: logging.Handler) -> None:
+    with _handler_lock:
+        users = _handler_users.pop(handler, 1) - 1
+        if users:
+            _handler_users[handler] = users
+        else:
+            logging.getLogger().removeHandler(handler)
 
 
 class ScrapingWorker(QThread):
     progress = Signal(int, float, float)
     action_progress = Signal(str, int, int)
+    log_message = Signal(str)
+    crashed = Signal(int)
+    metrics_updated = Signal(object)
+    item_result = Signal(object)
     finished = Signal()
 
     def __init__(
@@ -127,13 +208,42 @@ class ScrapingWorker(QThread):
         batch_size: int,
         session_paths: dict,
         headless: bool = False,
+        log_handler: logging.Handler | None = None,
+        isolated: bool = False,
+        append: bool = False,
+        metrics_path: str | None = None,
+        slots=None,
+        name: str = "",
     ) -> None:
         """Run scraping operations in a background thread.
 
+        Progress comes from the typed events of the core functions (see
+        ``core.progress``); log records are forwarded to ``log_message``.
+        The item events of the page actions are sent by ``item_result``.
+        ``cancel`` pauses, resumes or stops the run between two products.
+
         Parameters
         ----------
         headless : bool, optional
             Launch Selenium in headless mode when ``True``.
+        log_handler : logging.Handler, optional
+            Receives the log records of the run instead of ``log_message``,
+            e.g. the buffer of a :class:`~ui.widgets.LogView`.
+        isolated : bool, optional
+            Scrape in a child process (``core.session.SessionProcess``);
+            this thread only relays its events. A crash of the child is
+            reported by ``crashed`` with its exit code.
+        append : bool, optional
+            Complete the spreadsheets of a previous run.
+        metrics_path : str, optional
+            JSON file receiving the metrics of the run when it ends (see
+            ``core.metrics``); ``metrics_updated`` sends them live.
+        slots : core.jobs.DownloadSlots, optional
+            Download slots shared with the other sessions of the queue
+            (``core.jobs.JobQueue.download_slots``), isolated runs only.
+        name : str, optional
+            Prefix of the log lines of an isolated run, to tell the
+            sessions of the queue apart.
         """
         super().__init__()
         self.links_file = links_file
@@ -142,9 +252,18 @@ class ScrapingWorker(QThread):
         self.batch_size = batch_size
         self.session_paths = session_paths
         self.headless = headless
-
-        self.emitter = EmittingStream()
-        self.emitter.text_written.connect(self.handle_output)
+        self.log_handler = log_handler
+        self.isolated = isolated
+        self.append = append
+        self.metrics_path = metrics_path
+        self.slots = slots
+        self.name = name
+        self.metrics = SessionMetrics()
+        self.cancel = CancelToken(
+            multiprocessing.get_context("spawn") if isolated else None
+        )
+        self.crash_code: int | None = None
+        self.finished_items: dict[str, set[str]] = {}
 
         self.totals: dict[str, int] = {}
         if actions.get("variantes"):
@@ -156,107 +275,148 @@ class ScrapingWorker(QThread):
 
         self.total = sum(self.totals.values()) or 1
         self.completed_totals = {k: 0 for k in self.totals}
-        self.current_action: str | None = None
         self.overall_completed = 0
-        self._buffer = ""
-
-    def handle_output(self, text: str) -> None:
-        """Accumulate output until newline and parse completed lines."""
-        self._buffer += text
-        if "\n" in self._buffer:
-            lines = self._buffer.split("\n")
-            self._buffer = lines[-1]
-            for line in lines[:-1]:
-                self.parse_line(line)
-
-    def parse_line(self, line: str) -> None:
-        """Interpret stdout lines to update progress."""
-        match = re.search(r"\[(\d+)/(\d+)\]", line)
-        if match:
-            self.update_action(int(match.group(1)))
-            self.increment_progress()
-            return
-        match = re.search(r"📦\s*(\d+)\s*/", line)
-        if match:
-            self.update_action(int(match.group(1)))
-            self.increment_progress()
-            return
-        clean = line.lstrip()
-        if clean.startswith("✅") or clean.startswith("❌") or clean.startswith("⚠️") or "Erreur" in line:
-            current = self.completed_totals.get(self.current_action, 0)
-            self.update_action(current + 1)
-            self.increment_progress()
+        self.started_at = time.time()
 
-    def update_action(self, value: int) -> None:
-        if not self.current_action:
-            return
-        if value <= self.completed_totals[self.current_action]:
+    def handle_event(self, event: ProgressEvent) -> None:
+        """Update the progress from an event of the core functions."""
+        action = event.action
+        if action not in self.totals:
             return
-        self.completed_totals[self.current_action] = value
-        total = self.totals[self.current_action]
-        self.action_progress.emit(self.current_action, value, total)
+        self.metrics.add(event)
+        if event.kind in (ITEM_STARTED, ITEM_FINISHED) and action != "export":
+            self.item_result.emit(event)
+        if event.kind == STARTED and event.total != self.totals[action]:
+            # The export total depends on the files actually scraped.
+            self.total += event.total - self.totals[action]
+            self.total = max(self.total, 1)
+            self.totals[action] = event.total
+            self.action_progress.emit(
+                action, self.completed_totals[action], event.total
+            )
+        elif event.kind == ITEM_FINISHED:
+            self.finished_items.setdefault(action, set()).add(event.item)
+            done = self.completed_totals[action] + 1
+            self.completed_totals[action] = done
+            self.action_progress.emit(action, done, self.totals[action])
+            self.increment_progress()
+            self.metrics_updated.emit(self.metrics.snapshot())
 
     def increment_progress(self) -> None:
         self.overall_completed += 1
-        elapsed = time.time() - self.start
-        avg = elapsed / self.overall_completed if self.overall_completed else 0
-        remaining = max(self.total - self.overall_completed, 0) * avg
+        elapsed = time.time() - self.started_at
+        remaining = self.metrics.eta()
+        if remaining is None:
+            avg = elapsed / self.overall_completed if self.overall_completed else 0
+            remaining = max(self.total - self.overall_completed, 0) * avg
         percent = int((self.overall_completed / self.total) * 100)
         self.progress.emit(percent, elapsed, remaining)
 
+    def remaining_ids(self) -> list[str]:
+        """Return the IDs not done by every page action of the run."""
+        page_actions = [
+            a for a in ("variantes", "fiches") if self.actions.get(a)
+        ]
+        if not page_actions:
+            return list(self.ids)
+        done = [self.finished_items.get(a, set()) for a in page_actions]
+        return [i for i in self.ids if any(i not in d for d in done)]
+
+    def job(self) -> dict:
+        """Arguments of :func:`core.session.run_session` for this run."""
+        return dict(
+            links_file=self.links_file,
+            ids=self.ids,
+            actions=self.actions,
+            batch_size=self.batch_size,
+            paths=self.session_paths,
+            headless=self.headless,
+            append=self.append,
+        )
+
+    def _run_in_process(self) -> None:
+        session = SessionProcess(self.job(), self.cancel, slots=self.slots)
+        session.start()
+        for kind, payload in session.messages():
+            if kind == EVENT:
+                self.handle_event(payload)
+            elif kind == LOG:
+                if self.name:
+                    payload.msg = f"[{self.name}] {payload.getMessage()}"
+                    payload.args = None
+                logging.getLogger(payload.name).handle(payload)
+            elif kind == CRASHED:
+                self.crash_code = payload
+                logger.error(
+                    "Le processus de scraping s'est arrêté (code %s)",
+                    payload,
+                )
+                self.crashed.emit(payload)
+
     def run(self) -> None:
-        old_stdout = sys.stdout
-        sys.stdout = self.emitter
-        for h in logging.getLogger().handlers:
-            if isinstance(h, logging.StreamHandler):
-                h.stream = sys.stdout
-        self.start = time.time()
+        handler = self.log_handler or SignalLogHandler(self.log_message)
+        _attach_handler(handler)
+        self.started_at = time.time()
         try:
-            id_url_map = charger_liens_avec_id_fichier(self.links_file)
-            if not self.ids:
-                logger.warning("Aucun ID valide fourni. Abandon...")
-                return
-            if self.actions.get("variantes"):
-                self.current_action = "variantes"
-                var_dir = self.session_paths["variantes"]
-                os.makedirs(var_dir, exist_ok=True)
-                scrap_produits_par_ids(
-                    id_url_map,
-                    self.ids,
-                    var_dir,
-                    headless=self.headless,
-                )
-            if self.actions.get("fiches"):
-                self.current_action = "fiches"
-                fc_dir = self.session_paths["fiches"]
-                os.makedirs(fc_dir, exist_ok=True)
-                scrap_fiches_concurrents(
-                    id_url_map,
-                    self.ids,
-                    fc_dir,
-                    headless=self.headless,
+            if self.isolated:
+                self._run_in_process()
+            else:
+                run_session(
+                    **self.job(),
+                    progress=self.handle_event,
+                    cancel=self.cancel,
                 )
-            if self.actions.get("export"):
-                self.current_action = "export"
-                fc_dir = self.session_paths["fiches"]
-                os.makedirs(fc_dir, exist_ok=True)
-                export_fiches_concurrents_json(fc_dir, self.batch_size)
         finally:
-            self.current_action = None
-            self.increment_progress()
-            sys.stdout = old_stdout
-            for h in logging.getLogger().handlers:
-                if isinstance(h, logging.StreamHandler):
-                    h.stream = sys.stdout
-            if self.overall_completed < self.total:
+            if self.cancel.cancelled:
+                logger.warning(
+                    "Opérations arrêtées: %d/%d",
+                    self.overall_completed,
+                    self.total,
+                )
+            elif self.crash_code is None and (
+                self.overall_completed < self.total
+            ):
                 logger.warning(
                     "Progress incomplet: %d/%d", self.overall_completed, self.total
                 )
-            elapsed = time.time() - self.start
+            if self.metrics_path:
+                try:
+                    self.metrics.save(self.metrics_path)
+                except OSError as e:
+                    logger.error(
+                        "Impossible d'enregistrer les métriques: %s", e
+                    )
+            _detach_handler(handler)
+            elapsed = time.time() - self.started_at
             self.progress.emit(100, elapsed, 0.0)
             self.finished.emit()
 
 
+class IdLoader(QThread):
+    """Read a links file and sort its IDs off the GUI thread.
+
+    ``failed`` sends the path and the error message when the file cannot
+    be read (encoding, missing ``openpyxl``, malformed CSV...).
+    """
+
+    loaded = Signal(str, object, object)
+    failed = Signal(str, str)
+
+    def __init__(self, path: str, parent=None) -> None:
+        super().__init__(parent)
+        self.path = path
+
+    def run(self) -> None:
+        try:
+            id_url_map = charger_liens_avec_id_fichier(self.path)
+            index = IdIndex(id_url_map)
+        except Exception as e:
+            logger.exception("Lecture du fichier de liens %s", self.path)
+            self.failed.emit(self.path, str(e) or type(e).__name__)
+            return
+        self.loaded.emit(self.path, id_url_map, index)
+
+
 class PipInstaller(QThread):
     """Install Python packages in a separate thread."""
 
@@ -293,23 +453,51 @@ class MainWindow(QMainWindow):
 
         self.links_path = ""
         self.id_url_map: dict[str, str] = {}
+        self.id_index = IdIndex()
         self.all_ids: list[str] = []
         self.selected_ids: list[str] = []
-        self.internal_logs: list[str] = []
-
-        tabs = QTabWidget()
-        tabs.setTabPosition(QTabWidget.West)
-        tabs.addTab(self._build_scraping_tab(), "Scraping")
-        tabs.addTab(self._build_settings_tab(), "Paramètres")
-        tabs.addTab(self._build_update_tab(), "Mise à jour")
-        tabs.addTab(self._build_guide_tab(), "Guide")
-        self.setCentralWidget(tabs)
+        self.id_loader = None
+        self._syncing_ids = False
+        # Sessions of the queue, in the order of the sessions table.
+        self.jobs = JobQueue()
+        self.job_list: list[Job] = []
+        self.job_controls: dict[int, tuple] = {}
+
+        self.tabs = QTabWidget()
+        self.tabs.setTabPosition(QTabWidget.West)
+        # Called once, when their tab is first shown.
+        self._on_first_show: dict[int, Callable[[], None]] = {}
+        self.tabs.addTab(self._build_scraping_tab(), "Scraping")
+        # The scraping tab reads the settings widgets: built now, but the
+        # dependency check waits for the tab to be shown.
+        index = self.tabs.addTab(self._build_settings_tab(), "Paramètres")
+        self._on_first_show[index] = self.refresh_deps_status
+        self._add_lazy_tab(self._build_update_tab, "Mise à jour")
+        self._add_lazy_tab(self._build_guide_tab, "Guide")
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+        self.setCentralWidget(self.tabs)
 
         self.repo_dir = os.path.dirname(os.path.abspath(__file__))
 
+        # Focused session: its progress and metrics fill the tab.
         self.worker = None
 
     # ---------- UI builders ----------
+    def _add_lazy_tab(self, builder, title: str) -> None:
+        """Add a tab whose content *builder* makes on first display."""
+        page = QWidget()
+        page_layout = QVBoxLayout(page)
+        page_layout.setContentsMargins(0, 0, 0, 0)
+        index = self.tabs.addTab(page, title)
+        self._on_first_show[index] = (
+            lambda: page_layout.addWidget(builder())
+        )
+
+    def _on_tab_changed(self, index: int) -> None:
+        action = self._on_first_show.pop(index, None)
+        if action is not None:
+            action()
+
     def _build_scraping_tab(self) -> QWidget:
         widget = QWidget()
         layout = QVBoxLayout(widget)
@@ -325,7 +513,7 @@ class MainWindow(QMainWindow):
 
         range_layout = QHBoxLayout()
         self.min_id_edit = QLineEdit()
-        self.min_id_edit.setPlaceholderText("ID min")
+        self.min_id_edit.setPlaceholderText("ID min ou préfixe*")
         self.max_id_edit = QLineEdit()
         self.max_id_edit.setPlaceholderText("ID max")
         self.min_id_edit.textChanged.connect(self.update_range)
@@ -350,6 +538,20 @@ class MainWindow(QMainWindow):
         self.count_label.setAlignment(Qt.AlignRight)
         layout.addWidget(self.count_label)
 
+        self.ids_progress = QProgressBar()
+        # Busy indicator while a links file loads.
+        self.ids_progress.setRange(0, 0)
+        self.ids_progress.setFormat("Chargement des liens…")
+        self.ids_progress.setVisible(False)
+        layout.addWidget(self.ids_progress)
+
+        self.id_list = IdListView()
+        self.id_list.setMaximumHeight(120)
+        self.id_list.selectionModel().selectionChanged.connect(
+            self.on_id_list_selection
+        )
+        layout.addWidget(self.id_list)
+
         action_layout = QHBoxLayout()
         self.btn_variantes = QToolButton()
         self.btn_variantes.setCheckable(True)
@@ -394,7 +596,36 @@ class MainWindow(QMainWindow):
 
         self.launch_btn = QPushButton(qta.icon("fa5s.play"), "Lancer")
         self.launch_btn.clicked.connect(self.start_actions)
-        layout.addWidget(self.launch_btn)
+        self.pause_btn = QPushButton(qta.icon("fa5s.pause"), "Pause")
+        self.pause_btn.setCheckable(True)
+        self.pause_btn.toggled.connect(self.toggle_pause)
+        self.stop_btn = QPushButton(qta.icon("fa5s.stop"), "Arrêter")
+        self.stop_btn.clicked.connect(self.stop_actions)
+        run_layout = QHBoxLayout()
+        run_layout.addWidget(self.launch_btn, 1)
+        run_layout.addWidget(self.pause_btn)
+        run_layout.addWidget(self.stop_btn)
+        layout.addLayout(run_layout)
+        self._set_running(False)
+
+        self.jobs_table = QTableWidget(0, 4)
+        self.jobs_table.setObjectName("jobs_table")
+        self.jobs_table.setHorizontalHeaderLabels(
+            ["Session", "État", "Progression", ""]
+        )
+        self.jobs_table.verticalHeader().setVisible(False)
+        self.jobs_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.Stretch
+        )
+        self.jobs_table.horizontalHeader().setSectionResizeMode(
+            3, QHeaderView.ResizeToContents
+        )
+        self.jobs_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.jobs_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.jobs_table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.jobs_table.itemSelectionChanged.connect(self.on_job_selected)
+        self.jobs_table.setMaximumHeight(120)
+        layout.addWidget(self.jobs_table)
 
         self.progress = AnimatedProgressBar()
         progress_line = QHBoxLayout()
@@ -414,7 +645,27 @@ class MainWindow(QMainWindow):
         )
         self.results_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.results_table.setSelectionMode(QAbstractItemView.NoSelection)
-        layout.addWidget(self.results_table)
+
+        self.metrics_table = QTableWidget(0, len(METRICS_COLUMNS))
+        self.metrics_table.setObjectName("metrics_table")
+        self.metrics_table.setHorizontalHeaderLabels(
+            [label for label, _ in METRICS_COLUMNS]
+        )
+        self.metrics_table.verticalHeader().setVisible(False)
+        self.metrics_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.Stretch
+        )
+        self.metrics_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.metrics_table.setSelectionMode(QAbstractItemView.NoSelection)
+
+        self.id_results = ResultsView()
+        self.id_results.retry_requested.connect(self.retry_failed)
+
+        self.details_tabs = QTabWidget()
+        self.details_tabs.addTab(self.results_table, "Actions")
+        self.details_tabs.addTab(self.id_results, "Produits")
+        self.details_tabs.addTab(self.metrics_table, "Mesures")
+        layout.addWidget(self.details_tabs)
 
         self.toggle_log_btn = QToolButton()
         self.toggle_log_btn.setIcon(qta.icon("fa5s.book"))
@@ -441,12 +692,9 @@ class MainWindow(QMainWindow):
         log_btn_layout.addWidget(self.clear_log_btn)
         layout.addLayout(log_btn_layout)
 
-        self.log_area = QTextEdit()
-        self.log_area.setObjectName("logArea")
-        self.log_area.setReadOnly(True)
-        self.log_area.setLineWrapMode(QTextEdit.NoWrap)
-        self.log_area.setVisible(False)
-        layout.addWidget(self.log_area)
+        self.log_view = LogView(LOG_FILE)
+        self.log_view.setVisible(False)
+        layout.addWidget(self.log_view)
 
         return widget
 
@@ -506,6 +754,26 @@ class MainWindow(QMainWindow):
         batch_layout.addWidget(self.batch_spin)
         layout.addLayout(batch_layout)
 
+        budget_layout = QHBoxLayout()
+        budget_layout.addWidget(QLabel("Sessions simultanées :"))
+        self.drivers_spin = QSpinBox()
+        self.drivers_spin.setRange(1, 8)
+        self.drivers_spin.setValue(DEFAULT_DRIVERS)
+        self.drivers_spin.setToolTip(
+            "Navigateurs Chrome ouverts en même temps par la file"
+        )
+        budget_layout.addWidget(self.drivers_spin)
+        budget_layout.addWidget(QLabel("Téléchargements simultanés :"))
+        self.downloads_spin = QSpinBox()
+        self.downloads_spin.setRange(1, 16)
+        self.downloads_spin.setValue(DEFAULT_DOWNLOADS)
+        self.downloads_spin.setToolTip(
+            "Pages et images chargées en même temps par toutes les sessions"
+        )
+        budget_layout.addWidget(self.downloads_spin)
+        budget_layout.addStretch(1)
+        layout.addLayout(budget_layout)
+
         self.cb_headless = QCheckBox("Scraping silencieux (headless)")
 
         self.theme_toggle = QToolButton()
@@ -557,7 +825,6 @@ class MainWindow(QMainWindow):
 
         layout.addWidget(deps_group)
         self.required_packages = self._load_requirements()
-        self.refresh_deps_status()
         layout.addStretch(1)
         return widget
 
@@ -604,6 +871,11 @@ class MainWindow(QMainWindow):
    - Sélectionnez la plage d'IDs à traiter.
    - Activez les fonctionnalités désirées.
    - Appuyez sur Lancer pour démarrer.
+   - Chaque clic sur Lancer ajoute une session à la file : les sessions
+     tournent en même temps dans la limite des navigateurs et des
+     téléchargements réglés dans les Paramètres, les autres attendent.
+   - Chaque session a sa ligne (état, progression, pause, arrêt) ; cliquez
+     sur une ligne pour afficher sa progression et ses mesures.
 
 3. Dépendances et installation automatique :
    - Le statut de chaque module apparaît en vert ou rouge.
@@ -620,7 +892,9 @@ La barre de progression et le minuteur indiquent l'avancement."""
 
     # ---------- Slots ----------
     def browse_links_settings(self) -> None:
-        file_filter = "Text files (*.txt);;All files (*)"
+        file_filter = (
+            "Fichiers de liens (*.txt *.csv *.tsv *.xlsx);;All files (*)"
+        )
         path, _ = QFileDialog.getOpenFileName(
             self,
             "Fichier de liens",
@@ -633,18 +907,50 @@ La barre de progression et le minuteur indiquent l'avancement."""
             self.load_ids(path)
 
     def load_ids(self, path: str) -> None:
-        def natural_key(s: str) -> list:
-            return [
-                int(t) if t.isdigit() else t
-                for t in re.split(r"(\d+)", s)
-            ]
-
-        self.id_url_map = charger_liens_avec_id_fichier(path)
-        self.all_ids = sorted(self.id_url_map.keys(), key=natural_key)
+        """Load the IDs of *path* in the background."""
+        self.ids_progress.setVisible(True)
+        self.launch_btn.setEnabled(False)
+        # Owned by the window: a replaced loader may still be running.
+        self.id_loader = IdLoader(path, self)
+        self.id_loader.loaded.connect(self.on_ids_loaded)
+        self.id_loader.failed.connect(self.on_ids_failed)
+        self.id_loader.finished.connect(self.id_loader.deleteLater)
+        self.id_loader.start()
+
+    def on_ids_loaded(
+        self, path: str, id_url_map: LinkMap, index: IdIndex
+    ) -> None:
+        if path != self.links_edit.text():
+            # Another file was picked in the meantime.
+            return
+        self.ids_progress.setVisible(False)
+        self.launch_btn.setEnabled(True)
+        self.id_url_map = id_url_map
+        self.id_index = index
+        self.all_ids = index.ids
+        self.id_list.id_model.set_index(index)
         self.total_links_label.setText(
             f"Nombre de liens total : {len(self.all_ids)}"
         )
         self.clear_selection()
+        if not id_url_map.report.ok:
+            self.statusBar().showMessage(
+                f"Fichier de liens : {id_url_map.report.summary()}", 10000
+            )
+
+    def on_ids_failed(self, path: str, message: str) -> None:
+        if path != self.links_edit.text():
+            return
+        self.ids_progress.setVisible(False)
+        self.launch_btn.setEnabled(True)
+        self.statusBar().showMessage(
+            f"Fichier de liens illisible : {message}", 10000
+        )
+        QMessageBox.critical(
+            self,
+            "Erreur",
+            f"Impossible de lire le fichier de liens :\n{path}\n\n{message}",
+        )
 
     def browse_dir(self) -> None:
         path = QFileDialog.getExistingDirectory(
@@ -658,18 +964,30 @@ La barre de progression et le minuteur indiquent l'avancement."""
     def save_settings(self) -> None:
         QMessageBox.information(self, "Sauvegardé", "Paramètres enregistrés")
 
-    def update_range(self) -> None:
+    def selected_span(self) -> tuple[int, int] | None:
+        """Return the positions of the IDs chosen in the range fields.
+
+        ``B*`` in the first field alone selects the IDs starting with
+        ``B``.
+        """
         start = self.min_id_edit.text().strip().upper()
         end = self.max_id_edit.text().strip().upper()
-        if start and end and start in self.all_ids and end in self.all_ids:
-            i1 = self.all_ids.index(start)
-            i2 = self.all_ids.index(end)
-            if i1 <= i2:
-                self.selected_ids = self.all_ids[i1:i2 + 1]
-            else:
-                self.selected_ids = self.all_ids[i2:i1 + 1]
-        else:
-            self.selected_ids = []
+        if start.endswith("*") and not end:
+            try:
+                return self.id_index.prefix_span(start[:-1])
+            except ValueError:
+                return None
+        if start and end:
+            return self.id_index.span(start, end)
+        return None
+
+    def update_range(self) -> None:
+        span = self.selected_span()
+        self.selected_ids = self.id_index.slice(span)
+        if not self._syncing_ids:
+            self._syncing_ids = True
+            self.id_list.show_span(span)
+            self._syncing_ids = False
         self.count_label.setText(
             "IDs sélectionnés : "
             f"{len(self.selected_ids)} / {len(self.all_ids)}"
@@ -687,11 +1005,25 @@ La barre de progression et le minuteur indiquent l'avancement."""
         self.min_id_edit.clear()
         self.max_id_edit.clear()
         self.selected_ids = []
+        self.id_list.show_span(None)
         self.count_label.setText(
             f"IDs sélectionnés : 0 / {len(self.all_ids)}"
         )
         self.update_export_estimate()
 
+    def on_id_list_selection(self) -> None:
+        """Use the rows picked in the ID list as the range bounds."""
+        if self._syncing_ids:
+            return
+        bounds = self.id_list.selected_bounds()
+        if bounds is None:
+            return
+        self._syncing_ids = True
+        self.min_id_edit.setText(self.id_index[bounds[0]])
+        self.max_id_edit.setText(self.id_index[bounds[1]])
+        self._syncing_ids = False
+        self.update_range()
+
     def update_export_estimate(self) -> None:
         if not self.selected_ids:
             self.status_export.setText("")
@@ -719,34 +1051,137 @@ La barre de progression et le minuteur indiquent l'avancement."""
         sub = self.subdir_edit.text().strip()
         if sub:
             output_dir = os.path.join(output_dir, sub)
-        batch_size = self.batch_spin.value()
-        self.paths = {
+        paths = {
             "variantes": os.path.join(output_dir, "variantes"),
             "fiches": os.path.join(output_dir, "fiches_concurrents"),
         }
-        self.launch_btn.setEnabled(False)
-        self.progress.setValue(0)
+        if not self.jobs.running():
+            self.log_view.clear()
+        self.submit_job(
+            dict(
+                links_file=self.links_path,
+                ids=list(self.selected_ids),
+                actions=actions,
+                batch_size=self.batch_spin.value(),
+                session_paths=paths,
+                headless=self.cb_headless.isChecked(),
+            ),
+            output_dir,
+        )
+
+    def submit_job(
+        self, params: dict, output_dir: str, append: bool = False
+    ) -> Job:
+        """Queue a session and start it once the budget allows it.
+
+        *params* are the arguments of :class:`ScrapingWorker` but the log
+        handler and the shared resources.
+        """
+        actions = params["actions"]
+        page = actions.get("variantes") or actions.get("fiches")
+        name = (
+            f"{os.path.basename(params['links_file'])} → "
+            f"{os.path.basename(output_dir.rstrip(os.sep)) or output_dir} "
+            f"({len(params['ids'])} IDs)"
+        )
+        job = self.jobs.submit(
+            Job(name, dict(params, append=append), drivers=1 if page else 0)
+        )
+        job.params["metrics_path"] = os.path.join(
+            output_dir,
+            f"metriques_{time.strftime('%Y%m%d_%H%M%S')}_{job.id}.json",
+        )
+        self._add_job_row(job)
+        self.jobs.set_budget(
+            ResourceBudget(
+                self.drivers_spin.value(), self.downloads_spin.value()
+            )
+        )
+        self._schedule_jobs()
+        return job
+
+    def _schedule_jobs(self, started: list[Job] | None = None) -> None:
+        for job in self.jobs.schedule() if started is None else started:
+            self._start_worker(job)
+
+    def _add_job_row(self, job: Job) -> None:
+        row = self.jobs_table.rowCount()
+        self.jobs_table.insertRow(row)
+        self.job_list.append(job)
+        self.jobs_table.setItem(row, 0, QTableWidgetItem(job.name))
+        self.jobs_table.setItem(row, 1, QTableWidgetItem("En attente"))
+        bar = QProgressBar()
+        bar.setValue(0)
+        self.jobs_table.setCellWidget(row, 2, bar)
+        pause = QToolButton()
+        pause.setIcon(qta.icon("fa5s.pause"))
+        pause.setToolTip("Pause")
+        pause.setCheckable(True)
+        pause.setEnabled(False)
+        pause.toggled.connect(
+            lambda paused, job=job: self.pause_job(job, paused)
+        )
+        stop = QToolButton()
+        stop.setIcon(qta.icon("fa5s.stop"))
+        stop.setToolTip("Arrêter ou retirer de la file")
+        stop.clicked.connect(lambda _=False, job=job: self.stop_job(job))
+        controls = QWidget()
+        controls_layout = QHBoxLayout(controls)
+        controls_layout.setContentsMargins(0, 0, 0, 0)
+        controls_layout.addWidget(pause)
+        controls_layout.addWidget(stop)
+        self.jobs_table.setCellWidget(row, 3, controls)
+        self.job_controls[job.id] = (bar, pause, stop)
+
+    def _set_job_state(self, job: Job, text: str) -> None:
+        row = self.job_list.index(job)
+        self.jobs_table.item(row, 1).setText(text)
+
+    def _job_of(self, worker) -> Job | None:
+        for job in self.job_list:
+            if job.worker is worker:
+                return job
+        return None
+
+    def _start_worker(self, job: Job) -> None:
+        """Scrape the IDs of *job* in a child process, see
+        :class:`ScrapingWorker`."""
+        os.makedirs(
+            os.path.dirname(job.params["metrics_path"]), exist_ok=True
+        )
+        worker = ScrapingWorker(
+            **job.params,
+            log_handler=self.log_view.buffer,
+            isolated=True,
+            slots=self.jobs.download_slots(),
+            name=f"#{job.id}",
+        )
+        job.worker = worker
+        worker.progress.connect(self._on_worker_progress)
+        worker.metrics_updated.connect(self._on_worker_metrics)
+        worker.item_result.connect(self._on_item_result)
+        worker.action_progress.connect(self._on_worker_action)
+        worker.finished.connect(self.on_finished)
+        self._set_job_state(job, "En cours")
+        self.job_controls[job.id][1].setEnabled(True)
+        worker.start()
+        focused = self._job_of(self.worker)
+        if focused is None or focused.state != RUNNING:
+            self.focus_job(job)
+
+    def focus_job(self, job: Job) -> None:
+        """Show the progress and metrics of *job* in the tab."""
+        worker = job.worker
+        if worker is None:
+            return
+        self.worker = worker
         self.status_var.setText("")
         self.status_fiche.setText("")
         self.status_export.setText("")
-        self.log_area.clear()
         self.results_table.clearContents()
-        self.results_table.setRowCount(0)
-        self.worker = ScrapingWorker(
-            self.links_path,
-            self.selected_ids,
-            actions,
-            batch_size,
-            self.paths,
-            headless=self.cb_headless.isChecked(),
-        )
-        self.worker.progress.connect(self.update_progress)
-        self.worker.action_progress.connect(self.update_action_status)
-        self.worker.finished.connect(self.on_finished)
-        self.worker.emitter.text_written.connect(self.append_log)
         self.action_rows = {}
-        self.results_table.setRowCount(len(self.worker.totals))
-        for row, (action, total) in enumerate(self.worker.totals.items()):
+        self.results_table.setRowCount(len(worker.totals))
+        for row, (action, total) in enumerate(worker.totals.items()):
             self.action_rows[action] = row
             self.results_table.setItem(
                 row,
@@ -758,8 +1193,142 @@ La barre de progression et le minuteur indiquent l'avancement."""
                 1,
                 QTableWidgetItem(f"0/{total}"),
             )
-            self.update_action_status(action, 0, total)
-        self.worker.start()
+            self.update_action_status(
+                action, worker.completed_totals[action], total
+            )
+        self.metrics_table.setRowCount(0)
+        self.update_metrics(worker.metrics.snapshot())
+        self.progress.setValue(
+            int(worker.overall_completed / worker.total * 100)
+        )
+        self._set_running(job.state == RUNNING)
+        self.pause_btn.blockSignals(True)
+        self.pause_btn.setChecked(worker.cancel.paused)
+        self.pause_btn.blockSignals(False)
+        row = self.job_list.index(job)
+        if self.jobs_table.currentRow() != row:
+            self.jobs_table.selectRow(row)
+
+    def on_job_selected(self) -> None:
+        row = self.jobs_table.currentRow()
+        if 0 <= row < len(self.job_list):
+            self.focus_job(self.job_list[row])
+
+    def _on_worker_progress(
+        self, percent: int, elapsed: float, remaining: float
+    ) -> None:
+        worker = self.sender()
+        job = self._job_of(worker)
+        if job is not None:
+            self.job_controls[job.id][0].setValue(percent)
+        if worker is self.worker:
+            self.update_progress(percent, elapsed, remaining)
+
+    def _on_worker_action(self, action: str, done: int, total: int) -> None:
+        if self.sender() is self.worker:
+            self.update_action_status(action, done, total)
+
+    def _on_worker_metrics(self, snapshot: dict) -> None:
+        if self.sender() is self.worker:
+            self.update_metrics(snapshot)
+
+    def _on_item_result(self, event: ProgressEvent) -> None:
+        job = self._job_of(self.sender())
+        self.id_results.queue(event, job.id if job else 0)
+
+    def retry_failed(self, results: list) -> None:
+        """Queue the failed *results* again, one session per session of
+        origin, with only the actions which failed; their rows follow the
+        new session."""
+        by_session: dict[int, list] = {}
+        for result in results:
+            by_session.setdefault(result.session, []).append(result)
+        jobs = {job.id: job for job in self.job_list}
+        for session, failed in by_session.items():
+            job = jobs.get(session)
+            if job is None:
+                continue
+            ids = list(dict.fromkeys(r.item for r in failed))
+            actions = {r.action: True for r in failed}
+            retry = self.submit_job(
+                dict(job.params, ids=ids, actions=actions),
+                os.path.dirname(job.params["metrics_path"]),
+                append=True,
+            )
+            self.id_results.model.move(failed, retry.id)
+            self.append_log(
+                f"🔁 [#{job.id}] {len(ids)} produit(s) relancé(s)\n"
+            )
+
+    def _set_running(self, running: bool) -> None:
+        self.pause_btn.setEnabled(running)
+        self.stop_btn.setEnabled(running)
+        if not running:
+            self.pause_btn.blockSignals(True)
+            self.pause_btn.setChecked(False)
+            self.pause_btn.setText("Pause")
+            self.pause_btn.setIcon(qta.icon("fa5s.pause"))
+            self.pause_btn.blockSignals(False)
+
+    def pause_job(self, job: Job, paused: bool) -> None:
+        if job.worker is None or job.state != RUNNING:
+            return
+        pause = self.job_controls[job.id][1]
+        pause.blockSignals(True)
+        pause.setChecked(paused)
+        pause.setIcon(qta.icon("fa5s.play" if paused else "fa5s.pause"))
+        pause.blockSignals(False)
+        if job.worker is self.worker:
+            self.pause_btn.blockSignals(True)
+            self.pause_btn.setChecked(paused)
+            self.pause_btn.blockSignals(False)
+        if paused:
+            job.worker.cancel.pause()
+            self.pause_btn.setText("Reprendre")
+            self.pause_btn.setIcon(qta.icon("fa5s.play"))
+            self._set_job_state(job, "En pause")
+            self.append_log(
+                f"⏸️ [#{job.id}] Pause après le produit en cours\n"
+            )
+        else:
+            job.worker.cancel.resume()
+            self.pause_btn.setText("Pause")
+            self.pause_btn.setIcon(qta.icon("fa5s.pause"))
+            self._set_job_state(job, "En cours")
+            self.append_log(f"▶️ [#{job.id}] Reprise\n")
+
+    def stop_job(self, job: Job) -> None:
+        """Stop *job*, or drop it from the queue if it did not start."""
+        if job.state == QUEUED:
+            if self.jobs.remove(job):
+                row = self.job_list.index(job)
+                self.jobs_table.removeRow(row)
+                del self.job_list[row]
+                del self.job_controls[job.id]
+            return
+        if job.worker is None or job.state != RUNNING:
+            return
+        job.worker.cancel.cancel()
+        _, pause, stop = self.job_controls[job.id]
+        pause.setEnabled(False)
+        stop.setEnabled(False)
+        self._set_job_state(job, "Arrêt demandé")
+        if job.worker is self.worker:
+            self.stop_btn.setEnabled(False)
+            self.pause_btn.setEnabled(False)
+        self.append_log(
+            f"⏹️ [#{job.id}] Arrêt demandé, fin du produit en cours...\n"
+        )
+
+    def toggle_pause(self, paused: bool) -> None:
+        job = self._job_of(self.worker)
+        if job is not None:
+            self.pause_job(job, paused)
+
+    def stop_actions(self) -> None:
+        job = self._job_of(self.worker)
+        if job is not None:
+            self.stop_job(job)
 
     def update_progress(
         self,
@@ -790,31 +1359,40 @@ La barre de progression et le minuteur indiquent l'avancement."""
             if item:
                 item.setText(f"{done}/{total}")
 
+    def update_metrics(self, snapshot: dict) -> None:
+        """Show the metrics of the run, one row per action and host."""
+        rows = [
+            (name.capitalize(), stats)
+            for name, stats in snapshot["actions"].items()
+        ] + list(snapshot["hosts"].items())
+        self.metrics_table.setRowCount(len(rows))
+        for row, (name, stats) in enumerate(rows):
+            values = [name] + [
+                format_value(stats) for _, format_value in METRICS_COLUMNS[1:]
+            ]
+            for column, value in enumerate(values):
+                item = self.metrics_table.item(row, column)
+                if item is None:
+                    item = QTableWidgetItem()
+                    self.metrics_table.setItem(row, column, item)
+                item.setText(value)
+
     def toggle_log(self, checked: bool) -> None:
-        self.log_area.setVisible(checked)
+        self.log_view.setVisible(checked)
 
     def copy_log(self) -> None:
-        """Copy the current log to the clipboard."""
+        """Copy the whole log, read from the log file, to the clipboard."""
         clipboard = QApplication.clipboard()
-        if self.log_area.isVisible():
-            text = self.log_area.toPlainText()
-        else:
-            text = "".join(self.internal_logs)
-        clipboard.setText(text)
+        clipboard.setText(self.log_view.full_text())
         self.statusBar().showMessage("Journal copié !", 3000)
 
     def clear_log(self) -> None:
-        """Erase the visible log and clear the internal buffer."""
-        self.log_area.clear()
-        self.internal_logs.clear()
+        """Erase the visible log and the log file."""
+        self.log_view.clear()
         self.statusBar().showMessage("Journal vidé !", 3000)
 
     def append_log(self, text: str) -> None:
-        self.internal_logs.append(text)
-        self.log_area.moveCursor(QTextCursor.End)
-        self.log_area.insertPlainText(text)
-        self.log_area.moveCursor(QTextCursor.End)
-        self.log_area.ensureCursorVisible()
+        self.log_view.append(text)
 
     def append_update_log(self, text: str, color: str = "white") -> None:
         cursor = self.update_log.textCursor()
@@ -933,8 +1511,50 @@ La barre de progression et le minuteur indiquent l'avancement."""
                     )
 
     def on_finished(self) -> None:
-        self.launch_btn.setEnabled(True)
-        QMessageBox.information(self, "Terminé", "Opérations terminées")
+        worker = self.sender() or self.worker
+        job = self._job_of(worker)
+        if job is None:
+            return
+        _, pause, stop = self.job_controls[job.id]
+        pause.setEnabled(False)
+        stop.setEnabled(False)
+        if worker.crash_code is not None:
+            self._set_job_state(job, f"Planté (code {worker.crash_code})")
+        elif worker.cancel.cancelled:
+            self._set_job_state(job, "Arrêté")
+        else:
+            self._set_job_state(job, "Terminé")
+        self._schedule_jobs(self.jobs.finish(job))
+        if worker is self.worker:
+            self._set_running(False)
+        if worker.crash_code is not None:
+            remaining = worker.remaining_ids()
+            answer = QMessageBox.question(
+                self,
+                "Processus arrêté",
+                f"La session {job.name} s'est arrêtée "
+                f"(code {worker.crash_code}).\n"
+                f"Relancer pour les {len(remaining)} produit(s) restant(s) ?",
+            )
+            if answer == QMessageBox.Yes and remaining:
+                self.submit_job(
+                    dict(job.params, ids=remaining),
+                    os.path.dirname(job.params["metrics_path"]),
+                    append=True,
+                )
+        elif self.jobs.running() or self.jobs.queued():
+            self.statusBar().showMessage(
+                f"Session terminée : {job.name}", 5000
+            )
+        elif worker.cancel.cancelled:
+            QMessageBox.information(
+                self,
+                "Arrêté",
+                "Opérations arrêtées, les produits terminés sont "
+                "sauvegardés",
+            )
+        else:
+            QMessageBox.information(self, "Terminé", "Opérations terminées")
 
     def _apply_stylesheet(self, path: str) -> None:
         try:
@@ -1027,6 +1647,8 @@ La barre de progression et le minuteur indiquent l'avancement."""
 
 
 def main() -> None:
+    from qt_material import apply_stylesheet
+
     logging.basicConfig(
         level=logging.INFO,
         handlers=[logging.StreamHandler(sys.stdout)],
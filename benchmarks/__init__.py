@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Ajoute le répertoire parent pour que les modules soient importables
+benchmarks_dir = os.path.dirname(__file__)
+parent_dir = os.path.abspath(os.path.join(benchmarks_dir, '..'))
+sys.path.insert(0, parent_dir)
@@ -0,0 +1,45 @@
+"""Compare the parser backends of ``scraper_universel`` on one page.
+
+Run with ``python -m benchmarks.backends [--cards N] [--repeat R]``. Each
+run parses the page from bytes and evaluates a mapping using the
+``first_paragraph``, ``raw_html`` and ``clean`` options, so parsing cost
+is included.
+"""
+
+import argparse
+
+from NEW_APPLICATION_EN_DEV import scraper_universel as su
+
+from benchmarks.mapping_engine import build_page, timed
+
+MAPPING = {
+    "title": "#content .c1 .t1",
+    "cards": ".card.c7 .inner",
+    "first": {"selector": ".c3 .inner", "first_paragraph": True},
+    "clean": {"selector": ".c5 p", "clean": True},
+    "raw": {"selector": ".c9 .inner", "raw_html": True},
+    "links": ".c11 a",
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    page = build_page(args.cards)
+    reference = su._extract_document(su._PageDocument(page), MAPPING, "bs4")
+    print(f"{len(page)} bytes, best of {args.repeat} runs")
+    for backend in su.available_backends():
+
+        def run() -> dict:
+            doc = su._PageDocument(page)
+            return su._extract_document(doc, MAPPING, backend)
+
+        assert run() == reference, backend
+        print(f"{backend:>10} {timed(run, args.repeat):>9.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Time the description block detection on a large product page.
+
+Run with ``python -m benchmarks.blocks [--size MB] [--legacy]``. The page
+mimics a saved shop page: mega menu, inline JSON state, a long product
+description, related products and a footer. ``--legacy`` also times the
+previous BeautifulSoup implementation (slow, quadratic).
+"""
+
+import argparse
+import json
+import time
+
+from bs4 import BeautifulSoup
+
+from core.blocks import find_blocks
+
+WORDS = "lampe laiton abat-jour chevet lumière douce salon".split()
+
+
+def build_page(size_mb: float) -> bytes:
+    """Return a product page of roughly *size_mb* megabytes."""
+
+    target = int(size_mb * 1_000_000)
+    menu = "".join(
+        f"<li class='menu-item'><a href='/c/{i}'>Catégorie {i}</a></li>"
+        for i in range(1500)
+    )
+    paragraphs = "".join(
+        "<p>" + " ".join(WORDS[(i + j) % len(WORDS)] for j in range(60))
+        + "</p>"
+        for i in range(40)
+    )
+    head = (
+        "<html><head><title>Lampe</title></head><body>"
+        f"<header class='site-header'><nav><ul>{menu}</ul></nav></header>"
+        "<main><div class='product'><div class='product__info'>"
+        "<h1>Lampe de chevet</h1><div class='product__description rte'>"
+        f"<div class='inner'><section>{paragraphs}</section></div>"
+        "</div></div></div><div class='related'>"
+    )
+    tail = (
+        "</div></main><footer class='footer'><div class='footer__text'>"
+        + " ".join(WORDS * 30)
+        + "</div></footer></body></html>"
+    )
+    cards = []
+    state = {"products": []}
+    size = len(head) + len(tail)
+    i = 0
+    while size < target:
+        card = (
+            f"<div class='card card--{i % 4}'><div class='card__media'>"
+            f"<img src='/img/{i}.jpg'></div><div class='card__info'>"
+            f"<span class='card__title'>Produit {i}</span>"
+            f"<span class='price'>{i},90 €</span></div></div>"
+        )
+        product = {"id": i, "title": f"Produit {i}", "tags": WORDS}
+        cards.append(card)
+        state["products"].append(product)
+        size += len(card) + len(json.dumps(product)) + 2
+        i += 1
+    script = (
+        "<script type='application/json'>" + json.dumps(state) + "</script>"
+    )
+    return (head + "".join(cards) + tail + script).encode("utf-8")
+
+
+def legacy_blocks(page: bytes) -> list:
+    soup = BeautifulSoup(page, "lxml")
+    ignored = {"footer", "nav", "header", "menu"}
+    found = []
+    for tag in soup.find_all(["div", "p", "section", "article", "span"]):
+        if any(parent.name in ignored for parent in tag.parents):
+            continue
+        text = tag.get_text(" ", strip=True)
+        if len(text.split()) > 80:
+            found.append(text)
+    return found
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=float, default=5.0)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+
+    page = build_page(args.size)
+    start = time.perf_counter()
+    blocks = find_blocks(page)
+    found = time.perf_counter()
+    for block in blocks:
+        block.snippet
+    shown = time.perf_counter()
+    selectors = [block.selector for block in blocks]
+    end = time.perf_counter()
+    print(f"{len(page) / 1e6:.1f} MB, {len(blocks)} blocks")
+    print(f"{'find_blocks':>12} {(found - start) * 1000:>9.1f}ms")
+    print(f"{'snippets':>12} {(shown - found) * 1000:>9.1f}ms")
+    print(f"{'selectors':>12} {(end - shown) * 1000:>9.1f}ms")
+    print(f"{'first':>12} {selectors[0]}" if selectors else "")
+    if args.legacy:
+        start = time.perf_counter()
+        texts = legacy_blocks(page)
+        print(f"{'legacy':>12} {(time.perf_counter() - start) * 1000:>9.1f}ms")
+        assert texts == [block.text for block in blocks]
+
+
+if __name__ == "__main__":
+    main()
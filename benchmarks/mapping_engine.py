@@ -0,0 +1,90 @@
+"""Compare per-field CSS evaluation with the single-walk mapping engine.
+
+Run with ``python -m benchmarks.mapping_engine [--cards N] [--repeat R]``.
+For each mapping size the page is parsed once and the mapping evaluated
+both ways; the per-field cost grows with the number of fields while the
+single walk stays close to the cost of one traversal.
+"""
+
+import argparse
+import time
+from typing import Callable, Dict
+
+from NEW_APPLICATION_EN_DEV import scraper_universel as su
+
+FIELD_COUNTS = (1, 3, 5, 10, 25, 50)
+
+
+def build_page(cards: int) -> bytes:
+    """Return a product listing with *cards* cards of nine elements."""
+
+    parts = ["<html><body><main id='content'>"]
+    for i in range(cards):
+        parts.append(
+            f"<div class='card c{i % 50} row'><div class='inner'>"
+            f"<span class='t{i % 30}'>title {i}</span>"
+            f"<p class='p{i % 40}'>text <b>bold</b><a href='#'>link</a></p>"
+            "<ul><li>a</li><li>b</li></ul></div></div>"
+        )
+    parts.append("</main></body></html>")
+    return "".join(parts).encode()
+
+
+def build_mapping(fields: int) -> Dict[str, str]:
+    """Return a mapping of *fields* descendant class selectors."""
+
+    return {
+        f"field{i}": f"#content .c{i % 50} .t{i % 30}"
+        for i in range(fields)
+    }
+
+
+def per_field(doc: su._PageDocument, mapping: Dict[str, str]) -> dict:
+    return {
+        field: su._extract_field(doc, selector)
+        for field, selector in mapping.items()
+    }
+
+
+def single_walk(doc: su._PageDocument, mapping: Dict[str, str]) -> dict:
+    engine = su.MultiSelector(mapping)
+    matches = engine.select(doc.tree)
+    return {
+        field: su._values_from_elements(elems, {})
+        for field, elems in matches.items()
+    }
+
+
+def timed(func: Callable[[], dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    doc = su._PageDocument(build_page(args.cards))
+    elements = sum(1 for _ in doc.tree.iter())
+    print(f"{elements} elements, best of {args.repeat} runs")
+    print(
+        f"{'fields':>6} {'per-field':>11} {'single walk':>12} {'speedup':>8}"
+    )
+    for count in FIELD_COUNTS:
+        mapping = build_mapping(count)
+        assert per_field(doc, mapping) == single_walk(doc, mapping)
+        slow = timed(lambda: per_field(doc, mapping), args.repeat)
+        fast = timed(lambda: single_walk(doc, mapping), args.repeat)
+        print(
+            f"{count:>6} {slow:>9.1f}ms {fast:>10.1f}ms {slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Throughput of description cleaning: historical loop vs compiled rules.
+
+Run with ``python -m benchmarks.text_cleaning [--count N] [--lines L]``.
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from core.text_cleaning import DEFAULT_KEYWORDS, TextCleaner
+
+WORDS = (
+    "lampe laiton abat-jour chevet lumière douce ampoule interrupteur "
+    "câble tissu finition brossée hauteur diamètre poids garantie"
+).split()
+BOILERPLATE = (
+    "Livraison offerte dès 50 euros d'achat en France métropolitaine",
+    "Retours gratuits sous 30 jours, contactez le Service Client",
+    "Paiement sécurisé par carte bancaire ou virement",
+)
+
+
+def legacy_clean(text: str) -> str:
+    """``clean_description`` as it was before the compiled pipeline."""
+
+    lines = text.splitlines()
+    return "\n".join(
+        line
+        for line in lines
+        if len(line.strip()) > 30
+        and not any(kw in line.lower() for kw in DEFAULT_KEYWORDS)
+    )
+
+
+def build_descriptions(count: int, lines: int) -> List[str]:
+    rng = random.Random(0)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(lines):
+            if rng.random() < 0.2:
+                parts.append(rng.choice(BOILERPLATE))
+            else:
+                words = rng.choices(WORDS, k=rng.randint(3, 14))
+                parts.append(" ".join(words))
+        texts.append("\n".join(parts))
+    return texts
+
+
+def measure(func: Callable[[List[str]], List[str]], texts: List[str]):
+    start = time.perf_counter()
+    func(texts)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=40)
+    args = parser.parse_args()
+
+    texts = build_descriptions(args.count, args.lines)
+    size = sum(len(t) for t in texts) / 1e6
+    cleaner = TextCleaner()
+    assert cleaner.clean_many(texts) == [legacy_clean(t) for t in texts]
+
+    print(f"{args.count} descriptions, {size:.1f} MB")
+    runs = (
+        ("legacy", lambda batch: [legacy_clean(t) for t in batch]),
+        ("compiled", cleaner.clean_many),
+        ("compiled+dedupe", TextCleaner(dedupe=True).clean_many),
+    )
+    for name, func in runs:
+        elapsed = measure(func, texts)
+        print(
+            f"{name:>16} {elapsed * 1000:>8.0f}ms "
+            f"{args.count / elapsed:>9.0f} desc/s {size / elapsed:>6.1f} MB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
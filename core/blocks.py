@@ -0,0 +1,337 @@
+"""Detection of the text blocks of a page, e.g. description candidates.
+
+:func:`find_blocks` parses the page with lxml and counts the words of
+every element in a single bottom-up pass: each element hands its counts
+(words, words inside links, elements and prose elements of its subtree)
+to its parent, so no text is extracted twice whatever the nesting depth.
+Only the blocks above the word threshold are kept; their text, snippet
+and CSS selector are built on first access, typically for the blocks
+actually displayed.
+
+:func:`rank_blocks` scores those blocks by content density and keeps the
+best ones. The score multiplies:
+
+- ``log(1 + words)``: longer texts first, with diminishing returns;
+- ``(1 - link density) ** 2``: menus and product grids are mostly links;
+- the text density (words per element), saturating around
+  ``DENSITY_HALF`` words per element;
+- the tag ratio: share of prose elements (``p``, ``li``, ``strong``...)
+  among the descendants, which layout containers lack;
+- a depth factor penalising the page wrappers right below ``<body>``.
+
+Nested blocks repeating most of the text of the block around them
+(``DUPLICATE_RATIO``) are collapsed into the best scored one.
+
+Word counts and texts follow ``BeautifulSoup.get_text(" ", strip=True)``:
+comments and the content of ``<script>``, ``<style>`` and ``<template>``
+are ignored.
+"""
+
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from lxml import etree, html
+
+from core.dom_index import DomIndex
+
+logger = logging.getLogger(__name__)
+
+BLOCK_TAGS = ("div", "p", "section", "article", "span")
+# Blocks inside these elements are page chrome, not content.
+IGNORED_TAGS = ("footer", "nav", "header", "menu")
+# Blocks need strictly more words than this.
+MIN_WORDS = 80
+SNIPPET_LENGTH = 200
+# Elements visited between two ``should_stop`` checks.
+_STOP_CHECK = 4096
+
+# Ranking, see the module docstring.
+TOP_K = 10
+DUPLICATE_RATIO = 0.9
+DENSITY_HALF = 4.0
+SHALLOW_DEPTH = 4
+
+_HIDDEN_TAGS = {"script", "style", "template"}
+_PROSE_TAGS = {
+    "p", "br", "li", "ul", "ol", "dl", "dt", "dd", "b", "strong", "i", "em",
+    "u", "h2", "h3", "h4", "h5", "h6", "blockquote", "table", "tr", "td",
+    "th",
+}
+
+
+class _Page:
+    """Parsed page shared by its blocks; the DOM index is built once.
+
+    Blocks may be read from several threads (a worker warming selectors
+    and the GUI), so the index is built under a lock.
+    """
+
+    def __init__(self, root: Any):
+        self.root = root
+        self._index: Optional[DomIndex] = None
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> DomIndex:
+        with self._lock:
+            if self._index is None:
+                self._index = DomIndex(self.root)
+            return self._index
+
+
+class Block:
+    """A candidate block: the element and the counts of its subtree."""
+
+    __slots__ = (
+        "element", "words", "link_words", "elements", "prose_elements",
+        "score", "_page", "_text", "_snippet", "_selector",
+    )
+
+    def __init__(
+        self,
+        element: Any,
+        words: int,
+        page: _Page,
+        link_words: int = 0,
+        elements: int = 1,
+        prose_elements: int = 0,
+    ):
+        self.element = element
+        self.words = words
+        self.link_words = link_words
+        self.elements = elements
+        self.prose_elements = prose_elements
+        # Set by rank_blocks.
+        self.score = 0.0
+        self._page = page
+        self._text: Optional[str] = None
+        self._snippet: Optional[str] = None
+        self._selector: Optional[str] = None
+
+    @property
+    def link_density(self) -> float:
+        return self.link_words / self.words if self.words else 0.0
+
+    @property
+    def text_density(self) -> float:
+        return self.words / self.elements
+
+    @property
+    def tag_ratio(self) -> float:
+        return self.prose_elements / self.elements
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = element_text(self.element)
+        return self._text
+
+    @property
+    def snippet(self) -> str:
+        if self._snippet is None:
+            text = self._text
+            if text is None:
+                text = element_text(self.element, limit=SNIPPET_LENGTH)
+            if len(text) > SNIPPET_LENGTH:
+                text = text[:SNIPPET_LENGTH] + "..."
+            self._snippet = text
+        return self._snippet
+
+    @property
+    def selector(self) -> str:
+        if self._selector is None:
+            self._selector = self._page.index.css_selector(self.element)
+        return self._selector
+
+    def __repr__(self) -> str:
+        return f"<Block {self.element.tag} words={self.words}>"
+
+
+def element_text(element: Any, limit: Optional[int] = None) -> str:
+    """Return the visible text of *element*, chunks joined by spaces.
+
+    With *limit*, reading stops once the text is longer than *limit*
+    characters: the result then starts like the full text.
+    """
+
+    chunks: List[str] = []
+    size = -1
+    hidden: List[Any] = []
+    for event, node in etree.iterwalk(
+        element, events=("start", "end", "comment")
+    ):
+        if event == "start":
+            if hidden or node.tag in _HIDDEN_TAGS:
+                hidden.append(node)
+                continue
+            chunk = node.text
+        else:
+            if event == "end" and hidden and hidden[-1] is node:
+                hidden.pop()
+            if node is element or hidden:
+                continue
+            chunk = node.tail
+        chunk = chunk.strip() if chunk else None
+        if chunk:
+            chunks.append(chunk)
+            size += len(chunk) + 1
+            if limit is not None and size > limit:
+                break
+    return " ".join(chunks)
+
+
+def _parse(source: Union[str, bytes, Any]) -> Optional[Any]:
+    if not isinstance(source, (str, bytes)):
+        return source
+    if not source.strip():
+        return None
+    parser = None
+    if isinstance(source, bytes):
+        # Like BeautifulSoup, prefer UTF-8 over libxml2's latin-1 default.
+        try:
+            source.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        else:
+            parser = html.HTMLParser(encoding="utf-8")
+    try:
+        return html.document_fromstring(source, parser=parser)
+    except (etree.ParserError, ValueError) as exc:
+        logger.debug("Unable to parse page for blocks: %s", exc)
+        return None
+
+
+def find_blocks(
+    source: Union[str, bytes, Any],
+    *,
+    tags: Iterable[str] = BLOCK_TAGS,
+    ignored: Iterable[str] = IGNORED_TAGS,
+    min_words: int = MIN_WORDS,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_block: Optional[Callable[[Block], None]] = None,
+) -> List[Block]:
+    """Return the blocks of *source* with more than *min_words* words.
+
+    *source* is the HTML or an lxml tree. Blocks are ``tags`` elements
+    outside the ``ignored`` ones, in document order. *should_stop* is
+    polled during the scan; when it returns ``True`` an empty list is
+    returned at once. *on_block* receives every block as soon as it is
+    found, during the scan: the pass being bottom-up, inner blocks come
+    before the blocks around them.
+    """
+
+    root = _parse(source)
+    if root is None:
+        return []
+    tags = set(tags)
+    # Text inside a template is never shown, whatever its depth.
+    excluded = tuple(ignored) + ("template",)
+
+    elements = list(root.iter())
+    # words, words inside links, elements, prose elements
+    stats = {elem: [0, 0, 0, 0] for elem in elements}
+    page = _Page(root)
+    found: List[Block] = []
+    for position, elem in enumerate(reversed(elements)):
+        if (
+            should_stop is not None
+            and not position % _STOP_CHECK
+            and should_stop()
+        ):
+            return []
+        tag = elem.tag
+        own = stats[elem]
+        if tag.__class__ is not str:
+            own[:] = [0, 0, 0, 0]
+        elif tag in _HIDDEN_TAGS:
+            own[:] = [0, 0, 1, 0]
+        else:
+            text = elem.text
+            if text:
+                own[0] += len(text.split())
+            own[2] += 1
+            if tag in _PROSE_TAGS:
+                own[3] += 1
+            elif tag == "a":
+                own[1] = own[0]
+            # The subtree is counted: the block is complete already.
+            # Only the few large blocks look for an ignored ancestor.
+            if (
+                own[0] > min_words
+                and tag in tags
+                and tag not in excluded
+                and next(elem.iterancestors(*excluded), None) is None
+            ):
+                block = Block(elem, own[0], page, own[1], own[2], own[3])
+                found.append(block)
+                if on_block is not None:
+                    on_block(block)
+        parent = elem.getparent()
+        if parent is not None:
+            up = stats[parent]
+            tail = elem.tail
+            up[0] += own[0] + (len(tail.split()) if tail else 0)
+            up[1] += own[1]
+            up[2] += own[2]
+            up[3] += own[3]
+
+    found.reverse()
+    return found
+
+
+def _score(block: Block, depth: int) -> float:
+    density = block.text_density
+    return (
+        math.log1p(block.words)
+        * (1.0 - block.link_density) ** 2
+        * density / (density + DENSITY_HALF)
+        * (0.5 + 0.5 * block.tag_ratio)
+        * min(1.0, depth / SHALLOW_DEPTH)
+    )
+
+
+def rank_blocks(
+    source: Union[str, bytes, Any, List[Block]],
+    *,
+    top_k: Optional[int] = TOP_K,
+    **options: Any,
+) -> List[Block]:
+    """Return the *top_k* best description candidates, best first.
+
+    *source* is a page (see :func:`find_blocks`, which receives the other
+    keyword arguments) or the blocks it returned. Each block gets its
+    ``score``; nested blocks repeating the text of an enclosing block
+    are collapsed into the best scored of them. ``top_k=None`` keeps
+    every block.
+    """
+
+    if isinstance(source, list):
+        blocks = source
+    else:
+        blocks = find_blocks(source, **options)
+    by_element = {block.element: block for block in blocks}
+    # Document order: an enclosing block is met before its descendants.
+    best: Dict[Any, Block] = {}
+    groups: Dict[Any, Any] = {}
+    for block in blocks:
+        depth = 0
+        outer = None
+        for ancestor in block.element.iterancestors():
+            depth += 1
+            if outer is None and ancestor in by_element:
+                outer = ancestor
+        block.score = _score(block, depth)
+        group = block.element
+        if (
+            outer is not None
+            and block.words >= DUPLICATE_RATIO * by_element[outer].words
+        ):
+            group = groups[outer]
+        groups[block.element] = group
+        # On a tie the inner block wins: its selector is tighter.
+        if group not in best or block.score >= best[group].score:
+            best[group] = block
+    ranked = sorted(best.values(), key=lambda block: -block.score)
+    return ranked if top_k is None else ranked[:top_k]
@@ -0,0 +1,125 @@
+"""Cooperative stop, pause and resume of long scraping runs.
+
+A :class:`CancelToken` is shared by a run (the scraping loops of
+``core.scraper`` and ``core.image_scraper``) and its controller (GUI
+buttons, SIGINT handler). The run calls :func:`check` between items and
+:func:`sleep` instead of ``time.sleep``: a paused run blocks there until
+it is resumed, a cancelled one raises :class:`Cancelled`. The loops then
+quit the browser, save the items already done and return
+``EXIT_CANCELLED``.
+"""
+
+import contextlib
+import logging
+import signal
+import threading
+import time
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Exit code of a cancelled run, as for a shell interrupted by SIGINT.
+EXIT_CANCELLED = 130
+
+
+class Cancelled(BaseException):
+    """Raised inside a run once its token is cancelled.
+
+    Like ``KeyboardInterrupt`` it is not an ``Exception``, so the
+    per-item error handlers of the scraping loops let it through.
+    """
+
+
+class CancelToken:
+    """Stop and pause flags of a run, safe to use from any thread.
+
+    With a ``multiprocessing`` *context*, the flags are shared with the
+    child processes the token is handed to.
+    """
+
+    def __init__(self, context=None) -> None:
+        events = threading if context is None else context
+        self._cancelled = events.Event()
+        self._running = events.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        # A paused run must wake up to notice it.
+        self._running.set()
+
+    def pause(self) -> None:
+        if not self.cancelled:
+            self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def check(self) -> None:
+        """Block while paused; raise :class:`Cancelled` once cancelled."""
+
+        self._running.wait()
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def sleep(self, seconds: float) -> None:
+        """Wait *seconds*, waking up at once if the run is cancelled."""
+
+        if self._cancelled.wait(seconds):
+            raise Cancelled()
+        self.check()
+
+
+def check(cancel: Optional[CancelToken]) -> None:
+    if cancel is not None:
+        cancel.check()
+
+
+def sleep(seconds: float, cancel: Optional[CancelToken] = None) -> None:
+    """``time.sleep`` honouring *cancel* when one is given."""
+
+    if cancel is None:
+        time.sleep(seconds)
+    else:
+        cancel.sleep(seconds)
+
+
+def install_sigint_handler(token: CancelToken) -> None:
+    """Make the first Ctrl+C cancel *token* instead of killing the run.
+
+    A second Ctrl+C raises ``KeyboardInterrupt`` as usual.
+    """
+
+    def handler(signum, frame) -> None:
+        logger.warning(
+            "⏹️ Arrêt demandé : fin du produit en cours "
+            "(Ctrl+C à nouveau pour forcer)."
+        )
+        token.cancel()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    signal.signal(signal.SIGINT, handler)
+
+
+@contextlib.contextmanager
+def sigint_cancels() -> Iterator[CancelToken]:
+    """Yield a fresh token cancelled by Ctrl+C while the block runs.
+
+    The previous SIGINT handler is restored on exit, so Ctrl+C at a prompt
+    between two runs quits as usual instead of cancelling the next run.
+    """
+    token = CancelToken()
+    previous = signal.getsignal(signal.SIGINT)
+    install_sigint_handler(token)
+    try:
+        yield token
+    finally:
+        signal.signal(signal.SIGINT, previous)
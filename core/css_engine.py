@@ -0,0 +1,296 @@
+"""Evaluate many CSS selectors in a single walk of an lxml tree.
+
+A mapping of 25 fields evaluated with one ``CSSSelector`` per field walks
+the whole document 25 times. :class:`MultiSelector` compiles every
+selector into chains of compound selectors, indexes each compound by its
+id, class or tag, and visits each element of the tree once. Identical
+left-hand parts of the chains are shared between fields, so ``.product
+h1`` and ``.product .price`` only test ``.product`` once per element.
+
+Supported syntax is the common subset used by mappings: type, universal,
+``#id``, ``.class`` and ``[attr]`` / ``[attr op value]`` compounds joined
+by the descendant (space) or child (``>``) combinators, and selector
+groups (``a, b``). :func:`compile_chains` returns ``None`` for anything
+else (pseudo-classes, sibling combinators, namespaces) so callers can fall
+back to ``lxml.cssselect``.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import cssselect  # type: ignore
+    from cssselect import parser as css_parser  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    cssselect = None
+    css_parser = None
+
+try:
+    from lxml import etree  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    etree = None
+
+logger = logging.getLogger(__name__)
+
+# (tag, id, classes, attribute tests); ``None`` means "any".
+Compound = Tuple[
+    Optional[str],
+    Optional[str],
+    frozenset,
+    Tuple[Tuple[str, str, Optional[str]], ...],
+]
+# (compound, combinator to the next step, next step on the left).
+Step = Tuple[Compound, Optional[str], Any]
+
+_COMBINATORS = {" ", ">"}
+
+
+def _attr_word(attr: str, value: str) -> bool:
+    return bool(value) and value in attr.split()
+
+
+_ATTRIB_TESTS = {
+    "exists": lambda attr, value: True,
+    "=": lambda attr, value: attr == value,
+    "~=": _attr_word,
+    "|=": lambda attr, value: attr == value or attr.startswith(value + "-"),
+    "^=": lambda attr, value: bool(value) and attr.startswith(value),
+    "$=": lambda attr, value: bool(value) and attr.endswith(value),
+    "*=": lambda attr, value: bool(value) and value in attr,
+}
+
+
+class _Unsupported(Exception):
+    """Raised while compiling a selector outside the supported subset."""
+
+
+def _attrib_value(value: Any) -> Optional[str]:
+    # cssselect >= 1.0 wraps values in a Token, older versions use str.
+    return getattr(value, "value", value)
+
+
+def _compound(tree: Any) -> Compound:
+    tag: Optional[str] = None
+    ident: Optional[str] = None
+    classes: List[str] = []
+    attribs: List[Tuple[str, str, Optional[str]]] = []
+    while True:
+        if isinstance(tree, css_parser.Element):
+            if tree.namespace not in (None, "*"):
+                raise _Unsupported("namespaces")
+            if tree.element not in (None, "*"):
+                tag = tree.element
+            break
+        if isinstance(tree, css_parser.Class):
+            classes.append(tree.class_name)
+        elif isinstance(tree, css_parser.Hash):
+            if ident is not None and ident != tree.id:
+                ident = "\0"  # two different ids never match
+            else:
+                ident = tree.id
+        elif isinstance(tree, css_parser.Attrib):
+            if tree.namespace not in (None, "*"):
+                raise _Unsupported("namespaces")
+            op = tree.operator
+            if op not in _ATTRIB_TESTS:
+                raise _Unsupported(op)
+            attribs.append(
+                (tree.attrib, op, _attrib_value(tree.value))
+            )
+        else:
+            raise _Unsupported(type(tree).__name__)
+        tree = tree.selector
+    return tag, ident, frozenset(classes), tuple(attribs)
+
+
+def _steps(tree: Any) -> List[Tuple[Compound, Optional[str]]]:
+    """Return ``(compound, combinator to the left)`` pairs, right first."""
+
+    steps: List[Tuple[Compound, Optional[str]]] = []
+    while isinstance(tree, css_parser.CombinedSelector):
+        if tree.combinator not in _COMBINATORS:
+            raise _Unsupported(tree.combinator)
+        steps.append((_compound(tree.subselector), tree.combinator))
+        tree = tree.selector
+    steps.append((_compound(tree), None))
+    return steps
+
+
+def compile_chains(
+    css: str, interned: Optional[Dict[Any, Step]] = None
+) -> Optional[List[Step]]:
+    """Compile *css* into one chain per selector of the group.
+
+    Each chain is the rightmost :data:`Step`; its third item links to the
+    step on the left. Passing the same *interned* dict for several
+    selectors makes equal left-hand parts the very same objects. ``None``
+    is returned when *css* is malformed or outside the supported subset.
+    """
+
+    if css_parser is None:
+        return None
+    if interned is None:
+        interned = {}
+    try:
+        parsed = cssselect.parse(css)
+        chains = []
+        for selector in parsed:
+            if selector.pseudo_element is not None:
+                raise _Unsupported("pseudo-element")
+            step: Optional[Step] = None
+            steps = _steps(selector.parsed_tree)
+            for compound, combinator in reversed(steps):
+                key = (compound, combinator, id(step))
+                if key not in interned:
+                    interned[key] = (compound, combinator, step)
+                step = interned[key]
+            chains.append(step)
+    except (_Unsupported, cssselect.SelectorError) as exc:
+        logger.debug("Selector %s left to cssselect: %s", css, exc)
+        return None
+    return chains
+
+
+def _compound_matches(compound: Compound, elem: Any) -> bool:
+    tag, ident, classes, attribs = compound
+    if tag is not None and elem.tag != tag:
+        return False
+    if ident is not None and elem.get("id") != ident:
+        return False
+    if classes:
+        value = elem.get("class")
+        if not value or not classes.issubset(value.split()):
+            return False
+    for name, op, expected in attribs:
+        value = elem.get(name)
+        if value is None or not _ATTRIB_TESTS[op](value, expected):
+            return False
+    return True
+
+
+class MultiSelector:
+    """Match a set of named CSS selectors in one traversal.
+
+    *selectors* maps a name to a CSS selector. Names whose selector cannot
+    be compiled are listed in :attr:`unsupported` and left out of
+    :meth:`select`.
+
+    The tree is walked top-down once. Every element inherits from its
+    parent the steps matched by its ancestors and by its parent, so the
+    left part of a chain is checked with a set lookup instead of walking
+    the ancestors again.
+    """
+
+    def __init__(self, selectors: Dict[str, str]):
+        self.names: List[str] = []
+        self.unsupported: List[str] = []
+        self._by_id: Dict[str, List[Any]] = {}
+        self._by_class: Dict[str, List[Any]] = {}
+        self._by_tag: Dict[str, List[Any]] = {}
+        self._any: List[Any] = []
+        interned: Dict[Any, Step] = {}
+        rightmost: Dict[int, List[str]] = {}
+        steps: Dict[int, Step] = {}
+        lefts = set()
+        for name, css in selectors.items():
+            chains = compile_chains(css, interned)
+            if chains is None:
+                self.unsupported.append(name)
+                continue
+            self.names.append(name)
+            for chain in chains:
+                names = rightmost.setdefault(id(chain), [])
+                if name not in names:
+                    names.append(name)
+                step: Optional[Step] = chain
+                while step is not None:
+                    steps[id(step)] = step
+                    if step[2] is not None:
+                        lefts.add(id(step[2]))
+                    step = step[2]
+        self._interned = interned  # keeps the step ids valid
+        for sid, step in steps.items():
+            compound, combinator, left = step
+            entry = (
+                sid,
+                compound,
+                combinator == ">",
+                None if left is None else id(left),
+                rightmost.get(sid, ()),
+                sid in lefts,
+            )
+            self._index(compound, entry)
+
+    def _index(self, compound: Compound, entry: Any) -> None:
+        tag, ident, classes, _ = compound
+        if ident is not None:
+            bucket = self._by_id.setdefault(ident, [])
+        elif classes:
+            bucket = self._by_class.setdefault(min(classes), [])
+        elif tag is not None:
+            bucket = self._by_tag.setdefault(tag, [])
+        else:
+            bucket = self._any
+        bucket.append(entry)
+
+    def _candidates(self, elem: Any) -> List[Any]:
+        found = self._by_tag.get(elem.tag)
+        found = list(found) if found else []
+        if self._by_id:
+            ident = elem.get("id")
+            if ident is not None and ident in self._by_id:
+                found.extend(self._by_id[ident])
+        if self._by_class:
+            value = elem.get("class")
+            if value:
+                for name in set(value.split()):
+                    if name in self._by_class:
+                        found.extend(self._by_class[name])
+        found.extend(self._any)
+        return found
+
+    def select(self, root: Any) -> Dict[str, List[Any]]:
+        """Return the matches of every supported selector under *root*.
+
+        Like ``CSSSelector(css)(root)`` the elements come in document order,
+        *root* itself included, without duplicates.
+        """
+
+        results: Dict[str, List[Any]] = {name: [] for name in self.names}
+        if not self.names:
+            return results
+        empty: frozenset = frozenset()
+        # element -> (steps matched by it or an ancestor, steps matched by
+        # the element itself); only kept for elements with children.
+        states: Dict[Any, Tuple[frozenset, frozenset]] = {}
+        outside = (empty, empty)
+        for elem in root.iter(etree.Element):
+            parent_state = states.get(elem.getparent(), outside)
+            ancestors, parent = parent_state
+            here = None
+            for sid, compound, child, left, names, tracked in (
+                self._candidates(elem)
+            ):
+                if left is not None and left not in (
+                    parent if child else ancestors
+                ):
+                    continue
+                if not _compound_matches(compound, elem):
+                    continue
+                for name in names:
+                    matches = results[name]
+                    if not matches or matches[-1] is not elem:
+                        matches.append(elem)
+                if tracked:
+                    if here is None:
+                        here = set()
+                    here.add(sid)
+            if not len(elem):
+                continue
+            if here:
+                states[elem] = (ancestors | here, frozenset(here))
+            elif parent:
+                states[elem] = (ancestors, empty)
+            else:
+                states[elem] = parent_state
+        return results
@@ -0,0 +1,251 @@
+"""One pass index of an HTML tree used to build CSS selectors.
+
+Building a selector naively asks every ancestor of the element for its
+same-tag siblings, which makes selecting many blocks of a page quadratic.
+:class:`DomIndex` walks the document once and records, for every element,
+its parent, depth and ``nth-of-type`` position, whether its ``id`` is
+unique in the page and which elements share its tag, id or classes.
+Selectors are then built in O(depth) and cut down to the shortest chain
+that still matches the element alone; the uniqueness check starts from
+the rarest part of the chain, so it only visits a few elements.
+"""
+
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import soupsieve
+from lxml import etree
+
+# (tag, unique id or None, classes, nth-of-type or None)
+Part = Tuple[str, Optional[str], Tuple[str, ...], Optional[int]]
+
+
+_NO_CLASSES: FrozenSet[str] = frozenset()
+
+
+class _Node:
+    __slots__ = (
+        "tag", "name", "parent", "depth", "nth", "same", "el_id", "classes",
+        "children",
+    )
+
+    def __init__(
+        self,
+        tag: Any,
+        name: str,
+        parent: Optional["_Node"],
+        el_id: Optional[str],
+        classes: Iterable[str],
+    ):
+        self.tag = tag
+        self.name = name
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.el_id = el_id or None
+        self.classes: FrozenSet[str] = (
+            frozenset(classes) if classes else _NO_CLASSES
+        )
+        # Child nodes by tag name, in document order.
+        self.children: Dict[str, List["_Node"]] = {}
+        self.same: List["_Node"] = []
+        self.nth = 0
+
+    @property
+    def of_type(self) -> int:
+        return len(self.same)
+
+
+def _lxml_elements(root: Any) -> Iterator[Tuple[Any, str, Any, Any, Any]]:
+    for elem in root.iter(etree.Element):
+        classes = elem.get("class")
+        yield (
+            elem,
+            elem.tag,
+            elem.getparent(),
+            elem.get("id"),
+            classes.split() if classes else (),
+        )
+
+
+def _soup_elements(root: Any) -> Iterator[Tuple[Any, str, Any, Any, Any]]:
+    tags = root.find_all(True)
+    if root.name != "[document]":
+        tags.insert(0, root)
+    for tag in tags:
+        classes = tag.get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        yield tag, tag.name, tag.parent, tag.get("id"), classes
+
+
+class DomIndex:
+    """Structural index of the elements below *root*.
+
+    *root* is a BeautifulSoup document or tag, or an lxml element or tree.
+    """
+
+    def __init__(self, root: Any):
+        if isinstance(root, etree._ElementTree):
+            root = root.getroot()
+        self.root = root
+        self._nodes: Dict[int, _Node] = {}
+        self._by_tag: Dict[str, List[_Node]] = {}
+        self._by_id: Dict[str, List[_Node]] = {}
+        self._by_class: Dict[str, List[_Node]] = {}
+        self._matching: Dict[Part, List[_Node]] = {}
+
+        if isinstance(root, etree._Element):
+            elements = _lxml_elements(root)
+        else:
+            elements = _soup_elements(root)
+        nodes = self._nodes
+        by_tag = self._by_tag
+        top: Dict[str, List[_Node]] = {}
+        # Document order: parents are always indexed before their children.
+        for tag, name, parent_tag, el_id, classes in elements:
+            parent = nodes.get(id(parent_tag))
+            node = _Node(tag, name, parent, el_id, classes)
+            nodes[id(tag)] = node
+            siblings = top if parent is None else parent.children
+            same = siblings.get(name)
+            if same is None:
+                same = siblings[name] = []
+            same.append(node)
+            node.same = same
+            node.nth = len(same)
+            by_tag.setdefault(name, []).append(node)
+            if node.el_id:
+                self._by_id.setdefault(node.el_id, []).append(node)
+            for cls in node.classes:
+                self._by_class.setdefault(cls, []).append(node)
+
+    # -- queries -----------------------------------------------------------
+
+    def __contains__(self, el: Any) -> bool:
+        return id(el) in self._nodes
+
+    def depth(self, el: Any) -> int:
+        return self._nodes[id(el)].depth
+
+    def nth_of_type(self, el: Any) -> Tuple[int, int]:
+        """Return the ``(position, count)`` of *el* among same-tag siblings."""
+
+        node = self._nodes[id(el)]
+        return node.nth, node.of_type
+
+    def is_unique_id(self, el_id: str) -> bool:
+        return len(self._by_id.get(el_id, ())) == 1
+
+    # -- selectors ---------------------------------------------------------
+
+    def _part(self, node: _Node) -> Part:
+        if node.el_id and self.is_unique_id(node.el_id):
+            return node.name, node.el_id, (), None
+        nth = node.nth if node.of_type > 1 else None
+        return node.name, None, tuple(sorted(node.classes)), nth
+
+    @staticmethod
+    def _matches(node: _Node, part: Part) -> bool:
+        tag, el_id, classes, nth = part
+        return (
+            node.name == tag
+            and (el_id is None or node.el_id == el_id)
+            and (nth is None or node.nth == nth)
+            and node.classes.issuperset(classes)
+        )
+
+    def _candidates(self, part: Part) -> List[_Node]:
+        """Return (and cache) every element matching *part*."""
+
+        found = self._matching.get(part)
+        if found is None:
+            tag, el_id, classes, nth = part
+            buckets = [self._by_tag.get(tag, [])]
+            if el_id is not None:
+                buckets.append(self._by_id.get(el_id, []))
+            buckets.extend(self._by_class.get(cls, []) for cls in classes)
+            found = [
+                node
+                for node in min(buckets, key=len)
+                if self._matches(node, part)
+            ]
+            self._matching[part] = found
+        return found
+
+    def _count_below(self, node: _Node, parts: List[Part], level: int) -> int:
+        if level == 0:
+            return 1
+        part = parts[level - 1]
+        children = node.children.get(part[0], [])
+        nth = part[3]
+        if nth is not None:
+            children = children[nth - 1:nth]
+        return sum(
+            self._count_below(child, parts, level - 1)
+            for child in children
+            if self._matches(child, part)
+        )
+
+    def _count(self, parts: List[Part], limit: int = 2) -> int:
+        # Start from the rarest part of the chain, check its ancestors
+        # against the parts above it and count the paths below it, so only
+        # a handful of elements are visited whatever the page size.
+        level = min(
+            range(len(parts)), key=lambda k: len(self._candidates(parts[k]))
+        )
+        total = 0
+        for node in self._candidates(parts[level]):
+            up: Optional[_Node] = node
+            for part in parts[level + 1:]:
+                up = up.parent
+                if up is None or not self._matches(up, part):
+                    break
+            else:
+                total += self._count_below(node, parts, level)
+                if total >= limit:
+                    break
+        return total
+
+    def _unique_length(self, parts: List[Part]) -> int:
+        for length in range(1, len(parts)):
+            if self._count(parts[:length]) <= 1:
+                return length
+        return len(parts)
+
+    @staticmethod
+    def _format(part: Part) -> str:
+        tag, el_id, classes, nth = part
+        selector = tag
+        if el_id is not None:
+            return f"{selector}#{soupsieve.escape(el_id)}"
+        selector += "".join("." + soupsieve.escape(c) for c in classes)
+        if nth is not None:
+            selector += f":nth-of-type({nth})"
+        return selector
+
+    def css_selector(self, el: Any, minimize: bool = True) -> str:
+        """Return a CSS selector matching *el* alone.
+
+        The chain goes up to the nearest ancestor with a unique ``id`` (or
+        to the root). With *minimize*, only the shortest tail of that
+        chain still matching *el* alone is kept.
+        """
+
+        node: Optional[_Node] = self._nodes[id(el)]
+        parts: List[Part] = []
+        while node is not None:
+            parts.append(self._part(node))
+            if parts[-1][1] is not None:
+                break
+            node = node.parent
+        if minimize:
+            del parts[self._unique_length(parts):]
+        return " > ".join(self._format(part) for part in reversed(parts))
@@ -0,0 +1,162 @@
+"""Generalization of a selector picked on one page to a whole site.
+
+A selector captured on a product page (block selector window, click
+capture) usually pins the element with ``nth-of-type`` positions that
+change on the next product page. :func:`candidate_selectors` lists
+alternative selectors for the same element, simplest first: the element
+alone by stable id, classes or tag, then anchored below one of its
+``MAX_ANCESTORS`` nearest ancestors, and finally the positional chains of
+:class:`~core.dom_index.DomIndex`. Only the candidates matching that
+element alone on the reference page are kept. Ids and classes containing
+digits are ignored, they are usually product specific.
+
+On a sample page of the same site, a candidate covers the page when it
+matches exactly one element *equivalent* to the reference one
+(:func:`is_equivalent`): same tag, classes similar enough (Jaccard
+similarity of at least ``CLASS_SIMILARITY``) and some text when the
+reference has text. :func:`page_coverage` evaluates every candidate on a
+sample page in a single walk of the tree.
+"""
+
+import logging
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+import soupsieve
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+from core.blocks import element_text
+from core.css_engine import MultiSelector
+from core.dom_index import DomIndex
+
+logger = logging.getLogger(__name__)
+
+# Ancestors tried as anchors of the element.
+MAX_ANCESTORS = 3
+# Candidates kept per reference element, simplest first.
+MAX_CANDIDATES = 40
+# Smallest class similarity of an equivalent element.
+CLASS_SIMILARITY = 0.5
+
+_STABLE_NAME = re.compile(r"^[A-Za-z_-]+$")
+_SIMPLE = re.compile(r"(?<!\\)[#.:\[]")
+
+# (tag, classes, has text) of a reference element.
+Signature = Tuple[str, FrozenSet[str], bool]
+
+
+def _classes(elem: Any) -> FrozenSet[str]:
+    return frozenset((elem.get("class") or "").split())
+
+
+def _compounds(elem: Any) -> List[str]:
+    """Return the compounds naming *elem* by its stable id or classes."""
+
+    tag = elem.tag
+    found = []
+    el_id = elem.get("id")
+    if el_id and _STABLE_NAME.match(el_id):
+        token = "#" + soupsieve.escape(el_id)
+        found += [token, tag + token]
+    classes = sorted(c for c in _classes(elem) if _STABLE_NAME.match(c))
+    tokens = ["." + soupsieve.escape(c) for c in classes]
+    for token in tokens:
+        found += [token, tag + token]
+    if len(tokens) > 1:
+        found.append(tag + "".join(tokens))
+    return found
+
+
+def _cost(selector: str) -> Tuple[int, int, int]:
+    # Fewer compounds, then fewer simple selectors, then shorter.
+    compounds = [c for c in selector.split() if c != ">"]
+    simple = sum(
+        len(_SIMPLE.findall(c)) + (c[0] not in "#.:[") for c in compounds
+    )
+    return len(compounds), simple, len(selector)
+
+
+def select_all(root: Any, selectors: Iterable[str]) -> Dict[str, List[Any]]:
+    """Return the elements matched by every selector of *selectors*.
+
+    Selectors supported by :class:`~core.css_engine.MultiSelector` share
+    one walk of the tree; the others use ``CSSSelector``. Malformed
+    selectors match nothing.
+    """
+
+    selectors = list(dict.fromkeys(selectors))
+    engine = MultiSelector({css: css for css in selectors})
+    found = engine.select(root)
+    for css in engine.unsupported:
+        try:
+            found[css] = CSSSelector(css)(root)
+        except Exception as exc:  # malformed or unsupported selector
+            logger.debug("cssselect cannot compile %s: %s", css, exc)
+            found[css] = []
+    return found
+
+
+def candidate_selectors(
+    root: Any, element: Any, *, limit: int = MAX_CANDIDATES
+) -> List[str]:
+    """Return selectors matching *element* alone under *root*.
+
+    The *limit* simplest ones are returned, simplest first.
+    """
+
+    if isinstance(root, etree._ElementTree):
+        root = root.getroot()
+    own = _compounds(element) + [element.tag]
+    candidates = list(own)
+    parent = element.getparent()
+    for level, ancestor in enumerate(element.iterancestors()):
+        if level >= MAX_ANCESTORS:
+            break
+        for anchor in _compounds(ancestor):
+            candidates += [f"{anchor} {target}" for target in own]
+            if ancestor is parent:
+                candidates += [f"{anchor} > {target}" for target in own]
+    index = DomIndex(root)
+    candidates.append(index.css_selector(element))
+    candidates.append(index.css_selector(element, minimize=False))
+
+    found = select_all(root, candidates)
+    unique = [
+        css
+        for css, matches in found.items()
+        if len(matches) == 1 and matches[0] is element
+    ]
+    unique.sort(key=_cost)
+    return unique[:limit]
+
+
+def element_signature(element: Any) -> Signature:
+    """Return what :func:`is_equivalent` compares on other pages."""
+
+    return element.tag, _classes(element), bool(element_text(element, 1))
+
+
+def is_equivalent(signature: Signature, element: Any) -> bool:
+    """Tell whether *element* plays the role of the reference element."""
+
+    tag, classes, has_text = signature
+    if element.tag != tag:
+        return False
+    other = _classes(element)
+    if classes or other:
+        shared = len(classes & other)
+        if shared / (len(classes) + len(other) - shared) < CLASS_SIMILARITY:
+            return False
+    return not has_text or bool(element_text(element, 1))
+
+
+def page_coverage(
+    root: Any, signature: Signature, selectors: Iterable[str]
+) -> Dict[str, bool]:
+    """Tell, for every selector, whether it finds the block on *root*."""
+
+    return {
+        css: len(matches) == 1 and is_equivalent(signature, matches[0])
+        for css, matches in select_all(root, selectors).items()
+    }
@@ -0,0 +1,76 @@
+"""Sorted product IDs of a links file, for range and prefix selection.
+
+IDs are sorted once in natural order (``A2`` before ``A10``), their sort
+keys computed once and kept. Selecting the IDs between two bounds is then
+two dictionary lookups and a slice; the IDs starting with a prefix without
+digits are found by bisection on the keys. The selection stays a
+``(start, stop)`` pair of positions, so a list view shows it without
+iterating over the IDs.
+"""
+
+import bisect
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_DIGITS = re.compile(r"(\d+)")
+
+# Sort key of an ID: text and number chunks, alternately.
+NaturalKey = Tuple
+
+
+def natural_key(identifiant: str) -> NaturalKey:
+    """Return the natural sort key of *identifiant*."""
+    parts = _DIGITS.split(identifiant)
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+class IdIndex:
+    """IDs in natural order with their positions."""
+
+    def __init__(self, ids: Iterable[str] = ()) -> None:
+        decorated = sorted((natural_key(i), i) for i in set(ids))
+        self.keys: List[NaturalKey] = [key for key, _ in decorated]
+        self.ids: List[str] = [i for _, i in decorated]
+        self.positions: Dict[str, int] = {
+            identifiant: pos for pos, identifiant in enumerate(self.ids)
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, position: int) -> str:
+        return self.ids[position]
+
+    def __contains__(self, identifiant: str) -> bool:
+        return identifiant in self.positions
+
+    def position(self, identifiant: str) -> Optional[int]:
+        return self.positions.get(identifiant)
+
+    def span(self, start: str, end: str) -> Optional[Tuple[int, int]]:
+        """Return the ``(start, stop)`` positions of the IDs between the
+        two bounds (in any order), ``None`` if one is unknown."""
+        first = self.positions.get(start)
+        last = self.positions.get(end)
+        if first is None or last is None:
+            return None
+        if first > last:
+            first, last = last, first
+        return first, last + 1
+
+    def prefix_span(self, prefix: str) -> Tuple[int, int]:
+        """Return the ``(start, stop)`` positions of the IDs starting with
+        *prefix*, which must not contain digits."""
+        if _DIGITS.search(prefix):
+            raise ValueError(f"Préfixe avec chiffres : {prefix}")
+        # The IDs starting with the prefix have the first chunks between
+        # the prefix and the prefix followed by the last character.
+        start = bisect.bisect_left(self.keys, (prefix,))
+        stop = bisect.bisect_left(self.keys, (prefix + "\U0010ffff",))
+        return start, stop
+
+    def slice(self, span: Optional[Tuple[int, int]]) -> List[str]:
+        if span is None:
+            return []
+        return self.ids[span[0]:span[1]]
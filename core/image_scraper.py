@@ -6,7 +6,7 @@ from urllib.error import URLError
 from urllib.parse import urlparse
 import re
 import unicodedata
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Tuple
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
@@ -15,6 +15,16 @@ from selenium.common.exceptions import WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 import logging
 
+from .cancellation import (
+    EXIT_CANCELLED,
+    CancelToken,
+    Cancelled,
+    check,
+    sleep,
+)
+from .jobs import download_slot
+from .progress import ProgressCallback, ProgressReporter
+
 logger = logging.getLogger(__name__)
 
 
@@ -91,65 +101,122 @@ class ImageScraper:
             raise RuntimeError("Driver not initialised")
         return self.driver.find_elements(By.CSS_SELECTOR, self.selector)
 
+    def save_images(
+        self,
+        title: str,
+        srcs: Iterable[Optional[str]],
+        cancel: Optional[CancelToken] = None,
+    ) -> Tuple[int, Optional[str]]:
+        """Download the images *srcs* into the folder of product *title*.
+
+        Returns the bytes saved and the last error message, ``None`` when
+        every image was saved. *cancel* is checked before every image.
+        """
+        folder = os.path.join(self.root_folder, self.slugify(title))
+        os.makedirs(folder, exist_ok=True)
+        srcs = list(srcs)
+        logger.info("🖼️ %d image(s) trouvée(s)", len(srcs))
+        size = 0
+        failure = None
+        for i, src in enumerate(srcs):
+            check(cancel)
+            if not src:
+                continue
+            parsed = urlparse(src)
+            if parsed.scheme not in ("http", "https"):
+                failure = f"URL invalide pour image {i + 1}"
+                logger.warning(
+                    "   ❌ URL invalide pour image %d: %s",
+                    i + 1,
+                    src,
+                )
+                continue
+            filename = f"img_{i}.webp"
+            filepath = os.path.join(folder, filename)
+            try:
+                with download_slot(cancel):
+                    urllib.request.urlretrieve(src, filepath)
+                size += os.path.getsize(filepath)
+                logger.info("   ✅ Image %d → %s", i + 1, filename)
+            except URLError as err:
+                failure = f"Image {i + 1}: {err}"
+                logger.error(
+                    "❌ Échec de téléchargement pour image %d: %s",
+                    i + 1,
+                    err,
+                )
+        return size, failure
+
     # ------------------------------------------------------------------
-    def scrape_images(self, urls: Iterable[str]) -> int:
-        """Main scraping routine."""
+    def scrape_images(
+        self,
+        urls: Iterable[str],
+        progress: Optional[ProgressCallback] = None,
+        cancel: Optional[CancelToken] = None,
+    ) -> int:
+        """Main scraping routine.
+
+        *progress* receives the :class:`~core.progress.ProgressEvent` of
+        the ``images`` action, one item per product URL. Once *cancel* is
+        cancelled, the browser is closed and ``EXIT_CANCELLED`` returned;
+        the images already saved are kept.
+        """
         exit_code = 0
+        if not isinstance(urls, list):
+            urls = list(urls)
+        total = len(urls)
+        reporter = ProgressReporter(progress, "images", total)
+        reporter.started()
         try:
             if self.driver is None:
                 self.setup_driver()
             os.makedirs(self.root_folder, exist_ok=True)
-            if not isinstance(urls, list):
-                urls = list(urls)
-            total = len(urls)
             for index, url in enumerate(urls, start=1):
+                check(cancel)
                 logger.info("🔍 Produit %d/%d : %s", index, total, url)
+                reporter.item_started(index, url)
+                size = 0
+                failure = None
+                load = parse = 0.0
                 try:
                     if self.driver is None:
                         raise RuntimeError("Driver not initialised")
-                    self.driver.get(url)
-                    time.sleep(random.uniform(2.5, 4.5))
+                    with download_slot(cancel):
+                        start = time.perf_counter()
+                        self.driver.get(url)
+                        load = time.perf_counter() - start
+                    sleep(random.uniform(2.5, 4.5), cancel)
 
+                    start = time.perf_counter()
                     product_title = self.get_product_title()
-                    folder = os.path.join(
-                        self.root_folder,
-                        self.slugify(product_title),
-                    )
-                    os.makedirs(folder, exist_ok=True)
-
                     images = list(self.get_image_elements())
-                    logger.info("🖼️ %d image(s) trouvée(s)", len(images))
-
-                    for i, img in enumerate(images):
-                        src = img.get_attribute("src")
-                        if not src:
-                            continue
-                        parsed = urlparse(src)
-                        if parsed.scheme not in ("http", "https"):
-                            exit_code = 1
-                            logger.warning(
-                                "   ❌ URL invalide pour image %d: %s",
-                                i + 1,
-                                src,
-                            )
-                            continue
-                        filename = f"img_{i}.webp"
-                        filepath = os.path.join(folder, filename)
-                        try:
-                            urllib.request.urlretrieve(src, filepath)
-                            logger.info("   ✅ Image %d → %s", i + 1, filename)
-                        except URLError as err:
-                            exit_code = 1
-                            logger.error(
-                                "❌ Échec de téléchargement pour image %d: %s",
-                                i + 1,
-                                err,
-                            )
+                    parse = time.perf_counter() - start
+                    size, failure = self.save_images(
+                        product_title,
+                        [img.get_attribute("src") for img in images],
+                        cancel,
+                    )
+                    if failure is not None:
+                        exit_code = 1
                 except WebDriverException as e:
                     # pragma: no cover - debug output
                     exit_code = 1
+                    failure = str(e)
                     logger.error("❌ Erreur sur la page %s : %s", url, e)
+                reporter.item_finished(
+                    index, url, size=size, error=failure,
+                    url=url, load=load, parse=parse,
+                )
+        except Cancelled:
+            exit_code = EXIT_CANCELLED
+            logger.warning(
+                "⏹️ Téléchargement interrompu après %d produit(s)",
+                reporter.done,
+            )
         finally:
             if self.driver:
                 self.driver.quit()
+            reporter.finished(
+                "Annulé" if exit_code == EXIT_CANCELLED else None
+            )
         return exit_code
@@ -0,0 +1,214 @@
+"""Queue of scraping sessions sharing one resource budget.
+
+Each session of the queue (:class:`Job`: links file, IDs, actions and
+output directory) needs one Chrome driver and about one CPU to parse its
+pages. :class:`JobQueue` starts the queued jobs in submission order as long
+as the :class:`ResourceBudget` allows it; a job too large for what is left
+lets the smaller ones behind it start, and the queue is scheduled again
+when a job ends.
+
+The page loads and image downloads of all the running sessions also share
+``downloads`` slots: the child process of a session installs its
+:class:`DownloadSlots` (:func:`install_download_slots`) and every download
+takes one (:func:`download_slot`). A session holds at most one slot at a
+time, so a busy session cannot starve the others. A session waiting for a
+slot still obeys its cancel token, and the slot of a child which died
+while downloading is given back by the parent
+(:meth:`DownloadSlots.release_held`).
+"""
+
+import contextlib
+import itertools
+import multiprocessing
+import os
+from typing import Any, Dict, Iterator, List, Optional
+
+from .cancellation import CancelToken, check
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+
+# Default budget: Chrome instances and concurrent downloads.
+DEFAULT_DRIVERS = 2
+DEFAULT_DOWNLOADS = 2
+# Seconds between two checks of the cancel token while waiting for a slot.
+SLOT_POLL_INTERVAL = 0.2
+
+
+class DownloadSlots:
+    """The download slots of the queue as used by one session.
+
+    *semaphore* is shared by all the sessions; *held* (a
+    ``multiprocessing.Value`` with its lock) counts the slots this session
+    holds, so that the parent can give them back if its child dies
+    (:meth:`release_held`). The semaphore and the counter change under
+    the lock of the counter, so they always agree.
+    """
+
+    def __init__(self, semaphore: Any, held: Any) -> None:
+        self.semaphore = semaphore
+        self.held = held
+
+    def acquire(self, cancel: Optional[CancelToken] = None) -> None:
+        """Wait for a slot; raise ``Cancelled`` if *cancel* is cancelled
+        meanwhile."""
+        while True:
+            with self.held.get_lock():
+                if self.semaphore.acquire(timeout=SLOT_POLL_INTERVAL):
+                    self.held.value += 1
+                    return
+            check(cancel)
+
+    def release(self) -> None:
+        with self.held.get_lock():
+            self.held.value -= 1
+            self.semaphore.release()
+
+    def release_held(self) -> int:
+        """Give back the slots left by a dead session; return how many."""
+        lock = self.held.get_lock()
+        # A child killed inside the lock never releases it.
+        locked = lock.acquire(timeout=SLOT_POLL_INTERVAL)
+        try:
+            count = self.held.value
+            for _ in range(count):
+                self.semaphore.release()
+            self.held.value = 0
+        finally:
+            if locked:
+                lock.release()
+        return count
+
+
+_slots: Optional[DownloadSlots] = None
+
+
+def install_download_slots(slots: Optional[DownloadSlots]) -> None:
+    """Share *slots* (``None`` for no limit) between the downloads of this
+    process."""
+    global _slots
+    _slots = slots
+
+
+@contextlib.contextmanager
+def download_slot(cancel: Optional[CancelToken] = None) -> Iterator[None]:
+    """Hold a download slot, if any were installed, while downloading.
+
+    *cancel* is checked while waiting for a free slot.
+    """
+    if _slots is None:
+        yield
+        return
+    _slots.acquire(cancel)
+    try:
+        yield
+    finally:
+        _slots.release()
+
+
+class ResourceBudget:
+    """Drivers, download slots and CPUs shared by the running jobs."""
+
+    def __init__(
+        self,
+        drivers: int = DEFAULT_DRIVERS,
+        downloads: int = DEFAULT_DOWNLOADS,
+        cpu: Optional[int] = None,
+    ) -> None:
+        self.drivers = max(drivers, 1)
+        self.downloads = max(downloads, 1)
+        self.cpu = max(cpu or os.cpu_count() or 1, 1)
+
+
+class Job:
+    """One scraping session of the queue.
+
+    *params* holds what the session needs (links file, IDs, actions,
+    paths...); the queue only reads *drivers* and *cpu*. Sessions which
+    load no page (export alone) need no driver.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self, name: str, params: Dict[str, Any], drivers: int = 1,
+        cpu: int = 1,
+    ) -> None:
+        self.id = next(self._ids)
+        self.name = name
+        self.params = params
+        self.drivers = drivers
+        self.cpu = cpu
+        self.state = QUEUED
+        # Set by the caller when the job starts, e.g. a ScrapingWorker.
+        self.worker: Any = None
+
+    def __repr__(self) -> str:
+        return f"<Job {self.id} {self.name!r} {self.state}>"
+
+
+class JobQueue:
+    """Start the queued jobs within a :class:`ResourceBudget`."""
+
+    def __init__(self, budget: Optional[ResourceBudget] = None) -> None:
+        self.budget = budget or ResourceBudget()
+        self.jobs: List[Job] = []
+        self._semaphore: Any = None
+
+    def submit(self, job: Job) -> Job:
+        self.jobs.append(job)
+        return job
+
+    def remove(self, job: Job) -> bool:
+        """Drop *job* if it has not started yet."""
+        if job.state != QUEUED:
+            return False
+        self.jobs.remove(job)
+        return True
+
+    def running(self) -> List[Job]:
+        return [job for job in self.jobs if job.state == RUNNING]
+
+    def queued(self) -> List[Job]:
+        return [job for job in self.jobs if job.state == QUEUED]
+
+    def set_budget(self, budget: ResourceBudget) -> None:
+        """Use *budget* for the next jobs; the download slots change once
+        no job runs."""
+        self.budget = budget
+        if not self.running():
+            self._semaphore = None
+
+    def download_slots(self) -> DownloadSlots:
+        """Slots for the child process of a new job, sharing one semaphore
+        with the other jobs."""
+        # "spawn" like core.session.SessionProcess.
+        context = multiprocessing.get_context("spawn")
+        if self._semaphore is None:
+            self._semaphore = context.BoundedSemaphore(self.budget.downloads)
+        return DownloadSlots(self._semaphore, context.Value("i", 0))
+
+    def schedule(self) -> List[Job]:
+        """Mark as running and return the queued jobs that fit now."""
+        running = self.running()
+        drivers = sum(job.drivers for job in running)
+        cpu = sum(job.cpu for job in running)
+        started = []
+        for job in self.queued():
+            if (
+                drivers + job.drivers > self.budget.drivers
+                or cpu + job.cpu > self.budget.cpu
+            ) and (running or started):
+                # A job larger than the whole budget still runs alone.
+                continue
+            job.state = RUNNING
+            drivers += job.drivers
+            cpu += job.cpu
+            started.append(job)
+        return started
+
+    def finish(self, job: Job) -> List[Job]:
+        """Mark *job* as done and return the jobs started in its place."""
+        job.state = DONE
+        return self.schedule()
@@ -0,0 +1,371 @@
+"""Loader of the ID→URL links files.
+
+:func:`load_links` reads one product per line or row:
+
+* text files (``.txt`` and others): ``ID URL`` separated by spaces or a
+  tab;
+* CSV and TSV files (``.csv``, ``.tsv``): the first two columns, the
+  separator of a CSV file being detected;
+* Excel files (``.xlsx``, needs ``openpyxl``): the first two columns of the
+  active sheet.
+
+In CSV, TSV and Excel files, a first row without URL is a header. IDs are
+upper-cased. Rows missing the ID or the URL are skipped and reported as
+malformed; an ID seen again keeps its last URL and is reported as a
+duplicate (:class:`LinkReport`).
+
+The result, a :class:`LinkMap`, keeps the sorted IDs and their URLs in two
+byte blobs indexed by offset arrays instead of a dict of strings. It is
+also written to a binary cache file, keyed by the path of the links file
+and invalidated by its modification time and size. The next load maps
+that cache in memory (``mmap``) without parsing anything: reloading a
+million links is near-instant, and only the pages looked up are read.
+"""
+
+import bisect
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.path.join(tempfile.gettempdir(), "scraping_liens")
+# Examples kept per kind of problem; the counts are always exact.
+MAX_EXAMPLES = 20
+
+_MAGIC = b"LIENS001"
+# Magic, mtime_ns and size of the links file, number of links, then the
+# byte lengths of the ID blob, the URL blob and the JSON report.
+_HEADER = struct.Struct("=8sqqQQQQ")
+_OFFSET = "Q"
+_TABULAR = (".csv", ".tsv", ".xlsx", ".xlsm")
+
+
+class LinkReport:
+    """Duplicate IDs and malformed rows met while loading a file."""
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.duplicate_count = 0
+        self.malformed_count = 0
+        # (row number, ID) and (row number, text) examples.
+        self.duplicates: List[Tuple[int, str]] = []
+        self.malformed: List[Tuple[int, str]] = []
+
+    def add_duplicate(self, row: int, identifiant: str) -> None:
+        self.duplicate_count += 1
+        if len(self.duplicates) < MAX_EXAMPLES:
+            self.duplicates.append((row, identifiant))
+
+    def add_malformed(self, row: int, text: str) -> None:
+        self.malformed_count += 1
+        if len(self.malformed) < MAX_EXAMPLES:
+            self.malformed.append((row, text))
+
+    @property
+    def ok(self) -> bool:
+        return not (self.duplicate_count or self.malformed_count)
+
+    def summary(self) -> str:
+        """Short French summary, empty when nothing was reported."""
+        parts = []
+        if self.duplicate_count:
+            parts.append(f"{self.duplicate_count} ID(s) en double")
+        if self.malformed_count:
+            parts.append(f"{self.malformed_count} ligne(s) invalide(s)")
+        return ", ".join(parts)
+
+    def log(self, path: str) -> None:
+        if self.duplicate_count:
+            logger.warning(
+                "%d ID(s) en double dans %s, dernière URL gardée : %s",
+                self.duplicate_count,
+                path,
+                ", ".join(f"{i} (ligne {n})" for n, i in self.duplicates[:5]),
+            )
+        if self.malformed_count:
+            logger.warning(
+                "%d ligne(s) invalide(s) dans %s : lignes %s",
+                self.malformed_count,
+                path,
+                ", ".join(str(n) for n, _ in self.malformed[:5]),
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "duplicate_count": self.duplicate_count,
+            "malformed_count": self.malformed_count,
+            "duplicates": self.duplicates,
+            "malformed": self.malformed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LinkReport":
+        report = cls()
+        report.rows = data["rows"]
+        report.duplicate_count = data["duplicate_count"]
+        report.malformed_count = data["malformed_count"]
+        report.duplicates = [tuple(d) for d in data["duplicates"]]
+        report.malformed = [tuple(m) for m in data["malformed"]]
+        return report
+
+
+def _blob(values: List[str]) -> Tuple[bytes, array]:
+    encoded = [value.encode("utf-8") for value in values]
+    lengths = itertools.accumulate(map(len, encoded), initial=0)
+    offsets = array(_OFFSET, lengths)
+    return b"".join(encoded), offsets
+
+
+class LinkMap(Mapping):
+    """Read-only ID→URL mapping over byte blobs, IDs sorted.
+
+    UTF-8 keeps the order of the code points, so the IDs are found by
+    bisection on their bytes.
+    """
+
+    def __init__(
+        self,
+        ids: Any = b"",
+        id_offsets: Any = None,
+        urls: Any = b"",
+        url_offsets: Any = None,
+        report: Optional[LinkReport] = None,
+        source: Any = None,
+    ) -> None:
+        self._ids = ids
+        self._id_offsets = id_offsets or array(_OFFSET, [0])
+        self._urls = urls
+        self._url_offsets = url_offsets or array(_OFFSET, [0])
+        self.report = report or LinkReport()
+        # Memory map backing the blobs, kept open with them.
+        self._source = source
+
+    @classmethod
+    def from_dict(
+        cls, links: Dict[str, str], report: Optional[LinkReport] = None
+    ) -> "LinkMap":
+        ids = sorted(links)
+        id_blob, id_offsets = _blob(ids)
+        url_blob, url_offsets = _blob([links[i] for i in ids])
+        return cls(id_blob, id_offsets, url_blob, url_offsets, report)
+
+    def __len__(self) -> int:
+        return len(self._id_offsets) - 1
+
+    def _key(self, position: int) -> bytes:
+        offsets = self._id_offsets
+        return bytes(self._ids[offsets[position]:offsets[position + 1]])
+
+    def _position(self, identifiant: str) -> Optional[int]:
+        target = identifiant.encode("utf-8")
+        position = bisect.bisect_left(
+            range(len(self)), target, key=self._key
+        )
+        if position < len(self) and self._key(position) == target:
+            return position
+        return None
+
+    def __getitem__(self, identifiant: str) -> str:
+        position = (
+            self._position(identifiant)
+            if isinstance(identifiant, str) else None
+        )
+        if position is None:
+            raise KeyError(identifiant)
+        offsets = self._url_offsets
+        return bytes(
+            self._urls[offsets[position]:offsets[position + 1]]
+        ).decode("utf-8")
+
+    def __contains__(self, identifiant: object) -> bool:
+        return (
+            isinstance(identifiant, str)
+            and self._position(identifiant) is not None
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        blob = bytes(self._ids)
+        text = blob.decode("utf-8")
+        offsets = self._id_offsets.tolist()
+        bounds = zip(offsets, offsets[1:])
+        # Offsets count bytes: slice the text only when it is ASCII.
+        if len(text) == len(blob):
+            return (text[start:end] for start, end in bounds)
+        return (blob[start:end].decode("utf-8") for start, end in bounds)
+
+    def __repr__(self) -> str:
+        return f"<LinkMap {len(self)} liens>"
+
+
+# ---------- Parsing ----------
+def _text_rows(path: str) -> Iterator[Tuple[int, List[str]]]:
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for number, line in enumerate(f, start=1):
+            yield number, line.split(None, 1)
+
+
+def _csv_rows(
+    path: str, delimiter: Optional[str] = None
+) -> Iterator[Tuple[int, List[str]]]:
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if delimiter is None:
+            try:
+                dialect = csv.Sniffer().sniff(f.read(4096), ",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            f.seek(0)
+            reader = csv.reader(f, dialect)
+        else:
+            reader = csv.reader(f, delimiter=delimiter)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _xlsx_rows(path: str) -> Iterator[Tuple[int, List[str]]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(max_col=2, values_only=True)
+        for number, row in enumerate(rows, start=1):
+            yield number, ["" if c is None else str(c) for c in row]
+    finally:
+        workbook.close()
+
+
+def _rows(path: str) -> Iterator[Tuple[int, List[str]]]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".xlsx", ".xlsm"):
+        return _xlsx_rows(path)
+    if extension == ".tsv":
+        return _csv_rows(path, "\t")
+    if extension == ".csv":
+        return _csv_rows(path)
+    return _text_rows(path)
+
+
+def parse_links(
+    rows: Iterable[Tuple[int, List[str]]], header: bool = False
+) -> Tuple[Dict[str, str], LinkReport]:
+    """Return the links of ``(row number, cells)`` *rows* and the report.
+
+    With *header*, a first row whose second cell is not a URL is skipped.
+    """
+    links: Dict[str, str] = {}
+    report = LinkReport()
+    for number, cells in rows:
+        cells = [cell.strip() for cell in cells[:2]]
+        if not any(cells):
+            continue
+        report.rows += 1
+        if len(cells) < 2 or not cells[0] or not cells[1]:
+            report.add_malformed(number, " ".join(cells))
+            continue
+        identifiant, url = cells[0].upper(), cells[1]
+        if header and report.rows == 1 and "://" not in url:
+            continue
+        if identifiant in links:
+            report.add_duplicate(number, identifiant)
+        links[identifiant] = url
+    return links, report
+
+
+# ---------- Cache ----------
+def _cache_path(path: str, cache_dir: str) -> str:
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, key + ".idx")
+
+
+def _write_cache(cache: str, stat: os.stat_result, links: LinkMap) -> None:
+    report = json.dumps(links.report.to_dict()).encode("utf-8")
+    os.makedirs(os.path.dirname(cache), exist_ok=True)
+    partial = f"{cache}.{os.getpid()}.tmp"
+    with open(partial, "wb") as f:
+        f.write(_HEADER.pack(
+            _MAGIC, stat.st_mtime_ns, stat.st_size, len(links),
+            len(links._ids), len(links._urls), len(report),
+        ))
+        f.write(links._id_offsets.tobytes())
+        f.write(links._url_offsets.tobytes())
+        f.write(links._ids)
+        f.write(links._urls)
+        f.write(report)
+    try:
+        os.replace(partial, cache)
+    except OSError:
+        # e.g. the old cache is still mapped by a running session.
+        os.remove(partial)
+        raise
+
+
+def _read_cache(cache: str, stat: os.stat_result) -> Optional[LinkMap]:
+    try:
+        with open(cache, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return None
+            magic, mtime, size, count, ids_len, urls_len, report_len = (
+                _HEADER.unpack(header)
+            )
+            if (magic, mtime, size) != (
+                _MAGIC, stat.st_mtime_ns, stat.st_size
+            ):
+                return None
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, struct.error):
+        return None
+    view = memoryview(source)
+    start = _HEADER.size
+    offsets_len = (count + 1) * 8
+    parts = []
+    for length in (offsets_len, offsets_len, ids_len, urls_len, report_len):
+        parts.append(view[start:start + length])
+        start += length
+    id_offsets, url_offsets, ids, urls, report = parts
+    try:
+        report = LinkReport.from_dict(json.loads(bytes(report)))
+        return LinkMap(
+            ids, id_offsets.cast(_OFFSET), urls, url_offsets.cast(_OFFSET),
+            report, source,
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def load_links(path: str, cache_dir: Optional[str] = CACHE_DIR) -> LinkMap:
+    """Load the links of *path*, from its cache when it is up to date.
+
+    A missing file gives an empty map. ``cache_dir=None`` disables the
+    cache.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        logger.warning("Fichier introuvable : %s", path)
+        return LinkMap()
+    cache = _cache_path(path, cache_dir) if cache_dir else None
+    links = _read_cache(cache, stat) if cache else None
+    if links is None:
+        extension = os.path.splitext(path)[1].lower()
+        parsed, report = parse_links(
+            _rows(path), header=extension in _TABULAR
+        )
+        links = LinkMap.from_dict(parsed, report)
+        if cache:
+            try:
+                _write_cache(cache, stat, links)
+            except OSError as e:
+                logger.warning("Cache des liens non écrit : %s", e)
+    links.report.log(path)
+    return links
@@ -0,0 +1,201 @@
+"""Live throughput and latency of a scraping session.
+
+:class:`SessionMetrics` receives the :class:`~core.progress.ProgressEvent`
+of a session and aggregates the ``ITEM_FINISHED`` ones per action and per
+host (the network location of the page URL): pages per minute, median and
+95th percentile of the page-load and extraction times, bytes and error
+rate. The latencies keep the last ``SAMPLES`` values, so a long session
+costs no more memory than a short one.
+
+The remaining time of an action is its remaining items times an EWMA of
+the interval between two of its items: it follows the recent speed of
+each action instead of the average of the whole session. Actions running
+at the same time (one visit per product) overlap, so :meth:`eta` is the
+longest remaining time of the running actions.
+"""
+
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+from urllib.parse import urlparse
+
+from .progress import FINISHED, ITEM_FINISHED, STARTED, ProgressEvent
+
+# Latencies kept per action and per host.
+SAMPLES = 1000
+# Weight of the last interval in the EWMA.
+EWMA_ALPHA = 0.3
+
+
+def _percentile(values: Deque[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of *values*, ``None`` when empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+class PageStats:
+    """Counters and latencies of the pages of an action or a host."""
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.last = start
+        self.pages = 0
+        self.errors = 0
+        self.bytes = 0
+        self.load: Deque[float] = deque(maxlen=SAMPLES)
+        self.parse: Deque[float] = deque(maxlen=SAMPLES)
+
+    def add(self, event: ProgressEvent, now: float) -> None:
+        self.last = now
+        self.pages += 1
+        self.bytes += event.size
+        if event.error is not None:
+            self.errors += 1
+        if event.load > 0:
+            self.load.append(event.load)
+        if event.parse > 0:
+            self.parse.append(event.parse)
+
+    @property
+    def pages_per_minute(self) -> float:
+        duration = self.last - self.start
+        return self.pages * 60 / duration if duration > 0 else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.pages if self.pages else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "pages": self.pages,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "pages_per_minute": round(self.pages_per_minute, 2),
+            "error_rate": round(self.error_rate, 4),
+            "load_p50": _round(_percentile(self.load, 50)),
+            "load_p95": _round(_percentile(self.load, 95)),
+            "parse_p50": _round(_percentile(self.parse, 50)),
+            "parse_p95": _round(_percentile(self.parse, 95)),
+        }
+
+
+class _ActionProgress:
+    """Progress of one action, for the remaining time."""
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self.finished = False
+        self.last: Optional[float] = None
+        self.interval: Optional[float] = None
+
+    @property
+    def remaining(self) -> int:
+        return max(self.total - self.done, 0)
+
+
+class SessionMetrics:
+    """Aggregate the progress events of a session.
+
+    *clock* returns the current time in seconds; events are timed when
+    they are added, which also works for the events relayed from a child
+    process.
+    """
+
+    def __init__(
+        self,
+        alpha: float = EWMA_ALPHA,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.alpha = alpha
+        self.clock = clock
+        self.actions: Dict[str, PageStats] = {}
+        self.hosts: Dict[str, PageStats] = {}
+        self._progress: Dict[str, _ActionProgress] = {}
+        # Last page counted per host: one visit may finish several actions.
+        self._last_page: Dict[str, tuple] = {}
+
+    def add(self, event: ProgressEvent) -> None:
+        now = self.clock()
+        progress = self._progress.get(event.action)
+        if progress is None:
+            progress = self._progress[event.action] = _ActionProgress(
+                event.total
+            )
+        progress.total = event.total or progress.total
+        if event.kind == STARTED:
+            progress.last = now
+        elif event.kind == FINISHED:
+            progress.finished = True
+        elif event.kind == ITEM_FINISHED:
+            self._item_finished(event, progress, now)
+
+    def _item_finished(
+        self, event: ProgressEvent, progress: _ActionProgress, now: float
+    ) -> None:
+        start = now - event.elapsed
+        stats = self.actions.get(event.action)
+        if stats is None:
+            stats = self.actions[event.action] = PageStats(start)
+        stats.add(event, now)
+        if event.url:
+            host = urlparse(event.url).netloc or event.url
+            page = (event.index, event.url)
+            host_stats = self.hosts.get(host)
+            if host_stats is None:
+                host_stats = self.hosts[host] = PageStats(start)
+            if self._last_page.get(host) != page:
+                self._last_page[host] = page
+                host_stats.add(event, now)
+            else:
+                # Another action of the same visit: only its downloads.
+                host_stats.bytes += event.size
+
+        if progress.last is None:
+            interval = event.elapsed
+        else:
+            interval = now - progress.last
+        progress.last = now
+        progress.done += 1
+        if progress.interval is None:
+            progress.interval = interval
+        else:
+            progress.interval = (
+                self.alpha * interval + (1 - self.alpha) * progress.interval
+            )
+
+    def eta(self) -> Optional[float]:
+        """Seconds left for the running actions, ``None`` if unknown."""
+        estimates = [
+            p.remaining * p.interval
+            for p in self._progress.values()
+            if not p.finished and p.interval is not None
+        ]
+        return max(estimates) if estimates else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the metrics as a JSON-serializable dict."""
+        eta = self.eta()
+        return {
+            "actions": {
+                name: stats.as_dict() for name, stats in self.actions.items()
+            },
+            "hosts": {
+                name: stats.as_dict() for name, stats in self.hosts.items()
+            },
+            "eta": None if eta is None else round(eta, 1),
+        }
+
+    def save(self, path: str) -> None:
+        """Write :meth:`snapshot` to *path* as JSON."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
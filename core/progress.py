@@ -0,0 +1,156 @@
+"""Typed progress events emitted by the scraping routines.
+
+``scrap_produits_par_ids``, ``scrap_fiches_concurrents``,
+``export_fiches_concurrents_json`` and ``ImageScraper.scrape_images``
+accept a ``progress`` callable receiving :class:`ProgressEvent` objects,
+so callers (the GUI, a CLI progress bar) follow the work without parsing
+log lines. To feed a queue instead, pass its ``put`` method.
+
+Each run emits ``STARTED`` (with the number of items), then
+``ITEM_STARTED`` / ``ITEM_FINISHED`` for every item (product ID, URL or
+export batch) and ``FINISHED``. ``ITEM_FINISHED`` carries the time spent
+on the item, the bytes handled (page source, saved images or exported
+files) and the error message when the item failed; for a page, also its
+URL, the page-load time (``load``, deliberate waits excluded) and the
+extraction time (``parse``), and ``details``, what the action produced
+for the item (``output`` file, ``price``, ``variants`` count...).
+``FINISHED`` carries an error when the run
+was cancelled. :class:`core.metrics.SessionMetrics` aggregates them.
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+STARTED = "started"
+ITEM_STARTED = "item_started"
+ITEM_FINISHED = "item_finished"
+FINISHED = "finished"
+
+
+class ProgressEvent:
+    """One step of an action (``variantes``, ``fiches``, ``export``...)."""
+
+    __slots__ = (
+        "kind", "action", "index", "total", "item", "elapsed", "size",
+        "error", "url", "load", "parse", "details",
+    )
+
+    def __init__(
+        self,
+        kind: str,
+        action: str,
+        index: int = 0,
+        total: int = 0,
+        item: Optional[str] = None,
+        elapsed: float = 0.0,
+        size: int = 0,
+        error: Optional[str] = None,
+        url: Optional[str] = None,
+        load: float = 0.0,
+        parse: float = 0.0,
+        details: Optional[Dict[str, Any]] = None,
+    ):
+        self.kind = kind
+        self.action = action
+        # 1-based position of the item; items done for FINISHED.
+        self.index = index
+        self.total = total
+        self.item = item
+        # Seconds spent on the item, or on the whole run for FINISHED.
+        self.elapsed = elapsed
+        # Bytes read or written for the item.
+        self.size = size
+        self.error = error
+        # Page of the item and seconds spent loading and extracting it.
+        self.url = url
+        self.load = load
+        self.parse = parse
+        self.details = details
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def __repr__(self) -> str:
+        return (
+            f"<ProgressEvent {self.kind} {self.action} "
+            f"{self.index}/{self.total} {self.item!r}>"
+        )
+
+
+ProgressCallback = Callable[[ProgressEvent], None]
+
+
+class ProgressReporter:
+    """Emit the events of one action to *callback*, timing every item.
+
+    Without callback every method is a no-op. Errors raised by the
+    callback are logged: a broken listener must not stop the scraping.
+    """
+
+    def __init__(
+        self, callback: Optional[ProgressCallback], action: str, total: int
+    ):
+        self.callback = callback
+        self.action = action
+        self.total = total
+        self.done = 0
+        self._start = time.perf_counter()
+        self._item_start = self._start
+
+    def _emit(self, kind: str, **fields) -> None:
+        try:
+            self.callback(ProgressEvent(
+                kind, self.action, total=self.total, **fields
+            ))
+        except Exception:
+            logger.exception("Progress callback failed")
+
+    def started(self) -> None:
+        self._start = time.perf_counter()
+        if self.callback is not None:
+            self._emit(STARTED)
+
+    def item_started(self, index: int, item: Optional[str] = None) -> None:
+        self._item_start = time.perf_counter()
+        if self.callback is not None:
+            self._emit(ITEM_STARTED, index=index, item=item)
+
+    def item_finished(
+        self,
+        index: int,
+        item: Optional[str] = None,
+        *,
+        size: int = 0,
+        error: Optional[str] = None,
+        url: Optional[str] = None,
+        load: float = 0.0,
+        parse: float = 0.0,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.done += 1
+        if self.callback is not None:
+            self._emit(
+                ITEM_FINISHED,
+                index=index,
+                item=item,
+                elapsed=time.perf_counter() - self._item_start,
+                size=size,
+                error=error,
+                url=url,
+                load=load,
+                parse=parse,
+                details=details,
+            )
+
+    def finished(self, error: Optional[str] = None) -> None:
+        if self.callback is not None:
+            self._emit(
+                FINISHED,
+                index=self.done,
+                elapsed=time.perf_counter() - self._start,
+                error=error,
+            )
@@ -6,6 +6,9 @@ import json
 import time
 import random
 import math
+from typing import Optional
+from urllib.parse import urljoin
+
 import pandas as pd
 from bs4 import BeautifulSoup
 from selenium import webdriver
@@ -13,6 +16,17 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 
+from .cancellation import (
+    EXIT_CANCELLED,
+    CancelToken,
+    Cancelled,
+    check,
+    sleep,
+)
+from .image_scraper import ImageScraper
+from .jobs import download_slot
+from .progress import ProgressCallback, ProgressReporter
+from .structured_data import extract_product_info
 from .utils import clean_name, clean_filename
 import logging
 
@@ -116,11 +130,121 @@ def _convert_links(tag):
         a.replace_with(markdown)
 
 
+def _variant_rows(
+    driver: webdriver.Chrome, product: dict, id_produit: str
+) -> list:
+    """Return the WooCommerce rows of the product page loaded in *driver*.
+
+    *product* is the structured data of the page, see
+    :func:`~core.structured_data.extract_product_info`.
+    """
+    rows = []
+    product_name = product.get("name")
+    if not product_name:
+        name_el = driver.find_element(By.TAG_NAME, "h1")
+        product_name = name_el.text.strip()
+    base_sku = (
+        re.sub(r'\W+', '-', product_name.lower())
+        .strip("-")[:15]
+        .upper()
+    )
+    product_price = product.get("price") or _parse_price(driver)
+
+    variant_names = _get_variant_names(driver)
+
+    nom_dossier = clean_name(product_name).replace(" ", "-")
+
+    if len(variant_names) <= 1:
+        rows.append({
+            "ID Produit": id_produit,
+            "Type": "simple",
+            "SKU": base_sku,
+            "Name": product_name,
+            "Regular price": product_price,
+            "Nom du dossier": nom_dossier
+        })
+        return rows
+
+    rows.append({
+        "ID Produit": id_produit,
+        "Type": "variable",
+        "SKU": base_sku,
+        "Name": product_name,
+        "Parent": "",
+        "Attribute 1 name": "Couleur",
+        "Attribute 1 value(s)": " | ".join(variant_names),
+        "Attribute 1 default": variant_names[0],
+        "Regular price": "",
+        "Nom du dossier": nom_dossier
+    })
+
+    for v in variant_names:
+        clean_v = re.sub(r'\W+', '', v).upper()
+        child_sku = f"{base_sku}-{clean_v}"
+        rows.append({
+            "ID Produit": id_produit,
+            "Type": "variation",
+            "SKU": child_sku,
+            "Name": "",
+            "Parent": base_sku,
+            "Attribute 1 name": "Couleur",
+            "Attribute 1 value(s)": v,
+            "Regular price": product_price,
+            "Nom du dossier": nom_dossier
+        })
+    return rows
+
+
+def _variant_details(rows: list, path: str) -> dict:
+    """Results of a product for the ``variantes`` progress events."""
+    price = next(
+        (row["Regular price"] for row in rows if row.get("Regular price")),
+        None,
+    )
+    variants = sum(1 for row in rows if row["Type"] == "variation")
+    return {"output": path, "price": price, "variants": variants}
+
+
+def _save_fiche(
+    soup: BeautifulSoup, product: dict, save_directory: str
+) -> tuple:
+    """Write the description fiche of *soup*; return ``(filename, title)``.
+
+    The links of the description are converted in place.
+    """
+    title = product.get("name") or _extract_title(soup)
+    filename = clean_filename(title) + ".txt"
+    txt_path = os.path.join(save_directory, filename)
+
+    description_div = _find_description_div(soup)
+    _convert_links(description_div)
+    raw_html = str(description_div)
+
+    txt_content = f"<h1>{title}</h1>\n\n{raw_html}"
+    with open(txt_path, "w", encoding="utf-8") as f2:
+        f2.write(txt_content)
+    return filename, title
+
+
+def _cancelled_error(exit_code: int) -> Optional[str]:
+    return "Annulé" if exit_code == EXIT_CANCELLED else None
+
+
+def _save_excel(df, path: str, append: bool = False) -> None:
+    """Write *df* to *path*, after the rows already there with *append*."""
+    if append and os.path.exists(path):
+        df = pd.concat([pd.read_excel(path), df], ignore_index=True)
+    df.to_excel(path, index=False)
+
+
 def scrap_produits_par_ids(
     id_url_map: dict,
     ids_selectionnes: list,
     base_dir: str,
     headless: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelToken] = None,
+    append: bool = False,
 ) -> int:
     """Scrape product variants and generate a WooCommerce spreadsheet.
 
@@ -128,11 +252,22 @@ def scrap_produits_par_ids(
     ----------
     headless : bool, optional
         If ``True`` Selenium runs without opening a browser window.
+    progress : callable, optional
+        Receives the :class:`~core.progress.ProgressEvent` of the
+        ``variantes`` action, one item per product ID.
+    cancel : CancelToken, optional
+        Checked between products and during waits. Once cancelled, the
+        rows of the products done are saved and ``EXIT_CANCELLED`` is
+        returned.
+    append : bool, optional
+        Keep the rows of an existing spreadsheet, to resume a session.
     """
     fichier_excel = os.path.join(base_dir, "woocommerce_mix.xlsx")
     driver = None
     woocommerce_rows = []
     exit_code = 0
+    reporter = ProgressReporter(progress, "variantes", len(ids_selectionnes))
+    reporter.started()
     try:
         driver = _get_driver(headless=headless)
 
@@ -141,12 +276,17 @@ def scrap_produits_par_ids(
             len(ids_selectionnes),
         )
         for idx, id_produit in enumerate(ids_selectionnes, start=1):
+            check(cancel)
+            reporter.item_started(idx, id_produit)
             url = id_url_map.get(id_produit)
             if not url:
                 logger.warning(
                     "ID introuvable dans le fichier : %s",
                     id_produit,
                 )
+                reporter.item_finished(
+                    idx, id_produit, error="ID introuvable"
+                )
                 continue
 
             logger.info(
@@ -156,77 +296,52 @@ def scrap_produits_par_ids(
                 id_produit,
                 url,
             )
+            size = 0
+            failure = None
+            details = None
+            load = parse = 0.0
             try:
-                driver.get(url)
-                time.sleep(random.uniform(2.5, 3.5))
+                with download_slot(cancel):
+                    start = time.perf_counter()
+                    driver.get(url)
+                    load = time.perf_counter() - start
+                sleep(random.uniform(2.5, 3.5), cancel)
                 driver.execute_script(
                     "window.scrollTo(0, document.body.scrollHeight * 0.3);"
                 )
-                time.sleep(2)
-
-                name_el = driver.find_element(By.TAG_NAME, "h1")
-                product_name = name_el.text.strip()
-                base_sku = (
-                    re.sub(r'\W+', '-', product_name.lower())
-                    .strip("-")[:15]
-                    .upper()
-                )
-                product_price = _parse_price(driver)
-
-                variant_names = _get_variant_names(driver)
-
-                nom_dossier = clean_name(product_name).replace(" ", "-")
-
-                if len(variant_names) <= 1:
-                    woocommerce_rows.append({
-                        "ID Produit": id_produit,
-                        "Type": "simple",
-                        "SKU": base_sku,
-                        "Name": product_name,
-                        "Regular price": product_price,
-                        "Nom du dossier": nom_dossier
-                    })
-                    continue
+                sleep(2, cancel)
 
-                woocommerce_rows.append({
-                    "ID Produit": id_produit,
-                    "Type": "variable",
-                    "SKU": base_sku,
-                    "Name": product_name,
-                    "Parent": "",
-                    "Attribute 1 name": "Couleur",
-                    "Attribute 1 value(s)": " | ".join(variant_names),
-                    "Attribute 1 default": variant_names[0],
-                    "Regular price": "",
-                    "Nom du dossier": nom_dossier
-                })
-
-                for v in variant_names:
-                    clean_v = re.sub(r'\W+', '', v).upper()
-                    child_sku = f"{base_sku}-{clean_v}"
-                    woocommerce_rows.append({
-                        "ID Produit": id_produit,
-                        "Type": "variation",
-                        "SKU": child_sku,
-                        "Name": "",
-                        "Parent": base_sku,
-                        "Attribute 1 name": "Couleur",
-                        "Attribute 1 value(s)": v,
-                        "Regular price": product_price,
-                        "Nom du dossier": nom_dossier
-                    })
+                start = time.perf_counter()
+                html = driver.page_source
+                size = len(html.encode("utf-8"))
+                # Embedded JSON-LD/microdata avoids most DOM queries.
+                product = extract_product_info(html)
+                rows = _variant_rows(driver, product, id_produit)
+                woocommerce_rows.extend(rows)
+                details = _variant_details(rows, fichier_excel)
+                parse = time.perf_counter() - start
 
             except Exception as e:
                 exit_code = 1
+                failure = str(e)
                 logger.error("Erreur sur %s → %s", url, e)
-                continue
+            reporter.item_finished(
+                idx, id_produit, size=size, error=failure,
+                url=url, load=load, parse=parse, details=details,
+            )
 
+    except Cancelled:
+        exit_code = EXIT_CANCELLED
+        logger.warning(
+            "⏹️ Scraping interrompu après %d produit(s)", reporter.done
+        )
     finally:
         if driver:
             driver.quit()
         df = pd.DataFrame(woocommerce_rows)
-        df.to_excel(fichier_excel, index=False)
+        _save_excel(df, fichier_excel, append)
         logger.info("📁 Données sauvegardées dans : %s", fichier_excel)
+        reporter.finished(_cancelled_error(exit_code))
     return exit_code
 
 
@@ -235,6 +350,9 @@ def scrap_fiches_concurrents(
     ids_selectionnes: list,
     base_dir: str,
     headless: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelToken] = None,
+    append: bool = False,
 ) -> int:
     """Extract competitor pages as HTML snippets.
 
@@ -242,18 +360,30 @@ def scrap_fiches_concurrents(
     ----------
     headless : bool, optional
         Run Selenium without GUI when ``True``.
+    progress : callable, optional
+        Receives the :class:`~core.progress.ProgressEvent` of the
+        ``fiches`` action, one item per product ID.
+    cancel : CancelToken, optional
+        Stops the run between products, see
+        :func:`scrap_produits_par_ids`.
+    append : bool, optional
+        Keep the rows of an existing recap spreadsheet.
     """
     save_directory = os.path.join(base_dir, "fiches_concurrents")
     recap_excel_path = os.path.join(base_dir, "recap_concurrents.xlsx")
     driver = None
     exit_code = 0
     recap_data = []
+    reporter = ProgressReporter(progress, "fiches", len(ids_selectionnes))
+    reporter.started()
     try:
         driver = _get_driver(headless=headless)
 
         os.makedirs(save_directory, exist_ok=True)
         total = len(ids_selectionnes)
         for idx, id_produit in enumerate(ids_selectionnes, start=1):
+            check(cancel)
+            reporter.item_started(idx, id_produit)
             url = id_url_map.get(id_produit)
             if not url:
                 logger.warning(
@@ -261,37 +391,52 @@ def scrap_fiches_concurrents(
                     id_produit,
                 )
                 recap_data.append(("?", "?", id_produit, "ID non trouvé"))
+                reporter.item_finished(
+                    idx, id_produit, error="ID introuvable"
+                )
                 continue
 
             logger.info("📦 %d / %d", idx, total)
             logger.info("🔗 %s —", url)
 
+            size = 0
+            failure = None
+            details = None
+            load = parse = 0.0
             try:
-                driver.get(url)
-                time.sleep(random.uniform(2.5, 4.2))
+                with download_slot(cancel):
+                    start = time.perf_counter()
+                    driver.get(url)
+                    load = time.perf_counter() - start
+                sleep(random.uniform(2.5, 4.2), cancel)
 
+                start = time.perf_counter()
                 html = driver.page_source
+                size = len(html.encode("utf-8"))
                 soup = BeautifulSoup(html, "html.parser")
 
-                title = _extract_title(soup)
-                filename = clean_filename(title) + ".txt"
-                txt_path = os.path.join(save_directory, filename)
-
-                description_div = _find_description_div(soup)
-                _convert_links(description_div)
-                raw_html = str(description_div)
-
-                txt_content = f"<h1>{title}</h1>\n\n{raw_html}"
-                with open(txt_path, "w", encoding="utf-8") as f2:
-                    f2.write(txt_content)
+                product = extract_product_info(html)
+                filename, title = _save_fiche(soup, product, save_directory)
+                details = {"output": os.path.join(save_directory, filename)}
+                parse = time.perf_counter() - start
 
                 logger.info("✅ Extraction OK (%s)", filename)
                 recap_data.append((filename, title, url, "Extraction OK"))
             except Exception as e:
                 exit_code = 1
+                failure = str(e)
                 logger.error("❌ Extraction Échec — %s", str(e))
                 recap_data.append(("?", "?", url, "Extraction Échec"))
+            reporter.item_finished(
+                idx, id_produit, size=size, error=failure,
+                url=url, load=load, parse=parse, details=details,
+            )
 
+    except Cancelled:
+        exit_code = EXIT_CANCELLED
+        logger.warning(
+            "⏹️ Extraction interrompue après %d produit(s)", reporter.done
+        )
     finally:
         if driver:
             driver.quit()
@@ -299,18 +444,238 @@ def scrap_fiches_concurrents(
             recap_data,
             columns=["Nom du fichier", "H1", "Lien", "Statut"],
         )
-        df.to_excel(recap_excel_path, index=False)
+        _save_excel(df, recap_excel_path, append)
         logger.info("🎉 Extraction terminée. Résultats enregistrés dans :")
         logger.info("- 📁 Fiches : %s", save_directory)
         logger.info("- 📊 Récapitulatif : %s", recap_excel_path)
+        reporter.finished(_cancelled_error(exit_code))
+    return exit_code
+
+
+# Actions of :func:`scrap_produits_une_visite`, in extraction order: the
+# fiche converts the links of the parsed page in place, so it comes last.
+PAGE_ACTIONS = ("variantes", "images", "fiches")
+
+
+def scrap_produits_une_visite(
+    id_url_map: dict,
+    ids_selectionnes: list,
+    paths: dict,
+    headless: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    image_selector: Optional[str] = None,
+    cancel: Optional[CancelToken] = None,
+    append: bool = False,
+) -> int:
+    """Run several page actions with a single visit of every product.
+
+    *paths* maps the requested actions among :data:`PAGE_ACTIONS` to
+    their output directory. Each product page is loaded once in one
+    browser. The variant rows, the image URLs and the description fiche
+    are then read from that page: its source is captured and parsed
+    once. The outputs are the ones of :func:`scrap_produits_par_ids`,
+    ``ImageScraper.scrape_images`` and :func:`scrap_fiches_concurrents`.
+
+    Parameters
+    ----------
+    headless : bool, optional
+        Run Selenium without GUI when ``True``.
+    progress : callable, optional
+        Receives the :class:`~core.progress.ProgressEvent` of every
+        requested action, one item per product ID.
+    image_selector : str, optional
+        CSS selector of the product images (``ImageScraper`` default).
+    cancel : CancelToken, optional
+        Stops the run between products, see
+        :func:`scrap_produits_par_ids`.
+    append : bool, optional
+        Keep the rows of the existing spreadsheets.
+    """
+    actions = [action for action in PAGE_ACTIONS if action in paths]
+    if not actions:
+        raise ValueError(f"paths must name one of {PAGE_ACTIONS}")
+    total = len(ids_selectionnes)
+    reporters = {
+        action: ProgressReporter(progress, action, total)
+        for action in actions
+    }
+    for reporter in reporters.values():
+        reporter.started()
+    images = None
+    if "images" in paths:
+        images = ImageScraper(root_folder=paths["images"])
+        if image_selector:
+            images.selector = image_selector
+    save_directory = None
+    if "fiches" in paths:
+        save_directory = os.path.join(paths["fiches"], "fiches_concurrents")
+    driver = None
+    exit_code = 0
+    woocommerce_rows = []
+    recap_data = []
+    try:
+        driver = _get_driver(headless=headless)
+        for directory in paths.values():
+            os.makedirs(directory, exist_ok=True)
+        if save_directory:
+            os.makedirs(save_directory, exist_ok=True)
+        if images is not None:
+            images.driver = driver
+
+        logger.info("🚀 Début du scraping de %d liens...", total)
+        for idx, id_produit in enumerate(ids_selectionnes, start=1):
+            check(cancel)
+            for reporter in reporters.values():
+                reporter.item_started(idx, id_produit)
+            url = id_url_map.get(id_produit)
+            if not url:
+                logger.warning(
+                    "ID introuvable dans le fichier : %s",
+                    id_produit,
+                )
+                recap_data.append(("?", "?", id_produit, "ID non trouvé"))
+                for reporter in reporters.values():
+                    reporter.item_finished(
+                        idx, id_produit, error="ID introuvable"
+                    )
+                continue
+
+            logger.info("🔎 [%d/%d] %s → %s", idx, total, id_produit, url)
+            try:
+                with download_slot(cancel):
+                    start = time.perf_counter()
+                    driver.get(url)
+                    load = time.perf_counter() - start
+                sleep(random.uniform(2.5, 3.5), cancel)
+                # Also triggers the lazy loading of the gallery.
+                driver.execute_script(
+                    "window.scrollTo(0, document.body.scrollHeight * 0.3);"
+                )
+                sleep(2, cancel)
+                html = driver.page_source
+            except Exception as e:
+                exit_code = 1
+                logger.error("Erreur sur %s → %s", url, e)
+                recap_data.append(("?", "?", url, "Extraction Échec"))
+                for reporter in reporters.values():
+                    reporter.item_finished(
+                        idx, id_produit, error=str(e), url=url
+                    )
+                continue
+
+            start = time.perf_counter()
+            size = len(html.encode("utf-8"))
+            product = extract_product_info(html)
+            soup = BeautifulSoup(html, "html.parser")
+            # Parsing time shared by the actions.
+            shared = time.perf_counter() - start
+            # The first action reports the page load and its bytes, the
+            # others only what they download themselves (images): the
+            # metrics then count each page once.
+            page_load, page_size = load, size
+            for action, reporter in reporters.items():
+                done = page_size
+                failure = None
+                details = None
+                start = time.perf_counter()
+                try:
+                    if action == "variantes":
+                        rows = _variant_rows(driver, product, id_produit)
+                        woocommerce_rows.extend(rows)
+                        details = _variant_details(
+                            rows,
+                            os.path.join(
+                                paths["variantes"], "woocommerce_mix.xlsx"
+                            ),
+                        )
+                    elif action == "images":
+                        # Read from the snapshot: no WebDriver round trip
+                        # per image.
+                        srcs = [
+                            urljoin(url, img["src"])
+                            for img in soup.select(images.selector)
+                            if img.get("src")
+                        ]
+                        title = images.get_product_title()
+                        saved, failure = images.save_images(
+                            title, srcs, cancel
+                        )
+                        done += saved
+                        details = {
+                            "output": os.path.join(
+                                images.root_folder, images.slugify(title)
+                            )
+                        }
+                    else:
+                        filename, title = _save_fiche(
+                            soup, product, save_directory
+                        )
+                        logger.info("✅ Extraction OK (%s)", filename)
+                        recap_data.append(
+                            (filename, title, url, "Extraction OK")
+                        )
+                        details = {
+                            "output": os.path.join(save_directory, filename)
+                        }
+                except Exception as e:
+                    failure = str(e)
+                    logger.error("❌ %s — %s : %s", action, url, e)
+                    if action == "fiches":
+                        recap_data.append(("?", "?", url, "Extraction Échec"))
+                if failure is not None:
+                    exit_code = 1
+                reporter.item_finished(
+                    idx, id_produit, size=done, error=failure, url=url,
+                    load=page_load,
+                    parse=shared + time.perf_counter() - start,
+                    details=details,
+                )
+                page_load = page_size = 0
+    except Cancelled:
+        exit_code = EXIT_CANCELLED
+        logger.warning("⏹️ Scraping interrompu avant le produit %d", idx)
+    finally:
+        if driver:
+            driver.quit()
+        if "variantes" in paths:
+            fichier_excel = os.path.join(
+                paths["variantes"], "woocommerce_mix.xlsx"
+            )
+            _save_excel(
+                pd.DataFrame(woocommerce_rows), fichier_excel, append
+            )
+            logger.info("📁 Données sauvegardées dans : %s", fichier_excel)
+        if "fiches" in paths:
+            recap_excel_path = os.path.join(
+                paths["fiches"], "recap_concurrents.xlsx"
+            )
+            _save_excel(
+                pd.DataFrame(
+                    recap_data,
+                    columns=["Nom du fichier", "H1", "Lien", "Statut"],
+                ),
+                recap_excel_path,
+                append,
+            )
+            logger.info("- 📁 Fiches : %s", save_directory)
+            logger.info("- 📊 Récapitulatif : %s", recap_excel_path)
+        for reporter in reporters.values():
+            reporter.finished(_cancelled_error(exit_code))
     return exit_code
 
 
 def export_fiches_concurrents_json(
     base_dir: str,
     taille_batch: int = 5,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelToken] = None,
 ) -> int:
-    """Export scraped pages to JSON batches of ``taille_batch`` files."""
+    """Export scraped pages to JSON batches of ``taille_batch`` files.
+
+    *progress* receives the :class:`~core.progress.ProgressEvent` of the
+    ``export`` action, one item per batch file. *cancel* stops the export
+    between two batches.
+    """
     dossier_source = os.path.join(base_dir, "fiches_concurrents")
     dossier_sortie = os.path.join(dossier_source, "batches_json")
     os.makedirs(dossier_sortie, exist_ok=True)
@@ -329,12 +694,19 @@ def export_fiches_concurrents_json(
         return match.group(1).strip() if match else ""
 
     exit_code = 0
-    total_batches = math.ceil(len(fichiers_txt) / taille_batch) if fichiers_txt else 0
+    total_batches = math.ceil(len(fichiers_txt) / taille_batch)
+    reporter = ProgressReporter(progress, "export", total_batches)
+    reporter.started()
     try:
         for i in range(0, len(fichiers_txt), taille_batch):
             batch_num = i // taille_batch + 1
             batch = fichiers_txt[i:i + taille_batch]
             data_batch = []
+            nom_fichier_sortie = f"batch_{i // taille_batch + 1}.json"
+            check(cancel)
+            reporter.item_started(batch_num, nom_fichier_sortie)
+            size = 0
+            failure = None
 
             logger.info("📦 %d / %d", batch_num, total_batches)
             logger.info(
@@ -347,6 +719,7 @@ def export_fiches_concurrents_json(
                 try:
                     with open(chemin, "r", encoding="utf-8") as f:
                         contenu = f.read()
+                    size += os.path.getsize(chemin)
                     h1 = extraire_h1(contenu)
                     id_source = os.path.splitext(fichier)[0]
                     data_batch.append({
@@ -359,16 +732,22 @@ def export_fiches_concurrents_json(
                     logger.info("  ✅ %s — h1: %s...", fichier, h1[:50])
                 except Exception as e:
                     exit_code = 1
+                    failure = failure or f"{fichier}: {e}"
                     logger.warning("  ⚠️ Erreur lecture %s: %s", fichier, e)
                     continue
                 id_global += 1
 
-            nom_fichier_sortie = f"batch_{i // taille_batch + 1}.json"
             chemin_sortie = os.path.join(dossier_sortie, nom_fichier_sortie)
             with open(chemin_sortie, "w", encoding="utf-8") as f_json:
                 json.dump(data_batch, f_json, ensure_ascii=False, indent=2)
 
             logger.info("    ➡️ Batch sauvegardé : %s", nom_fichier_sortie)
+            reporter.item_finished(
+                batch_num, nom_fichier_sortie, size=size, error=failure
+            )
+    except Cancelled:
+        exit_code = EXIT_CANCELLED
+        logger.warning("⏹️ Export interrompu après %d lot(s)", reporter.done)
     finally:
         logger.info(
             "✅ Export JSON terminé avec lots de %d produits. "
@@ -376,4 +755,5 @@ def export_fiches_concurrents_json(
             taille_batch,
             dossier_sortie,
         )
+        reporter.finished(_cancelled_error(exit_code))
     return exit_code
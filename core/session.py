@@ -0,0 +1,235 @@
+"""Scraping sessions of the GUI, run in a child process.
+
+:func:`run_session` runs the actions chosen in the scraping tab
+(``variantes``, ``fiches``, ``export``) in the current process.
+:class:`SessionProcess` runs it in a child process instead: parsing and
+the Excel exports no longer compete with the GUI for the GIL, and a crash
+of Chrome or of the driver only ends the child.
+
+The child sends back over a queue the :class:`~core.progress.ProgressEvent`
+of the actions (``EVENT``), its log records (``LOG``) and its exit code
+(``DONE``). :meth:`SessionProcess.messages` yields them and ends with
+``CRASHED`` when the child died without sending its exit code. The
+:class:`~core.cancellation.CancelToken` of the session is shared with the
+child, so pause, resume and stop work as in the current process.
+
+``core.scraper`` (selenium, pandas) is only imported when a session runs.
+"""
+
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .cancellation import EXIT_CANCELLED, Cancelled, CancelToken
+from .jobs import DownloadSlots, install_download_slots
+from .progress import ProgressCallback
+from .utils import charger_liens_avec_id_fichier
+
+if TYPE_CHECKING:  # pragma: no cover - bound by _import_scraper
+    from .scraper import (
+        export_fiches_concurrents_json,
+        scrap_fiches_concurrents,
+        scrap_produits_par_ids,
+        scrap_produits_une_visite,
+    )
+
+logger = logging.getLogger(__name__)
+
+EVENT = "event"
+LOG = "log"
+DONE = "done"
+CRASHED = "crashed"
+
+# Seconds between two checks that the child is still alive.
+POLL_INTERVAL = 0.2
+
+_SCRAPER_FUNCTIONS = (
+    "export_fiches_concurrents_json",
+    "scrap_fiches_concurrents",
+    "scrap_produits_par_ids",
+    "scrap_produits_une_visite",
+)
+
+
+def _import_scraper() -> None:
+    """Bind the functions of ``core.scraper`` in this module."""
+    namespace = globals()
+    if all(name in namespace for name in _SCRAPER_FUNCTIONS):
+        return
+    from . import scraper
+
+    for name in _SCRAPER_FUNCTIONS:
+        namespace.setdefault(name, getattr(scraper, name))
+
+
+def __getattr__(name: str):
+    if name in _SCRAPER_FUNCTIONS:
+        _import_scraper()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def run_session(
+    links_file: str,
+    ids: List[str],
+    actions: Dict[str, bool],
+    batch_size: int,
+    paths: Dict[str, str],
+    headless: bool = False,
+    append: bool = False,
+    progress: Optional[ProgressCallback] = None,
+    cancel: Optional[CancelToken] = None,
+) -> int:
+    """Run the chosen *actions* on *ids* and return the exit code.
+
+    When ``variantes`` and ``fiches`` are both chosen, each product page
+    is loaded once (``scrap_produits_une_visite``). The export is skipped
+    once the session is cancelled.
+    """
+    _import_scraper()
+    id_url_map = charger_liens_avec_id_fichier(links_file)
+    if not ids:
+        logger.warning("Aucun ID valide fourni. Abandon...")
+        return 0
+    options = dict(
+        headless=headless, progress=progress, cancel=cancel, append=append
+    )
+    page_actions = [a for a in ("variantes", "fiches") if actions.get(a)]
+    exit_code = 0
+    if len(page_actions) > 1:
+        exit_code = scrap_produits_une_visite(
+            id_url_map,
+            ids,
+            {a: paths[a] for a in page_actions},
+            **options,
+        )
+    elif page_actions:
+        action = page_actions[0]
+        os.makedirs(paths[action], exist_ok=True)
+        function = (
+            scrap_produits_par_ids
+            if action == "variantes"
+            else scrap_fiches_concurrents
+        )
+        exit_code = function(id_url_map, ids, paths[action], **options)
+    if actions.get("export") and not (cancel and cancel.cancelled):
+        fc_dir = paths["fiches"]
+        os.makedirs(fc_dir, exist_ok=True)
+        exit_code = export_fiches_concurrents_json(
+            fc_dir, batch_size, progress=progress, cancel=cancel
+        ) or exit_code
+    if cancel is not None and cancel.cancelled:
+        return EXIT_CANCELLED
+    return exit_code
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    def enqueue(self, record: logging.LogRecord) -> None:
+        self.queue.put_nowait((LOG, record))
+
+
+def _child_main(
+    target: Callable[..., int],
+    job: Dict[str, Any],
+    events: Any,
+    cancel: CancelToken,
+    slots: Optional[DownloadSlots] = None,
+) -> None:
+    install_download_slots(slots)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(events))
+    root.setLevel(logging.INFO)
+    try:
+        code = target(
+            **job, progress=lambda e: events.put((EVENT, e)), cancel=cancel
+        )
+    except Cancelled:
+        code = EXIT_CANCELLED
+    except Exception:
+        logger.exception("Erreur inattendue pendant la session")
+        code = 1
+    events.put((DONE, code))
+
+
+class SessionProcess:
+    """A :func:`run_session` call in a child process.
+
+    *job* holds the arguments of :func:`run_session` but ``progress`` and
+    ``cancel``. *target* replaces :func:`run_session`; like *job* it must
+    be picklable. *slots* limits the downloads of the child, see
+    :func:`core.jobs.download_slot`; the slots a crashed or killed child
+    held are given back to the other sessions.
+    """
+
+    def __init__(
+        self,
+        job: Dict[str, Any],
+        cancel: Optional[CancelToken] = None,
+        target: Callable[..., int] = run_session,
+        slots: Optional[DownloadSlots] = None,
+    ) -> None:
+        # "spawn" everywhere: forking a process running Qt is unsafe.
+        context = multiprocessing.get_context("spawn")
+        self.cancel = cancel or CancelToken(context)
+        self.events = context.Queue()
+        self.slots = slots
+        self.process = context.Process(
+            target=_child_main,
+            args=(target, job, self.events, self.cancel, slots),
+            daemon=True,
+        )
+
+    def start(self) -> None:
+        self.process.start()
+
+    def messages(self) -> Iterator[Tuple[str, Any]]:
+        """Yield the messages of the child until it ends.
+
+        The last message is ``(DONE, exit_code)`` or, when the child died
+        without reporting, ``(CRASHED, process_exit_code)``.
+        """
+        while True:
+            try:
+                message = self.events.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                if self.process.is_alive():
+                    continue
+                # Messages sent just before the end may still be in flight.
+                try:
+                    message = self.events.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    self.process.join()
+                    self._release_slots()
+                    yield CRASHED, self.process.exitcode
+                    return
+            yield message
+            if message[0] == DONE:
+                self.process.join()
+                return
+
+    def terminate(self) -> None:
+        """Kill the child, e.g. when it no longer answers to ``cancel``."""
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self._release_slots()
+
+    def _release_slots(self) -> None:
+        if self.slots is not None and self.slots.release_held():
+            logger.warning(
+                "Créneau de téléchargement libéré après l'arrêt du processus"
+            )
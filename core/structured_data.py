@@ -0,0 +1,306 @@
+"""Structured product data embedded in pages (JSON-LD, microdata, OpenGraph).
+
+Most shops describe their products in a JSON-LD ``Product`` block, with
+microdata or OpenGraph ``<meta>`` tags as alternatives. Reading them once
+per page is much cheaper and more reliable than walking CSS fallbacks.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Union
+
+from lxml import html
+from lxml.html import HtmlElement
+
+logger = logging.getLogger(__name__)
+
+_JSONLD_SCRIPTS = (
+    "//script[contains(translate(@type, 'LDJSON', 'ldjson'), 'ld+json')]"
+)
+_OG_PREFIXES = ("og:", "product:")
+_URL_PROPS = {"a", "area", "link"}
+_SRC_PROPS = {"audio", "embed", "iframe", "img", "source", "track", "video"}
+_JSON_WRAPPERS = re.compile(r"^\s*(?:<!--|<!\[CDATA\[)|(?:-->|\]\]>)\s*$")
+
+
+def _parse_tree(source: Union[str, bytes, HtmlElement]) -> Optional[Any]:
+    if not isinstance(source, (str, bytes)):
+        return source
+    if not source.strip():
+        return None
+    try:
+        return html.document_fromstring(source)
+    except Exception as exc:  # malformed page
+        logger.debug("Unable to parse page for structured data: %s", exc)
+        return None
+
+
+def _flatten_jsonld(value: Any, out: List[Dict[str, Any]]) -> None:
+    if isinstance(value, list):
+        for item in value:
+            _flatten_jsonld(item, out)
+    elif isinstance(value, dict):
+        out.append(value)
+        if "@graph" in value:
+            _flatten_jsonld(value["@graph"], out)
+
+
+def _parse_jsonld(tree: Any) -> List[Dict[str, Any]]:
+    objects: List[Dict[str, Any]] = []
+    for script in tree.xpath(_JSONLD_SCRIPTS):
+        text = _JSON_WRAPPERS.sub("", script.text or "")
+        if not text.strip():
+            continue
+        try:
+            value = json.loads(text, strict=False)
+        except ValueError as exc:
+            logger.debug("Invalid JSON-LD block ignored: %s", exc)
+            continue
+        _flatten_jsonld(value, objects)
+    return objects
+
+
+def _microdata_value(elem: HtmlElement) -> Any:
+    if elem.get("itemscope") is not None:
+        return _microdata_item(elem)
+    if elem.get("content") is not None:
+        return elem.get("content").strip()
+    tag = elem.tag
+    if tag in _URL_PROPS and elem.get("href"):
+        return elem.get("href").strip()
+    if tag in _SRC_PROPS and elem.get("src"):
+        return elem.get("src").strip()
+    if tag in {"data", "meter"} and elem.get("value") is not None:
+        return elem.get("value").strip()
+    if tag == "time" and elem.get("datetime"):
+        return elem.get("datetime").strip()
+    return " ".join(elem.text_content().split())
+
+
+def _microdata_item(item: HtmlElement) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    itemtype = item.get("itemtype")
+    if itemtype:
+        types = [t.rstrip("/").rsplit("/", 1)[-1] for t in itemtype.split()]
+        result["@type"] = types[0] if len(types) == 1 else types
+    for prop in item.xpath(".//*[@itemprop]"):
+        owner = prop.xpath("ancestor::*[@itemscope][1]")
+        if not owner or owner[0] is not item:
+            continue
+        value = _microdata_value(prop)
+        for name in prop.get("itemprop").split():
+            if name not in result:
+                result[name] = value
+            elif isinstance(result[name], list):
+                result[name].append(value)
+            else:
+                result[name] = [result[name], value]
+    return result
+
+
+def _parse_microdata(tree: Any) -> List[Dict[str, Any]]:
+    return [
+        _microdata_item(item)
+        for item in tree.xpath("//*[@itemscope and not(@itemprop)]")
+    ]
+
+
+def _parse_opengraph(tree: Any) -> Dict[str, Any]:
+    props: Dict[str, Any] = {}
+    for meta in tree.xpath("//meta[@property or @name][@content]"):
+        key = (meta.get("property") or meta.get("name")).strip().lower()
+        if not key.startswith(_OG_PREFIXES):
+            continue
+        value = meta.get("content").strip()
+        if key not in props:
+            props[key] = value
+        elif isinstance(props[key], list):
+            props[key].append(value)
+        else:
+            props[key] = [props[key], value]
+    return props
+
+
+def extract_structured_data(
+    source: Union[str, bytes, HtmlElement]
+) -> Dict[str, Any]:
+    """Return every structured block found in *source*.
+
+    *source* is an HTML string or an already parsed lxml tree. The result
+    has the keys ``jsonld`` (list of objects, ``@graph`` flattened),
+    ``microdata`` (list of top-level items) and ``opengraph`` (dict of
+    ``og:*`` and ``product:*`` properties).
+    """
+    data: Dict[str, Any] = {"jsonld": [], "microdata": [], "opengraph": {}}
+    tree = _parse_tree(source)
+    if tree is None:
+        return data
+    data["jsonld"] = _parse_jsonld(tree)
+    data["microdata"] = _parse_microdata(tree)
+    data["opengraph"] = _parse_opengraph(tree)
+    return data
+
+
+def _has_type(obj: Dict[str, Any], name: str) -> bool:
+    types = obj.get("@type")
+    if isinstance(types, str):
+        types = [types]
+    return any(
+        isinstance(t, str) and t.rsplit("/", 1)[-1] == name
+        for t in types or []
+    )
+
+
+def find_product(objects: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the first ``Product`` (or ``ProductGroup``) of *objects*."""
+    for name in ("Product", "ProductGroup"):
+        for obj in objects:
+            if _has_type(obj, name):
+                return obj
+    return None
+
+
+def resolve_path(obj: Any, path: str) -> Any:
+    """Follow a dotted *path* such as ``offers.price`` inside *obj*.
+
+    Numeric parts index lists; other parts applied to a list use the
+    first element providing the key. ``None`` is returned when the path
+    does not exist.
+    """
+    current = obj
+    for part in path.split("."):
+        if current is None:
+            return None
+        if isinstance(current, list):
+            if part.isdigit():
+                index = int(part)
+                current = current[index] if index < len(current) else None
+                continue
+            current = next(
+                (
+                    item[part]
+                    for item in current
+                    if isinstance(item, dict) and item.get(part) is not None
+                ),
+                None,
+            )
+        elif isinstance(current, dict):
+            current = current.get(part)
+        else:
+            return None
+    return current
+
+
+def lookup(data: Dict[str, Any], source: str, path: str) -> Any:
+    """Resolve *path* in the *source* block of :func:`extract_structured_data`.
+
+    *source* is ``"jsonld"``, ``"microdata"`` or ``"og"``. For JSON-LD and
+    microdata the ``Product`` object is tried first, then every object in
+    document order. OpenGraph paths may omit the ``og:`` prefix.
+    """
+    if source == "og":
+        props = data.get("opengraph", {})
+        key = path.lower()
+        return props.get(key) if key in props else props.get("og:" + key)
+
+    objects = data.get(source) or []
+    product = find_product(objects)
+    candidates = ([product] if product else []) + objects
+    for obj in candidates:
+        value = resolve_path(obj, path)
+        if value is not None:
+            return value
+    return None
+
+
+def _first(value: Any) -> Any:
+    while isinstance(value, list):
+        value = value[0] if value else None
+    return value
+
+
+def _image_urls(value: Any) -> List[str]:
+    if value is None:
+        return []
+    items = value if isinstance(value, list) else [value]
+    urls = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("url") or item.get("contentUrl")
+        if isinstance(item, str) and item.strip():
+            urls.append(item.strip())
+    return urls
+
+
+def _short_availability(value: Any) -> Optional[str]:
+    value = _first(value)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip().rstrip("/").rsplit("/", 1)[-1]
+
+
+def extract_product_info(
+    source: Union[str, bytes, HtmlElement, Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Return the main product fields embedded in a page.
+
+    *source* is an HTML string, a parsed tree or the result of
+    :func:`extract_structured_data`. The returned dict only contains the
+    keys that were found among ``name``, ``price``, ``currency``,
+    ``availability``, ``images`` and ``sku``; JSON-LD wins over microdata,
+    which wins over OpenGraph. ``name`` only comes from a Product: the
+    ``og:title`` of a shop usually carries its name, unlike the ``<h1>``
+    the scrapers fall back to.
+    """
+    if isinstance(source, dict):
+        data = source
+    else:
+        data = extract_structured_data(source)
+
+    info: Dict[str, Any] = {}
+    for block in ("jsonld", "microdata"):
+        product = find_product(data.get(block) or [])
+        if not product:
+            continue
+        fields = {
+            "name": _first(product.get("name")),
+            "price": _first(
+                resolve_path(product, "offers.price")
+                or resolve_path(product, "offers.lowPrice")
+            ),
+            "currency": _first(resolve_path(product, "offers.priceCurrency")),
+            "availability": _short_availability(
+                resolve_path(product, "offers.availability")
+            ),
+            "images": _image_urls(product.get("image")),
+            "sku": _first(product.get("sku")),
+        }
+        for key, value in fields.items():
+            if key not in info and value not in (None, "", []):
+                info[key] = value
+
+    og = data.get("opengraph") or {}
+    fallbacks = {
+        "price": _first(
+            og.get("product:price:amount") or og.get("og:price:amount")
+        ),
+        "currency": _first(
+            og.get("product:price:currency") or og.get("og:price:currency")
+        ),
+        "availability": _short_availability(og.get("product:availability")),
+        "images": _image_urls(og.get("og:image")),
+    }
+    for key, value in fallbacks.items():
+        if key not in info and value not in (None, "", []):
+            info[key] = value
+
+    if "price" in info:
+        price = str(info["price"]).strip()
+        if "," in price and "." not in price:
+            price = price.replace(",", ".")
+        info["price"] = price
+    for key in ("name", "currency", "sku"):
+        if key in info:
+            info[key] = str(info[key]).strip()
+    return info
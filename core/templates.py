@@ -0,0 +1,261 @@
+"""Page template fingerprints used to pick a mapping automatically.
+
+A fingerprint is the set of hashed shingles of a page skeleton: the body
+is walked in document order down to a limited depth, every element becomes
+a ``depth:tag.class`` token (classes containing digits, usually product
+specific, are ignored) and each run of consecutive tokens is hashed.
+Pages built from the same template share most shingles whatever their
+text, so the Jaccard similarity of two fingerprints tells whether they
+come from the same template.
+
+:class:`TemplateIndex` stores known templates with their mapping and the
+fingerprints of pages that matched no template, grouped by
+:meth:`TemplateIndex.unknown_clusters` for review. It is saved as JSON.
+"""
+
+import json
+import logging
+import re
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from lxml import etree, html
+
+logger = logging.getLogger(__name__)
+
+SKELETON_DEPTH = 8
+MAX_NODES = 2000
+SHINGLE_SIZE = 3
+# Smallest similarity for a page to be routed to a known template.
+MATCH_THRESHOLD = 0.6
+# Sample fingerprints kept per template.
+MAX_SAMPLES = 5
+# Unknown pages kept for review, the oldest dropped first.
+MAX_UNKNOWN = 500
+
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+_STABLE_CLASS = re.compile(r"^[A-Za-z_-]+$")
+
+Fingerprint = frozenset
+
+
+def _token(elem: Any, level: int) -> str:
+    classes = sorted({
+        c for c in (elem.get("class") or "").split() if _STABLE_CLASS.match(c)
+    })
+    return f"{level}:{elem.tag}" + "".join("." + c for c in classes)
+
+
+def page_fingerprint(
+    source: Union[str, bytes, Any],
+    *,
+    depth: int = SKELETON_DEPTH,
+    max_nodes: int = MAX_NODES,
+    size: int = SHINGLE_SIZE,
+) -> Fingerprint:
+    """Return the skeleton fingerprint of *source* (HTML or lxml tree).
+
+    Only the first *max_nodes* elements down to *depth* levels below
+    ``<body>`` are read, so the cost does not grow with the page size.
+    """
+
+    if isinstance(source, (str, bytes)):
+        if not source.strip():
+            return frozenset()
+        try:
+            source = html.document_fromstring(source)
+        except (etree.ParserError, ValueError) as exc:
+            logger.debug("Unable to parse page for fingerprint: %s", exc)
+            return frozenset()
+    body = source.find("body")
+    root = body if body is not None else source
+
+    tokens: List[str] = []
+    stack: List[Tuple[Any, int]] = [(root, 0)]
+    while stack and len(tokens) < max_nodes:
+        elem, level = stack.pop()
+        tokens.append(_token(elem, level))
+        if level < depth:
+            children = [
+                child
+                for child in elem
+                if isinstance(child.tag, str)
+                and child.tag not in _SKIPPED_TAGS
+            ]
+            stack.extend((child, level + 1) for child in reversed(children))
+
+    if len(tokens) < size:
+        shingles = ["|".join(tokens)] if tokens else []
+    else:
+        shingles = [
+            "|".join(tokens[i:i + size])
+            for i in range(len(tokens) - size + 1)
+        ]
+    return frozenset(zlib.crc32(s.encode("utf-8")) for s in shingles)
+
+
+def similarity(a: Fingerprint, b: Fingerprint) -> float:
+    """Jaccard similarity of two fingerprints."""
+
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+def _best_score(fingerprint: Fingerprint, samples: Iterable[Fingerprint]):
+    best = 0.0
+    size = len(fingerprint)
+    for sample in samples:
+        # Jaccard can not exceed the ratio of the two sizes.
+        if min(size, len(sample)) <= best * max(size, len(sample)):
+            continue
+        best = max(best, similarity(fingerprint, sample))
+    return best
+
+
+class TemplateIndex:
+    """Known templates linked to their mapping, plus unmatched pages."""
+
+    def __init__(self, threshold: float = MATCH_THRESHOLD):
+        self.threshold = threshold
+        self.templates: Dict[str, Dict[str, Any]] = {}
+        self.unknown: List[Dict[str, Any]] = []
+
+    # -- persistence -------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "TemplateIndex":
+        """Return the index saved in *path* (an empty one if missing)."""
+
+        index = cls()
+        path = Path(path)
+        if not path.exists():
+            return index
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except ValueError as exc:
+            raise ValueError(f"Invalid template index: {exc}") from exc
+        index.threshold = data.get("threshold", MATCH_THRESHOLD)
+        for name, entry in data.get("templates", {}).items():
+            index.templates[name] = {
+                "mapping": entry["mapping"],
+                "samples": [frozenset(s) for s in entry.get("samples", [])],
+                "urls": list(entry.get("urls", [])),
+            }
+        for entry in data.get("unknown", []):
+            index.unknown.append({
+                "url": entry.get("url"),
+                "fingerprint": frozenset(entry.get("fingerprint", [])),
+            })
+        return index
+
+    def save(self, path: Union[str, Path]) -> None:
+        data = {
+            "threshold": self.threshold,
+            "templates": {
+                name: {
+                    "mapping": entry["mapping"],
+                    "samples": [sorted(s) for s in entry["samples"]],
+                    "urls": entry["urls"],
+                }
+                for name, entry in self.templates.items()
+            },
+            "unknown": [
+                {"url": u["url"], "fingerprint": sorted(u["fingerprint"])}
+                for u in self.unknown
+            ],
+        }
+        Path(path).write_text(
+            json.dumps(data, ensure_ascii=False), encoding="utf-8"
+        )
+
+    # -- templates ---------------------------------------------------------
+
+    def add(
+        self,
+        name: str,
+        mapping: Dict[str, Any],
+        fingerprint: Fingerprint,
+        url: Optional[str] = None,
+    ) -> None:
+        """Link *fingerprint* (a sample page) to template *name*.
+
+        The mapping of an existing template is replaced. Unknown pages
+        matching the new sample are forgotten.
+        """
+
+        entry = self.templates.setdefault(
+            name, {"mapping": mapping, "samples": [], "urls": []}
+        )
+        entry["mapping"] = mapping
+        if fingerprint and fingerprint not in entry["samples"]:
+            entry["samples"].append(fingerprint)
+            del entry["samples"][:-MAX_SAMPLES]
+        if url and url not in entry["urls"]:
+            entry["urls"].append(url)
+            del entry["urls"][:-MAX_SAMPLES]
+        self.unknown = [
+            u
+            for u in self.unknown
+            if similarity(u["fingerprint"], fingerprint) < self.threshold
+        ]
+
+    def match(
+        self, fingerprint: Fingerprint
+    ) -> Optional[Tuple[str, Dict[str, Any], float]]:
+        """Return ``(name, mapping, score)`` of the closest template.
+
+        ``None`` is returned when no template reaches the threshold.
+        """
+
+        best: Optional[Tuple[str, Dict[str, Any], float]] = None
+        for name, entry in self.templates.items():
+            score = _best_score(fingerprint, entry["samples"])
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = (name, entry["mapping"], score)
+        return best
+
+    # -- unknown templates -------------------------------------------------
+
+    def record_unknown(self, url: str, fingerprint: Fingerprint) -> None:
+        """Remember a page that matched no template, for review.
+
+        A URL already recorded is not added again.
+        """
+
+        if not fingerprint or any(u["url"] == url for u in self.unknown):
+            return
+        self.unknown.append({"url": url, "fingerprint": fingerprint})
+        del self.unknown[:-MAX_UNKNOWN]
+
+    def unknown_clusters(
+        self, threshold: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Group unknown pages sharing a template, largest group first.
+
+        Each cluster is ``{"size", "urls", "fingerprint"}`` where the
+        fingerprint is the one of its first page. Greedy leader
+        clustering: a page joins the first cluster it is similar enough
+        to, or starts a new one.
+        """
+
+        threshold = self.threshold if threshold is None else threshold
+        clusters: List[Dict[str, Any]] = []
+        for page in self.unknown:
+            for cluster in clusters:
+                if similarity(page["fingerprint"], cluster["fingerprint"]) >= (
+                    threshold
+                ):
+                    cluster["urls"].append(page["url"])
+                    break
+            else:
+                clusters.append({
+                    "urls": [page["url"]],
+                    "fingerprint": page["fingerprint"],
+                })
+        for cluster in clusters:
+            cluster["size"] = len(cluster["urls"])
+        clusters.sort(key=lambda c: c["size"], reverse=True)
+        return clusters
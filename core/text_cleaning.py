@@ -0,0 +1,177 @@
+"""Line based cleaning of scraped product descriptions.
+
+Descriptions often mix the product text with shop boilerplate (delivery,
+returns, payment...). :class:`TextCleaner` drops the lines that are too
+short or mention one of the ignored keywords and can also drop repeated
+lines. The keywords are compiled into one regular expression and the text
+is lowercased once, so cleaning costs a single scan per description.
+
+Rule sets describe how a site is cleaned::
+
+    {"extra_keywords": ["click & collect"], "min_length": 20, "dedupe": true}
+
+``keywords`` replaces the default keyword list, ``extra_keywords`` extends
+it. Named rule sets are registered with :func:`register_rule_set` or
+loaded from a JSON file with :func:`load_rule_sets`.
+"""
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Union
+
+DEFAULT_KEYWORDS = (
+    "livraison",
+    "retour",
+    "contact",
+    "paiement",
+    "bob crew",
+    "service client",
+)
+# Lines whose stripped length is not above this value are dropped.
+DEFAULT_MIN_LENGTH = 30
+
+_RULE_KEYS = {"keywords", "extra_keywords", "min_length", "dedupe"}
+_RULE_SETS: Dict[str, Dict[str, Any]] = {"default": {}}
+
+Rules = Union[None, bool, str, Dict[str, Any]]
+
+
+class TextCleaner:
+    """Compiled cleaning pipeline: length filter, keyword filter, dedupe."""
+
+    def __init__(
+        self,
+        keywords: Iterable[str] = DEFAULT_KEYWORDS,
+        min_length: int = DEFAULT_MIN_LENGTH,
+        dedupe: bool = False,
+    ):
+        self.keywords = tuple(dict.fromkeys(k.lower() for k in keywords if k))
+        self.min_length = min_length
+        self.dedupe = dedupe
+        self._search = None
+        if self.keywords:
+            # Longest first so that overlapping keywords still match.
+            alternatives = sorted(self.keywords, key=len, reverse=True)
+            self._search = re.compile(
+                "|".join(re.escape(k) for k in alternatives)
+            ).search
+
+    def clean(self, text: str) -> str:
+        """Return *text* without the ignored lines."""
+
+        lines = text.splitlines()
+        # ``lower`` never adds or removes line breaks, both lists align.
+        lowered = text.lower().splitlines()
+        search = self._search
+        min_length = self.min_length
+        seen = set() if self.dedupe else None
+        kept = []
+        for line, low in zip(lines, lowered):
+            if len(line.strip()) <= min_length:
+                continue
+            if search is not None and search(low):
+                continue
+            if seen is not None:
+                key = " ".join(low.split())
+                if key in seen:
+                    continue
+                seen.add(key)
+            kept.append(line)
+        return "\n".join(kept)
+
+    def clean_many(self, texts: Iterable[str]) -> List[str]:
+        """Clean every text of *texts* with the same compiled rules."""
+
+        clean = self.clean
+        return [clean(text) for text in texts]
+
+
+def _check_rules(rules: Dict[str, Any]) -> None:
+    unknown = set(rules) - _RULE_KEYS
+    if unknown:
+        raise ValueError(f"Unknown cleaning rules: {sorted(unknown)}")
+    for key in ("keywords", "extra_keywords"):
+        value = rules.get(key, [])
+        if isinstance(value, str) or not all(
+            isinstance(k, str) for k in value
+        ):
+            raise ValueError(f"{key} must be a list of strings")
+    if not isinstance(rules.get("min_length", 0), int):
+        raise ValueError("min_length must be an integer")
+
+
+def _build(rules: Dict[str, Any]) -> TextCleaner:
+    keywords = list(rules.get("keywords", DEFAULT_KEYWORDS))
+    keywords += rules.get("extra_keywords", [])
+    return TextCleaner(
+        keywords,
+        rules.get("min_length", DEFAULT_MIN_LENGTH),
+        bool(rules.get("dedupe", False)),
+    )
+
+
+@lru_cache(maxsize=64)
+def _cached_cleaner(key: str) -> TextCleaner:
+    return _build(json.loads(key))
+
+
+def register_rule_set(name: str, rules: Dict[str, Any]) -> None:
+    """Register (or replace) the rule set *name*, e.g. a site name."""
+
+    _check_rules(rules)
+    _RULE_SETS[name] = dict(rules)
+
+
+def load_rule_sets(path: Union[str, Path]) -> List[str]:
+    """Register every rule set of a JSON file ``{name: rules}``.
+
+    Returns the registered names.
+    """
+
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except ValueError as exc:
+        raise ValueError(f"Invalid cleaning rules file: {exc}") from exc
+    if not isinstance(data, dict) or not all(
+        isinstance(v, dict) for v in data.values()
+    ):
+        raise ValueError("cleaning rules file must map names to rule sets")
+    for name, rules in data.items():
+        register_rule_set(name, rules)
+    return list(data)
+
+
+def get_cleaner(rules: Rules = None) -> TextCleaner:
+    """Return the compiled cleaner for *rules*.
+
+    *rules* is the name of a registered rule set, a rule set dict, or
+    ``None`` or any other true value (``True``, ``1``...) for the default
+    rules, as a true ``"clean"`` option always meant. Cleaners are
+    cached, so the keywords are only compiled once per rule set.
+    """
+
+    if rules is None or (rules and not isinstance(rules, (str, dict))):
+        rules = "default"
+    if isinstance(rules, str):
+        if rules not in _RULE_SETS:
+            raise ValueError(f"Unknown cleaning rule set {rules!r}")
+        rules = _RULE_SETS[rules]
+    elif isinstance(rules, dict):
+        _check_rules(rules)
+    else:
+        raise ValueError(f"Invalid cleaning rules: {rules!r}")
+    return _cached_cleaner(json.dumps(rules, sort_keys=True))
+
+
+def clean_many(texts: Iterable[str], rules: Rules = None) -> List[str]:
+    """Clean a batch of descriptions with one compiled rule set."""
+
+    return get_cleaner(rules).clean_many(texts)
+
+
+def clean_description(text: str, rules: Rules = None) -> str:
+    """Clean one description, see :func:`get_cleaner` for *rules*."""
+
+    return get_cleaner(rules).clean(text)
@@ -2,9 +2,13 @@
 
 import os
 import re
+import sys
 import unicodedata
+import importlib.util
 import logging
 
+from .links import LinkMap, load_links
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,35 +28,36 @@ def clean_filename(name: str) -> str:
     return safe
 
 
-def charger_liens_avec_id(base_dir: str) -> dict:
+def lazy_import(name: str):
+    """Return module *name*, executed on its first attribute access.
+
+    A missing module raises ``ModuleNotFoundError`` at once, like
+    ``import``.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def charger_liens_avec_id(base_dir: str) -> LinkMap:
     """Load ID→URL mapping from ``liens_avec_id.txt`` in *base_dir*."""
-    id_url_map = {}
-    liens_id_txt = os.path.join(base_dir, "liens_avec_id.txt")
-    if not os.path.exists(liens_id_txt):
-        logger.warning(f"Fichier introuvable : {liens_id_txt}")
-        return id_url_map
-    with open(liens_id_txt, "r", encoding="utf-8") as f:
-        for line in f:
-            parts = line.strip().split(" ", 1)
-            if len(parts) == 2:
-                identifiant, url = parts
-                id_url_map[identifiant.upper()] = url
-    return id_url_map
-
-
-def charger_liens_avec_id_fichier(fichier: str) -> dict:
-    """Load ID→URL mapping from an explicit text file path."""
-    id_url_map = {}
-    if not os.path.exists(fichier):
-        logger.warning(f"Fichier introuvable : {fichier}")
-        return id_url_map
-    with open(fichier, "r", encoding="utf-8") as f:
-        for line in f:
-            parts = line.strip().split(" ", 1)
-            if len(parts) == 2:
-                identifiant, url = parts
-                id_url_map[identifiant.upper()] = url
-    return id_url_map
+    return load_links(os.path.join(base_dir, "liens_avec_id.txt"))
+
+
+def charger_liens_avec_id_fichier(fichier: str) -> LinkMap:
+    """Load ID→URL mapping from an explicit links file path.
+
+    Text, CSV, TSV and XLSX files are read, see :func:`core.links.load_links`.
+    """
+    return load_links(fichier)
 
 
 def extraire_ids_depuis_input(input_str: str) -> list:
@@ -2,53 +2,158 @@
 
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, List, Optional
 
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QGuiApplication
+from lxml import etree
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QThread,
+    QTimer,
+    Qt,
+    Signal,
+)
+from PySide6.QtGui import QCloseEvent, QGuiApplication
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
     QHBoxLayout,
     QTextBrowser,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QLabel,
     QLineEdit,
     QTextEdit,
     QPushButton,
 )
 
-from bs4 import BeautifulSoup
+from core.blocks import Block, find_blocks, rank_blocks
+from core.dom_index import DomIndex
+
+# Characters of the page rendered in the preview until asked otherwise.
+PREVIEW_CHARS = 100_000
+# Blocks found between two provisional rankings sent to the list.
+BATCH_SIZE = 50
+# Best ranked blocks listed.
+MAX_BLOCKS = 20
 
 
 # ---------------------------------------------------------------------------
-def build_css_selector(el: Any) -> str:
-    """Return a CSS selector for ``el`` by walking up the DOM tree."""
-    path: List[str] = []
-    while el and getattr(el, "name", None) and el.name != "[document]":
-        selector = el.name
-        el_id = el.get("id")
-        if el_id:
-            selector += f"#{el_id}"
-            path.insert(0, selector)
-            break
-        classes = el.get("class") or []
-        if classes:
-            selector += "." + ".".join(classes)
-        parent = getattr(el, "parent", None)
-        if parent:
-            siblings = [sib for sib in parent.find_all(el.name, recursive=False)]
-            if len(siblings) > 1:
-                index = siblings.index(el) + 1
-                selector += f":nth-of-type({index})"
-        path.insert(0, selector)
-        el = parent
-    return " > ".join(path)
+def build_css_selector(el: Any, index: Optional[DomIndex] = None) -> str:
+    """Return the shortest unique CSS selector for ``el``.
+
+    Pass the :class:`DomIndex` of the document when building selectors for
+    several elements of the same page; otherwise one is built for ``el``.
+    """
+    if index is None or el not in index:
+        if isinstance(el, etree._Element):
+            root = el.getroottree().getroot()
+        else:
+            root = el
+            while getattr(root, "parent", None) is not None:
+                root = root.parent
+        index = DomIndex(root)
+    return index.css_selector(el)
+
+
+class BlockListModel(QAbstractListModel):
+    """Best ranked blocks, replaced as the analysis of the page goes."""
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self._blocks: List[Block] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._blocks)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        block = self.block(index.row()) if index.isValid() else None
+        if block is None:
+            return None
+        if role == Qt.DisplayRole:
+            return block.snippet
+        if role == Qt.ToolTipRole:
+            return f"{block.words} mots, score {block.score:.2f}"
+        return None
+
+    def block(self, row: int) -> Optional[Block]:
+        if 0 <= row < len(self._blocks):
+            return self._blocks[row]
+        return None
+
+    def row_of(self, block: Optional[Block]) -> int:
+        for row, listed in enumerate(self._blocks):
+            if listed is block:
+                return row
+        return -1
+
+    def set_blocks(self, blocks: List[Block]) -> None:
+        self.beginResetModel()
+        self._blocks = list(blocks)
+        self.endResetModel()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._blocks = []
+        self.endResetModel()
+
+
+class BlockParser(QThread):
+    """Detect the blocks of a page outside of the GUI thread.
+
+    Every ``BATCH_SIZE`` blocks found, ``blocks_found`` sends the ranking
+    of the blocks found so far; the final ranking follows the scan. Every
+    signal carries the job number so that a window can ignore the results
+    of a job it replaced. Interrupting the thread stops the scan.
+    """
+
+    blocks_found = Signal(int, object)
+    done = Signal(int, int)
+
+    def __init__(self, job: int, html: str) -> None:
+        super().__init__()
+        self.job = job
+        self.html = html
+
+    def run(self) -> None:
+        stop = self.isInterruptionRequested
+        found: List[Block] = []
+
+        def add(block: Block) -> None:
+            found.append(block)
+            if not len(found) % BATCH_SIZE:
+                # Found bottom-up: back to document order for the ranking.
+                self._send(rank_blocks(found[::-1], top_k=MAX_BLOCKS))
+
+        blocks = find_blocks(self.html, should_stop=stop, on_block=add)
+        if stop():
+            return
+        blocks = rank_blocks(blocks, top_k=MAX_BLOCKS)
+        self._send(blocks)
+        self.done.emit(self.job, len(blocks))
+        # Build the selectors now so the first click does not index the
+        # page on the GUI thread.
+        for block in blocks:
+            if stop():
+                return
+            block.selector
+
+    def _send(self, blocks: List[Block]) -> None:
+        for block in blocks:
+            block.snippet  # computed here, not when the row is painted
+        self.blocks_found.emit(self.job, blocks)
 
 
 class BlocSelectionWindow(QWidget):
-    """Window used to visualise HTML blocks and select one."""
+    """Window used to visualise HTML blocks and select one.
+
+    The page is analysed by a :class:`BlockParser` thread and the best
+    ranked blocks (see :func:`core.blocks.rank_blocks`) appear in the
+    list while they are found, best first, and are ranked again once the
+    whole page is scanned; the selected block stays selected. Only the
+    first
+    ``PREVIEW_CHARS`` characters of the page are rendered unless the user
+    asks for the whole page.
+    """
 
     def __init__(
         self,
@@ -61,7 +166,13 @@ class BlocSelectionWindow(QWidget):
         self._on_use = on_use
 
         self.html_view = QTextBrowser()
-        self.blocks_list = QListWidget()
+        self.preview_label = QLabel()
+        self.full_preview_btn = QPushButton("Afficher la page entière")
+        self.blocks_model = BlockListModel(self)
+        self.blocks_view = QListView()
+        self.blocks_view.setModel(self.blocks_model)
+        self.blocks_view.setUniformItemSizes(True)
+        self.status_label = QLabel()
         self.selector_edit = QLineEdit()
         self.selector_edit.setReadOnly(True)
         self.text_edit = QTextEdit()
@@ -69,10 +180,17 @@ class BlocSelectionWindow(QWidget):
         self.use_btn = QPushButton("Utiliser ce bloc")
 
         layout = QVBoxLayout(self)
-        layout.addWidget(QLabel("Aperçu du HTML brut:"))
+        preview_row = QHBoxLayout()
+        preview_row.addWidget(QLabel("Aperçu du HTML brut:"))
+        preview_row.addWidget(self.preview_label, 1)
+        preview_row.addWidget(self.full_preview_btn)
+        layout.addLayout(preview_row)
         layout.addWidget(self.html_view, 1)
-        layout.addWidget(QLabel("Liste des blocs détectés:"))
-        layout.addWidget(self.blocks_list, 1)
+        blocks_row = QHBoxLayout()
+        blocks_row.addWidget(QLabel("Liste des blocs détectés:"))
+        blocks_row.addWidget(self.status_label, 1)
+        layout.addLayout(blocks_row)
+        layout.addWidget(self.blocks_view, 1)
         layout.addWidget(QLabel("Sélecteur CSS:"))
         layout.addWidget(self.selector_edit)
         layout.addWidget(QLabel("Texte extrait:"))
@@ -81,49 +199,102 @@ class BlocSelectionWindow(QWidget):
         btn_row.addWidget(self.use_btn)
         layout.addLayout(btn_row)
 
-        self.blocks_list.currentRowChanged.connect(self._show_candidate)
+        self.blocks_view.selectionModel().currentRowChanged.connect(
+            lambda current, _previous: self._show_candidate(current.row())
+        )
+        self.full_preview_btn.clicked.connect(
+            lambda: self._load_preview(full=True)
+        )
         self.use_btn.clicked.connect(self._use_current)
+        app = QGuiApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self._cancel_parser)
+
+        self._html = ""
+        self._job = 0
+        self._parser: Optional[BlockParser] = None
+        self.load_html(html)
+
+    # ------------------------------------------------------------------
+    def load_html(self, html: str) -> None:
+        """Analyse *html*, cancelling the analysis of the previous page."""
+        self._cancel_parser()
+        self._job += 1
+        self._html = html
+        self.blocks_model.clear()
+        self._show_candidate(-1)
+        self.html_view.clear()
+        truncated = len(html) > PREVIEW_CHARS
+        self.preview_label.setText(
+            f"(tronqué à {PREVIEW_CHARS:,} caractères)".replace(",", " ")
+            if truncated
+            else ""
+        )
+        self.full_preview_btn.setVisible(truncated)
+        # Rendered once the window is painted.
+        QTimer.singleShot(0, self._load_preview)
 
-        self._candidates: List[Dict[str, str]] = []
-        self._parse_html(html)
+        self.status_label.setText("Analyse en cours...")
+        self._parser = BlockParser(self._job, html)
+        self._parser.blocks_found.connect(self._add_blocks)
+        self._parser.done.connect(self._parsing_done)
+        self._parser.start()
 
     # ------------------------------------------------------------------
-    def _parse_html(self, html: str) -> None:
+    def _load_preview(self, full: bool = False) -> None:
+        html = self._html if full else self._html[:PREVIEW_CHARS]
         self.html_view.setHtml(html)
-        soup = BeautifulSoup(html, "lxml")
-        tags = ["div", "p", "section", "article", "span"]
-        ignored = {"footer", "nav", "header", "menu"}
-        for tag in soup.find_all(tags):
-            if tag.name in ignored:
-                continue
-            if any(parent.name in ignored for parent in tag.parents):
-                continue
-            text = tag.get_text(" ", strip=True)
-            if len(text.split()) <= 80:
-                continue
-            selector = build_css_selector(tag)
-            snippet = text[:200] + ("..." if len(text) > 200 else "")
-            self._candidates.append({"selector": selector, "text": text})
-            self.blocks_list.addItem(QListWidgetItem(snippet))
+        if full:
+            self.preview_label.clear()
+            self.full_preview_btn.hide()
+
+    # ------------------------------------------------------------------
+    def _cancel_parser(self) -> None:
+        if self._parser is None:
+            return
+        self._parser.requestInterruption()
+        self._parser.wait()
+        self._parser = None
+
+    # ------------------------------------------------------------------
+    def _add_blocks(self, job: int, blocks: List[Block]) -> None:
+        if job != self._job:
+            return
+        current = self.blocks_model.block(
+            self.blocks_view.currentIndex().row()
+        )
+        self.blocks_model.set_blocks(blocks)
+        row = self.blocks_model.row_of(current)
+        if row >= 0:
+            self.blocks_view.setCurrentIndex(self.blocks_model.index(row))
+
+    # ------------------------------------------------------------------
+    def _parsing_done(self, job: int, count: int) -> None:
+        if job == self._job:
+            self.status_label.setText(f"{count} bloc(s)")
 
     # ------------------------------------------------------------------
     def _show_candidate(self, index: int) -> None:
-        if index < 0 or index >= len(self._candidates):
+        block = self.blocks_model.block(index)
+        if block is None:
             self.selector_edit.clear()
             self.text_edit.clear()
             return
-        cand = self._candidates[index]
-        self.selector_edit.setText(cand["selector"])
-        self.text_edit.setPlainText(cand["text"])
+        self.selector_edit.setText(block.selector)
+        self.text_edit.setPlainText(block.text)
 
     # ------------------------------------------------------------------
     def _use_current(self) -> None:
-        idx = self.blocks_list.currentRow()
-        if idx < 0 or idx >= len(self._candidates):
+        block = self.blocks_model.block(self.blocks_view.currentIndex().row())
+        if block is None:
             return
-        selector = self._candidates[idx]["selector"]
-        text = self._candidates[idx]["text"]
+        selector = block.selector
+        text = block.text
         if self._on_use:
             self._on_use(selector, text)
         QGuiApplication.clipboard().setText(selector)
 
+    # ------------------------------------------------------------------
+    def closeEvent(self, event: QCloseEvent) -> None:
+        self._cancel_parser()
+        super().closeEvent(event)
@@ -2,7 +2,10 @@
 
 import os
 import sys
+import json
 import logging
+from core.cancellation import EXIT_CANCELLED, sigint_cancels
+from core.progress import ITEM_FINISHED
 from core.scraper import (
     scrap_produits_par_ids,
     scrap_fiches_concurrents,
@@ -12,6 +15,9 @@ from core.utils import charger_liens_avec_id, extraire_ids_depuis_input
 
 logger = logging.getLogger(__name__)
 
+# Written in the working directory when Ctrl+C stops a scraping action.
+FICHIER_REPRISE = "reprise_scraping.json"
+
 
 def demander_base_dir() -> str:
     default_dir = os.getcwd()
@@ -23,6 +29,55 @@ def demander_base_dir() -> str:
     return rep or default_dir
 
 
+def charger_reprise(base_dir: str) -> dict:
+    """Return the state of an interrupted session, empty when none."""
+    try:
+        with open(
+            os.path.join(base_dir, FICHIER_REPRISE), encoding="utf-8"
+        ) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def sauver_reprise(base_dir: str, action: str, restants: list) -> None:
+    with open(
+        os.path.join(base_dir, FICHIER_REPRISE), "w", encoding="utf-8"
+    ) as f:
+        json.dump({"action": action, "restants": restants}, f)
+
+
+def lancer_action(
+    action: str, fonction, id_url_map, ids, base_dir, cancel, append
+) -> int:
+    """Run a scraping action; on Ctrl+C save the IDs left to resume."""
+    faits = set()
+
+    def suivre(event) -> None:
+        if event.kind == ITEM_FINISHED:
+            faits.add(event.item)
+
+    code = fonction(
+        id_url_map,
+        ids,
+        base_dir,
+        progress=suivre,
+        cancel=cancel,
+        append=append,
+    )
+    if code == EXIT_CANCELLED:
+        restants = [i for i in ids if i not in faits]
+        sauver_reprise(base_dir, action, restants)
+        logger.warning(
+            "\u23f9\ufe0f %d produit(s) restant(s), relance le script pour "
+            "reprendre.",
+            len(restants),
+        )
+    elif os.path.exists(os.path.join(base_dir, FICHIER_REPRISE)):
+        os.remove(os.path.join(base_dir, FICHIER_REPRISE))
+    return code
+
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.INFO,
@@ -32,10 +87,18 @@ if __name__ == "__main__":
     base_dir = demander_base_dir()
 
     id_url_map = charger_liens_avec_id(base_dir)
-    plage_input = input(
-        "\U0001f7e2 Quels identifiants veux-tu scraper ? (ex: A1-A5): "
-    ).strip()
-    ids_selectionnes = extraire_ids_depuis_input(plage_input)
+    reprise = charger_reprise(base_dir)
+    if reprise.get("restants") and input(
+        f"\u23ef\ufe0f Reprendre la session interrompue "
+        f"({len(reprise['restants'])} produit(s) restant(s)) ? (oui/non): "
+    ).strip().lower() == "oui":
+        ids_selectionnes = reprise["restants"]
+    else:
+        reprise = {}
+        plage_input = input(
+            "\U0001f7e2 Quels identifiants veux-tu scraper ? (ex: A1-A5): "
+        ).strip()
+        ids_selectionnes = extraire_ids_depuis_input(plage_input)
 
     if not ids_selectionnes:
         logger.warning("\u26d4 Aucun ID valide fourni. Arr\u00eat du script.")
@@ -44,7 +107,12 @@ if __name__ == "__main__":
     if input(
         "\u25b6\ufe0f Lancer le scraping des variantes ? (oui/non): "
     ).strip().lower() == "oui":
-        code = scrap_produits_par_ids(id_url_map, ids_selectionnes, base_dir)
+        with sigint_cancels() as cancel:
+            code = lancer_action(
+                "variantes", scrap_produits_par_ids, id_url_map,
+                ids_selectionnes, base_dir, cancel,
+                reprise.get("action") == "variantes",
+            )
         if code:
             sys.exit(code)
 
@@ -53,7 +121,12 @@ if __name__ == "__main__":
         " (oui/non): "
     )
     if input(message_fiche).strip().lower() == "oui":
-        code = scrap_fiches_concurrents(id_url_map, ids_selectionnes, base_dir)
+        with sigint_cancels() as cancel:
+            code = lancer_action(
+                "fiches", scrap_fiches_concurrents, id_url_map,
+                ids_selectionnes, base_dir, cancel,
+                reprise.get("action") == "fiches",
+            )
         if code:
             sys.exit(code)
 
@@ -72,6 +145,9 @@ if __name__ == "__main__":
                 "Valeur invalide, on utilise la taille 5 par d\u00e9faut."
             )
             taille_batch = 5
-        code = export_fiches_concurrents_json(base_dir, taille_batch)
+        with sigint_cancels() as cancel:
+            code = export_fiches_concurrents_json(
+                base_dir, taille_batch, cancel=cancel
+            )
         if code:
             sys.exit(code)
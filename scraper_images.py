@@ -2,6 +2,7 @@
 
 import argparse
 from config_loader import load_config
+from core.cancellation import CancelToken, install_sigint_handler
 from core.image_scraper import ImageScraper
 
 DEFAULT_CONFIG = {
@@ -48,7 +49,9 @@ def main() -> None:
     )
 
     urls = scraper.load_urls(links_file)
-    scraper.scrape_images(urls)
+    cancel = CancelToken()
+    install_sigint_handler(cancel)
+    scraper.scrape_images(urls, cancel=cancel)
 
 
 if __name__ == "__main__":  # pragma: no cover - manual execution only
@@ -0,0 +1,95 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip('PySide6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import html_block_selector  # noqa: E402
+from html_block_selector import BlocSelectionWindow  # noqa: E402
+
+TEXT = ' '.join(['description'] * 90)
+
+
+def _page(blocks):
+    body = ''.join(
+        f"<div class='b{i}'><p>{TEXT} {i}</p></div>" for i in range(blocks)
+    )
+    return f'<html><body>{body}</body></html>'
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _wait_for(app, condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timeout'
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def test_blocks_stream_into_model(app, monkeypatch):
+    monkeypatch.setattr(html_block_selector, 'BATCH_SIZE', 7)
+    monkeypatch.setattr(html_block_selector, 'MAX_BLOCKS', 25)
+    used = []
+    window = BlocSelectionWindow(_page(30), lambda s, t: used.append(s))
+    model = window.blocks_model
+    sizes = []
+    model.modelReset.connect(lambda: sizes.append(model.rowCount()))
+
+    _wait_for(app, lambda: window.status_label.text() == '25 bloc(s)')
+    # Provisional rankings every 7 blocks found (a div and its paragraph
+    # collapse into one), then the final one.
+    assert sizes[:3] == [4, 7, 11] and sizes[-1] == 25
+    assert model.rowCount() == 25
+    assert model.data(model.index(0), Qt.ToolTipRole).startswith('91 mots')
+
+    window.blocks_view.setCurrentIndex(model.index(1))
+    assert window.selector_edit.text() == 'div.b1:nth-of-type(2) > p'
+    window._use_current()
+    assert used == ['div.b1:nth-of-type(2) > p']
+    window.close()
+
+
+def test_selection_survives_a_new_ranking(app):
+    window = BlocSelectionWindow(_page(3))
+    _wait_for(app, lambda: window.status_label.text() == '3 bloc(s)')
+    model = window.blocks_model
+    window.blocks_view.setCurrentIndex(model.index(2))
+    selected = model.block(2)
+
+    window._add_blocks(window._job, [model.block(1), selected])
+
+    assert window.blocks_view.currentIndex().row() == 1
+    assert window.selector_edit.text() == selected.selector
+    window.close()
+
+
+def test_new_page_cancels_previous_job(app):
+    window = BlocSelectionWindow(_page(200))
+    window.load_html(_page(2))
+
+    _wait_for(app, lambda: window.status_label.text() == '2 bloc(s)')
+    app.processEvents()
+    assert window.blocks_model.rowCount() == 2
+    window.close()
+
+
+def test_preview_is_truncated(app, monkeypatch):
+    monkeypatch.setattr(html_block_selector, 'PREVIEW_CHARS', 100)
+    window = BlocSelectionWindow(_page(3))
+
+    assert not window.full_preview_btn.isHidden()
+    _wait_for(app, lambda: window.html_view.toPlainText())
+    assert len(window.html_view.toPlainText()) < 100
+    window.full_preview_btn.click()
+    assert window.full_preview_btn.isHidden()
+    assert window.html_view.toPlainText().count('description') == 270
+    window.close()
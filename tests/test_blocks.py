@@ -0,0 +1,157 @@
+import json
+import random
+
+from bs4 import BeautifulSoup
+from lxml import html
+
+from core.blocks import Block, element_text, find_blocks, rank_blocks
+from NEW_APPLICATION_EN_DEV import scraper_universel
+from NEW_APPLICATION_EN_DEV.scraper_universel import suggest_blocks_many
+
+WORDS = ['lampe', 'laiton', 'abat-jour', 'chevet&amp;', 'douce  salon']
+
+
+def _legacy(page, min_words):
+    soup = BeautifulSoup(page, 'lxml')
+    ignored = {'footer', 'nav', 'header', 'menu'}
+    found = []
+    for tag in soup.find_all(['div', 'p', 'section', 'article', 'span']):
+        if any(parent.name in ignored for parent in tag.parents):
+            continue
+        text = tag.get_text(' ', strip=True)
+        if len(text.split()) > min_words:
+            found.append(text)
+    return found
+
+
+def _random_content(rng, depth=0):
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        r = rng.random()
+        if r < 0.3:
+            parts.append(' '.join(rng.choices(WORDS, k=rng.randint(0, 12))))
+        elif r < 0.35:
+            parts.append('<!-- commentaire ignoré -->')
+        elif r < 0.4:
+            parts.append('<script>var a = "b c d";</script>')
+        elif depth < 6:
+            tag = rng.choice([
+                'div', 'p', 'span', 'section', 'article', 'footer', 'nav',
+                'ul', 'li', 'b', 'br', 'template', 'style',
+            ])
+            inner = _random_content(rng, depth + 1)
+            parts.append(f'<{tag}>{inner}</{tag}> fin')
+    return ''.join(parts)
+
+
+def test_matches_get_text_on_random_pages():
+    rng = random.Random(3)
+    for _ in range(300):
+        page = '<html><body>%s</body></html>' % _random_content(rng)
+        blocks = find_blocks(page, min_words=10)
+        assert [b.text for b in blocks] == _legacy(page, 10), page
+        for block in blocks:
+            assert block.words == len(block.text.split())
+
+
+def test_blocks_outside_ignored_elements():
+    text = ' '.join(['mot'] * 90)
+    page = (
+        f"<html><body><nav><div class='menu'>{text}</div></nav>"
+        f"<main><div class='desc'><p>{text}</p></div></main>"
+        f"<footer><p>{text}</p></footer></body></html>"
+    )
+    blocks = find_blocks(page)
+
+    assert [b.element.tag for b in blocks] == ['div', 'p']
+    assert all(isinstance(b, Block) for b in blocks)
+    assert blocks[0].selector == 'div.desc'
+    assert blocks[1].selector == 'div.desc > p'
+    assert blocks[1].snippet == text[:200] + '...'
+    assert find_blocks(page, min_words=90) == []
+    assert find_blocks('') == []
+
+
+def test_snippet_reads_only_the_beginning():
+    page = '<div><p>%s</p><p>%s</p></div>' % ('a' * 150, 'b' * 150)
+    element = html.fromstring(page)
+
+    assert element_text(element) == 'a' * 150 + ' ' + 'b' * 150
+    assert element_text(element, limit=100) == 'a' * 150
+    block = find_blocks(page, min_words=0)[0]
+    assert block.snippet == ('a' * 150 + ' ' + 'b' * 150)[:200] + '...'
+
+
+def test_utf8_bytes_without_charset():
+    text = ' '.join(['lumière'] * 100)
+    page = f'<html><body><div>{text}</div></body></html>'.encode('utf-8')
+
+    assert find_blocks(page)[0].text == text
+
+
+def _product_page(description):
+    menu = ''.join(f'<li><a>Lien de menu {i}</a></li>' for i in range(60))
+    grid = ''.join(
+        f"<div class='card'><a><img src='{i}.jpg'></a>"
+        f"<a>Produit similaire numéro {i}</a><span>{i},90 €</span></div>"
+        for i in range(40)
+    )
+    return (
+        f"<html><body><div class='page'><nav><ul>{menu}</ul></nav>"
+        "<div class='main'><div class='product'><h1>Lampe</h1>"
+        "<div class='product__description'><div class='rte'>"
+        f"{description}</div></div></div>"
+        f"<div class='grid'>{grid}</div></div></div></body></html>"
+    )
+
+
+DESCRIPTION = ''.join(
+    f'<p>Paragraphe {i} : ' + ' '.join(['texte'] * 30) + '</p>'
+    for i in range(4)
+)
+
+
+def test_rank_blocks_prefers_dense_prose_and_collapses_wrappers():
+    page = _product_page(DESCRIPTION)
+    blocks = find_blocks(page)
+    ranked = rank_blocks(page)
+
+    # page > main > product > description > rte all repeat the text.
+    assert len(blocks) > len(ranked)
+    assert ranked[0].selector == 'div.rte'
+    assert [b.score for b in ranked] == sorted(
+        (b.score for b in ranked), reverse=True
+    )
+    grid = next(b for b in ranked if b.selector.startswith('div.grid'))
+    assert grid.link_density > 0.5
+    assert grid.score < ranked[0].score / 2
+    assert [b.selector for b in rank_blocks(blocks, top_k=1)] == ['div.rte']
+    assert rank_blocks(page, min_words=10_000) == []
+
+
+def test_suggest_blocks_many(requests_mock):
+    requests_mock.get('http://shop.test/1', text=_product_page(DESCRIPTION))
+    requests_mock.get('http://shop.test/2', status_code=404)
+
+    records = list(suggest_blocks_many(
+        ['http://shop.test/1', 'http://shop.test/2'], top_k=2, ordered=True
+    ))
+
+    assert records[0]['mapping'] == {'description': 'div.rte'}
+    assert [b['selector'] for b in records[0]['blocks']][0] == 'div.rte'
+    assert len(records[0]['blocks']) <= 2
+    assert records[0]['blocks'][0]['snippet'].startswith('Paragraphe 0')
+    assert records[1]['blocks'] is None
+    assert records[1]['error'].startswith('HTTPError')
+
+
+def test_suggest_blocks_cli(requests_mock, capsys):
+    requests_mock.get('http://shop.test/1', text=_product_page(DESCRIPTION))
+
+    scraper_universel.main([
+        '--suggest-blocks', '--url', 'http://shop.test/1', '--top', '1',
+    ])
+
+    record = json.loads(capsys.readouterr().out)
+    assert record['mapping'] == {'description': 'div.rte'}
+    assert len(record['blocks']) == 1
@@ -0,0 +1,78 @@
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from core.cancellation import (
+    Cancelled,
+    CancelToken,
+    check,
+    sigint_cancels,
+    sleep,
+)
+
+
+def test_check_raises_once_cancelled():
+    token = CancelToken()
+    check(None)
+    token.check()
+
+    token.cancel()
+
+    assert token.cancelled
+    with pytest.raises(Cancelled):
+        token.check()
+
+
+def test_cancel_interrupts_sleep():
+    token = CancelToken()
+    threading.Timer(0.05, token.cancel).start()
+    start = time.perf_counter()
+
+    with pytest.raises(Cancelled):
+        sleep(5, token)
+
+    assert time.perf_counter() - start < 2
+
+
+def test_pause_blocks_until_resumed():
+    token = CancelToken()
+    token.pause()
+    passed = threading.Event()
+
+    def run():
+        token.check()
+        passed.set()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert not passed.wait(0.1)
+    assert token.paused
+
+    token.resume()
+    thread.join(1)
+    assert passed.is_set()
+
+
+def test_cancel_wakes_a_paused_run():
+    token = CancelToken()
+    token.pause()
+    threading.Timer(0.05, token.cancel).start()
+
+    with pytest.raises(Cancelled):
+        token.check()
+    assert not token.paused
+
+
+def test_sigint_cancels_only_inside_the_block():
+    previous = signal.getsignal(signal.SIGINT)
+    with sigint_cancels() as token:
+        os.kill(os.getpid(), signal.SIGINT)
+        time.sleep(0.05)
+        assert token.cancelled
+    assert signal.getsignal(signal.SIGINT) is previous
+
+    with sigint_cancels() as token:
+        assert not token.cancelled
@@ -0,0 +1,68 @@
+from lxml import html
+from lxml.cssselect import CSSSelector
+
+from core.css_engine import MultiSelector, compile_chains
+
+PAGE = (
+    "<html><body><main id='content'>"
+    "<div class='card promo' data-x='foo-bar'>"
+    "<h2 class='t'>One</h2><p class='price'>1</p>"
+    "<div class='inner'><span class='t'>Nested</span></div>"
+    "</div>"
+    "<div class='card'><h2 class='t'>Two</h2>"
+    "<ul><li><a href='https://x/1'>a</a></li>"
+    "<li><a href='/2' rel='nofollow next'>b</a></li></ul></div>"
+    "<!-- <div class='card'>comment</div> -->"
+    "</main></body></html>"
+)
+
+SELECTORS = [
+    'h2',
+    '.card .t',
+    '.card > .t',
+    '#content > div.card.promo',
+    'main .card .inner .t',
+    '* > li',
+    '[data-x]',
+    '[data-x|=foo]',
+    '[href^=https]',
+    '[href$="2"]',
+    '[rel~=next]',
+    '[href*="x/"]',
+    'H2.t, p.price',
+    '.card .t, .inner span',
+    'div div span',
+    'html',
+]
+
+
+def test_multi_selector_matches_cssselect():
+    tree = html.document_fromstring(PAGE)
+    engine = MultiSelector({css: css for css in SELECTORS})
+
+    assert engine.unsupported == []
+    results = engine.select(tree)
+    for css in SELECTORS:
+        assert results[css] == CSSSelector(css)(tree), css
+
+
+def test_unsupported_selectors_are_reported():
+    engine = MultiSelector({
+        'ok': '.card h2',
+        'nth': 'li:nth-of-type(2)',
+        'sibling': 'h2 + p',
+        'broken': 'div[',
+    })
+
+    assert engine.names == ['ok']
+    assert engine.unsupported == ['nth', 'sibling', 'broken']
+    assert list(engine.select(html.document_fromstring(PAGE))) == ['ok']
+
+
+def test_common_prefixes_are_shared():
+    interned = {}
+    title = compile_chains('#content .card h2', interned)[0]
+    price = compile_chains('#content .card .price', interned)[0]
+
+    assert title[2] is price[2]
+    assert title[2][2] is price[2][2]
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+from core.dom_index import DomIndex
+
+PAGE = (
+    "<html><body>"
+    "<div id='main'><div class='row'><p>a</p><p>b</p></div>"
+    "<div class='row'><p class='x'>c</p><span>d</span><p>e</p></div></div>"
+    "<div id='dup'><p>f</p></div><div id='dup'><p>g</p></div>"
+    "<section class='md:w-1/2 bloc'><p>h</p></section>"
+    "</body></html>"
+)
+
+
+def _random_page(rng, size):
+    tags = ['div', 'p', 'span', 'section']
+    classes = ['a', 'b', 'c', 'row', 'item']
+    parts = []
+
+    def build(depth):
+        for _ in range(rng.randint(1, 4)):
+            if len(parts) > size:
+                return
+            tag = rng.choice(tags)
+            attrs = ''
+            if rng.random() < 0.5:
+                attrs += " class='%s'" % ' '.join(
+                    rng.sample(classes, rng.randint(1, 2))
+                )
+            if rng.random() < 0.1:
+                attrs += " id='i%d'" % rng.randint(0, 5)
+            parts.append(f'<{tag}{attrs}>')
+            if depth < 6 and tag != 'p':
+                build(depth + 1)
+            parts.append(f'</{tag}>')
+
+    build(0)
+    return '<html><body>' + ''.join(parts) + '</body></html>'
+
+
+def test_index_positions():
+    soup = BeautifulSoup(PAGE, 'lxml')
+    index = DomIndex(soup)
+    e = soup.find_all('p')[3]
+
+    assert index.nth_of_type(e) == (2, 2)
+    assert index.depth(e) == 4
+    assert index.is_unique_id('main')
+    assert not index.is_unique_id('dup')
+
+
+def test_selectors_are_minimal_and_unique():
+    soup = BeautifulSoup(PAGE, 'lxml')
+    index = DomIndex(soup)
+    ps = soup.find_all('p')
+
+    assert index.css_selector(ps[2]) == 'p.x:nth-of-type(1)'
+    assert index.css_selector(ps[3]) == (
+        'div.row:nth-of-type(2) > p:nth-of-type(2)'
+    )
+    assert index.css_selector(ps[3], minimize=False) == (
+        'div#main > div.row:nth-of-type(2) > p:nth-of-type(2)'
+    )
+    # Duplicated ids are not used as anchors.
+    assert index.css_selector(ps[5]) == 'div:nth-of-type(3) > p'
+    assert index.css_selector(soup.section) == r'section.bloc.md\:w-1\/2'
+    for el in soup.find_all(True):
+        assert soup.select(index.css_selector(el)) == [el]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_random_documents(seed):
+    rng = random.Random(seed)
+    soup = BeautifulSoup(_random_page(rng, 300), 'lxml')
+    index = DomIndex(soup)
+
+    for el in soup.find_all(True):
+        full = index.css_selector(el, minimize=False)
+        short = index.css_selector(el)
+        assert full.endswith(short)
+        assert soup.select(short) == [el]
+        assert soup.select(full) == [el]
+
+
+def test_build_css_selector_without_index():
+    pytest.importorskip('PySide6')
+    from html_block_selector import build_css_selector
+
+    soup = BeautifulSoup(PAGE, 'lxml')
+    p = soup.find_all('p')[1]
+    assert build_css_selector(p) == build_css_selector(p, DomIndex(soup))
+    assert soup.select(build_css_selector(p)) == [p]
+
+    tree = lxml_html.document_fromstring(PAGE)
+    p = tree.xpath('//p')[1]
+    assert build_css_selector(p) == build_css_selector(p, DomIndex(tree))
+    assert tree.cssselect(build_css_selector(p)) == [p]
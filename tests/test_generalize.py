@@ -0,0 +1,98 @@
+import json
+
+from lxml import html
+
+from core.generalize import (
+    candidate_selectors,
+    element_signature,
+    is_equivalent,
+    page_coverage,
+)
+from NEW_APPLICATION_EN_DEV import scraper_universel
+from NEW_APPLICATION_EN_DEV.scraper_universel import generalize_selector
+
+REFERENCE = 'html > body > div > div:nth-of-type(2) > div:nth-of-type(2)'
+
+
+def _page(promos=1, classes='product__description rte', footer=''):
+    promo = "<div class='promo'>Promo</div>" * promos
+    return (
+        f"<html><body><div class='page'>{promo}"
+        "<div class='product' id='product-123'><div class='gallery'></div>"
+        f"<div class='{classes}'><p>Une belle lampe.</p></div></div>"
+        f"{footer}</div></body></html>"
+    )
+
+
+def test_candidates_match_the_element_alone_simplest_first():
+    tree = html.document_fromstring(_page())
+    element = tree.cssselect('.rte')[0]
+
+    candidates = candidate_selectors(tree, element)
+
+    assert candidates[0] == '.rte'
+    assert '.product > .rte' in candidates
+    # The product specific id only appears in the positional fallback.
+    assert [css for css in candidates if 'product-123' in css] == [
+        'div#product-123 > div.product__description.rte:nth-of-type(2)'
+    ]
+    assert candidates[-1].endswith(':nth-of-type(2)')
+    for css in candidates:
+        assert tree.cssselect(css) == [element]
+
+
+def test_equivalence_and_page_coverage():
+    tree = html.document_fromstring(_page())
+    signature = element_signature(tree.cssselect('.rte')[0])
+    other = html.document_fromstring(_page(
+        promos=3, classes='product__description rte rte--wide',
+        footer="<div class='rte'>Livraison offerte</div>",
+    ))
+
+    assert is_equivalent(signature, other.cssselect('.rte--wide')[0])
+    assert not is_equivalent(signature, other.cssselect('.promo')[0])
+    covered = page_coverage(
+        other, signature, ['.rte', '.product__description', REFERENCE]
+    )
+    assert covered == {
+        '.rte': False,
+        '.product__description': True,
+        REFERENCE: False,
+    }
+
+
+def test_generalize_selector(requests_mock):
+    requests_mock.get('http://shop.test/ref', text=_page())
+    requests_mock.get('http://shop.test/1', text=_page(promos=2))
+    requests_mock.get('http://shop.test/2', text=_page(
+        footer="<div class='rte'>Livraison offerte</div>",
+    ))
+    requests_mock.get('http://shop.test/3', status_code=404)
+    samples = [f'http://shop.test/{i}' for i in (1, 2, 3)]
+
+    report = generalize_selector(REFERENCE, 'http://shop.test/ref', samples)
+
+    assert report['pages'] == 2
+    assert report['errors'][0]['url'] == 'http://shop.test/3'
+    assert report['best'] == '.product__description'
+    coverage = {c['selector']: c for c in report['candidates']}
+    assert coverage['.rte']['coverage'] == 0.5
+    assert coverage['.rte']['missing'] == ['http://shop.test/2']
+    assert coverage[REFERENCE]['missing'] == ['http://shop.test/1']
+    assert report['candidates'][0]['coverage'] == 1.0
+
+
+def test_generalize_cli(requests_mock, capsys, tmp_path):
+    requests_mock.get('http://shop.test/ref', text=_page())
+    requests_mock.get('http://shop.test/1', text=_page(promos=2))
+    urls = tmp_path / 'urls.txt'
+    urls.write_text('http://shop.test/1\n', encoding='utf-8')
+
+    scraper_universel.main([
+        '--generalize', REFERENCE, '--url', 'http://shop.test/ref',
+        '--urls-file', str(urls),
+    ])
+
+    report = json.loads(capsys.readouterr().out)
+    assert report['best'] == '.rte'
+    assert report['pages'] == 1
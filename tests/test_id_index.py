@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from core.id_index import IdIndex, natural_key
+
+
+def test_natural_order_and_spans():
+    index = IdIndex(['A10', 'B1', 'A2', 'AB3', 'A1', 'C2', 'A2'])
+
+    assert index.ids == ['A1', 'A2', 'A10', 'AB3', 'B1', 'C2']
+    assert natural_key('A10') > natural_key('A9')
+    assert index.span('A2', 'B1') == (1, 5)
+    # Bounds in any order.
+    assert index.slice(index.span('B1', 'A2')) == ['A2', 'A10', 'AB3', 'B1']
+    assert index.span('A2', 'Z9') is None
+    assert index.slice(None) == []
+
+
+def test_prefix_span_is_a_contiguous_range():
+    ids = [f'{p}{n}' for p in ('A', 'AB', 'B', 'BA') for n in range(1, 30)]
+    index = IdIndex(ids)
+
+    start, stop = index.prefix_span('A')
+    assert index.slice((start, stop)) == [
+        i for i in index.ids if i.startswith('A')
+    ]
+    assert stop - start == 58
+    assert index.slice(index.prefix_span('BA'))[0] == 'BA1'
+    assert index.prefix_span('Z') == (len(index), len(index))
+    with pytest.raises(ValueError):
+        index.prefix_span('A1')
+
+
+def test_list_view_shows_a_span():
+    pytest.importorskip('PySide6')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6.QtWidgets import QApplication
+
+    from ui.widgets import IdListView
+
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    view = IdListView()
+    view.id_model.set_index(IdIndex(f'A{n}' for n in range(100000)))
+
+    view.show_span((10, 20010))
+
+    assert view.id_model.rowCount() == 100000
+    assert view.selected_bounds() == (10, 20009)
+    assert len(view.selectionModel().selection()) == 1
+    view.show_span(None)
+    assert view.selected_bounds() is None
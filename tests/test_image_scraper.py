@@ -89,3 +89,30 @@ def test_scrape_images_with_generator(monkeypatch, tmp_path):
     assert exit_code == 0
     assert driver.visited == ["http://product1", "http://product2"]
     assert driver.quit_called
+
+
+def test_scrape_images_reports_progress(monkeypatch, tmp_path):
+    driver = FakeDriver()
+    scraper = ImageScraper(root_folder=str(tmp_path))
+    monkeypatch.setattr(
+        ImageScraper,
+        "get_image_elements",
+        lambda self: driver.find_elements(),
+    )
+    monkeypatch.setattr(
+        urllib.request,
+        "urlretrieve",
+        lambda url, fp: open(fp, "wb").write(b"data"),
+    )
+    scraper.driver = driver
+    monkeypatch.setattr("time.sleep", lambda x: None)
+    events = []
+
+    scraper.scrape_images(["http://product"], progress=events.append)
+
+    assert [e.kind for e in events] == [
+        "started", "item_started", "item_finished", "finished",
+    ]
+    assert events[2].item == "http://product"
+    assert events[2].size == 8
+    assert events[2].error is None
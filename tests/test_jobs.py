@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from core import jobs
+from core.cancellation import Cancelled, CancelToken
+from core.jobs import (
+    DONE,
+    QUEUED,
+    RUNNING,
+    Job,
+    JobQueue,
+    ResourceBudget,
+    download_slot,
+)
+
+
+def _job(name, drivers=1):
+    return Job(name, {}, drivers=drivers)
+
+
+def test_queue_starts_jobs_within_the_budget():
+    queue = JobQueue(ResourceBudget(drivers=2, downloads=1, cpu=8))
+    a, b, c = (queue.submit(_job(n)) for n in 'abc')
+
+    assert queue.schedule() == [a, b]
+    assert c.state == QUEUED
+    assert queue.schedule() == []
+
+    assert queue.finish(a) == [c]
+    assert (a.state, c.state) == (DONE, RUNNING)
+
+
+def test_queue_fills_free_resources_with_smaller_jobs():
+    queue = JobQueue(ResourceBudget(drivers=1, downloads=1, cpu=2))
+    pages = queue.submit(_job('pages'))
+    more_pages = queue.submit(_job('more pages'))
+    export = queue.submit(_job('export', drivers=0))
+
+    # The export needs no browser: it runs beside the first job.
+    assert queue.schedule() == [pages, export]
+    assert queue.finish(export) == []
+    assert queue.finish(pages) == [more_pages]
+
+
+def test_queue_limits_jobs_to_the_cpus():
+    queue = JobQueue(ResourceBudget(drivers=4, downloads=1, cpu=1))
+    a, b = queue.submit(_job('a')), queue.submit(_job('b'))
+
+    assert queue.schedule() == [a]
+    assert queue.finish(a) == [b]
+
+
+def test_removed_job_never_starts():
+    queue = JobQueue(ResourceBudget(drivers=1, cpu=4))
+    a, b = queue.submit(_job('a')), queue.submit(_job('b'))
+    queue.schedule()
+
+    assert not queue.remove(a)
+    assert queue.remove(b)
+    assert queue.finish(a) == []
+
+
+def _slots(downloads=1):
+    return JobQueue(ResourceBudget(downloads=downloads)).download_slots()
+
+
+def test_download_slots_are_shared(monkeypatch):
+    monkeypatch.setattr(jobs, '_slots', None)
+    with download_slot():
+        pass
+    slots = _slots()
+    jobs.install_download_slots(slots)
+    with download_slot():
+        assert slots.held.value == 1
+        assert not slots.semaphore.acquire(block=False)
+    assert slots.held.value == 0
+    assert slots.semaphore.acquire(block=False)
+
+
+def test_waiting_for_a_slot_obeys_the_cancel_token(monkeypatch):
+    monkeypatch.setattr(jobs, 'SLOT_POLL_INTERVAL', 0.01)
+    slots = _slots()
+    monkeypatch.setattr(jobs, '_slots', slots)
+    cancel = CancelToken()
+    with download_slot(cancel):
+        threading.Timer(0.05, cancel.cancel).start()
+        with pytest.raises(Cancelled):
+            with download_slot(cancel):
+                pass
+    assert slots.held.value == 0
+
+
+def test_slots_of_a_dead_session_are_given_back():
+    queue = JobQueue(ResourceBudget(downloads=1))
+    dead, alive = queue.download_slots(), queue.download_slots()
+    dead.acquire()
+
+    assert alive.semaphore is dead.semaphore
+    assert dead.release_held() == 1
+    alive.acquire()
+    alive.release()
+
+
+def test_slot_counter_survives_concurrent_downloads():
+    slots = _slots(downloads=2)
+
+    def download():
+        for _ in range(200):
+            slots.acquire()
+            slots.release()
+
+    threads = [threading.Thread(target=download) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert slots.held.value == 0
+    assert slots.release_held() == 0
+    assert slots.semaphore.acquire(block=False)
+    assert slots.semaphore.acquire(block=False)
+    assert not slots.semaphore.acquire(block=False)
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+from core import links as links_mod
+from core.links import LinkMap, load_links
+from core.utils import charger_liens_avec_id, charger_liens_avec_id_fichier
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return str(tmp_path / 'cache')
+
+
+def test_text_file_reports_duplicates_and_malformed_lines(
+    tmp_path, cache_dir
+):
+    path = tmp_path / 'liens.txt'
+    path.write_text(
+        'a2 http://shop/2\n'
+        '\n'
+        'A1\thttp://shop/1\n'
+        'orphelin\n'
+        'A2 http://shop/2-bis\n',
+        encoding='utf-8',
+    )
+    links = load_links(str(path), cache_dir)
+
+    assert isinstance(links, LinkMap)
+    assert dict(links) == {'A1': 'http://shop/1', 'A2': 'http://shop/2-bis'}
+    assert links.report.duplicates == [(5, 'A2')]
+    assert links.report.malformed == [(4, 'orphelin')]
+    assert links.report.summary() == (
+        '1 ID(s) en double, 1 ligne(s) invalide(s)'
+    )
+    assert links.get('A3') is None and 'A3' not in links
+
+
+def test_csv_tsv_and_header_rows(tmp_path, cache_dir):
+    csv_path = tmp_path / 'liens.csv'
+    csv_path.write_text(
+        'id;url\nB1;http://shop/b1\nB2;"http://shop/b2?a=1;b=2"\n',
+        encoding='utf-8',
+    )
+    tsv_path = tmp_path / 'liens.tsv'
+    tsv_path.write_text('C1\thttp://shop/c1\n', encoding='utf-8')
+
+    assert dict(load_links(str(csv_path), cache_dir)) == {
+        'B1': 'http://shop/b1',
+        'B2': 'http://shop/b2?a=1;b=2',
+    }
+    assert dict(load_links(str(tsv_path), cache_dir)) == {
+        'C1': 'http://shop/c1',
+    }
+
+
+def test_xlsx_file(tmp_path, cache_dir):
+    openpyxl = pytest.importorskip('openpyxl')
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['ID', 'Lien'])
+    sheet.append(['d1', 'http://shop/d1'])
+    sheet.append(['D2', None])
+    path = tmp_path / 'liens.xlsx'
+    workbook.save(path)
+
+    links = load_links(str(path), cache_dir)
+    assert dict(links) == {'D1': 'http://shop/d1'}
+    assert links.report.malformed_count == 1
+
+
+def test_cache_is_reused_until_the_file_changes(
+    tmp_path, cache_dir, monkeypatch
+):
+    path = tmp_path / 'liens.txt'
+    path.write_text('É1 http://shop/é\nA1 http://a\nA1 http://b\n',
+                    encoding='utf-8')
+    first = load_links(str(path), cache_dir)
+    assert os.listdir(cache_dir)
+
+    def no_parse(path):
+        raise AssertionError('cache not used')
+
+    monkeypatch.setattr(links_mod, '_rows', no_parse)
+    cached = load_links(str(path), cache_dir)
+    assert dict(cached) == dict(first) == {
+        'A1': 'http://b', 'É1': 'http://shop/é',
+    }
+    assert list(cached) == ['A1', 'É1']
+    assert cached.report.duplicates == [(3, 'A1')]
+
+    monkeypatch.undo()
+    path.write_text('A9 http://c\n', encoding='utf-8')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert dict(load_links(str(path), cache_dir)) == {'A9': 'http://c'}
+
+
+def test_missing_file_and_legacy_helpers(tmp_path):
+    assert len(load_links(str(tmp_path / 'absent.txt'))) == 0
+    (tmp_path / 'liens_avec_id.txt').write_text(
+        'a1 http://a\n', encoding='utf-8'
+    )
+    assert dict(charger_liens_avec_id(str(tmp_path))) == {'A1': 'http://a'}
+    assert charger_liens_avec_id_fichier(
+        str(tmp_path / 'liens_avec_id.txt')
+    )['A1'] == 'http://a'
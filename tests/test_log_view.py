@@ -0,0 +1,82 @@
+import logging
+import os
+import threading
+
+import pytest
+
+pytest.importorskip('PySide6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from ui.widgets.log_view import LogBuffer, LogModel, LogView  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_buffer_queues_lines_from_threads_and_keeps_the_file(tmp_path):
+    buffer = LogBuffer(str(tmp_path / 'journal.log'), capacity=100)
+    log = logging.getLogger('test_log_view')
+    log.addHandler(buffer)
+    log.propagate = False
+    try:
+        threads = [
+            threading.Thread(
+                target=lambda n=n: [log.warning('t%d %d', n, i)
+                                    for i in range(50)]
+            )
+            for n in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        log.removeHandler(buffer)
+        log.propagate = True
+
+    lines = buffer.drain()
+    # The queue is bounded, the file keeps everything.
+    assert len(lines) == 100
+    assert all(level == logging.WARNING for level, _ in lines)
+    assert buffer.drain() == []
+    assert len(buffer.read_all().splitlines()) == 200
+    buffer.close()
+
+
+def test_model_is_a_ring_buffer(app):
+    model = LogModel(capacity=5)
+
+    model.append_lines([(logging.INFO, f'l{i}') for i in range(3)])
+    model.append_lines([(logging.INFO, f'l{i}') for i in range(3, 9)])
+
+    assert model.rowCount() == 5
+    assert model.text() == 'l4\nl5\nl6\nl7\nl8'
+
+
+def test_view_batches_filters_and_copies_from_disk(app, tmp_path):
+    view = LogView(str(tmp_path / 'journal.log'), capacity=3)
+    view.append('INFO:core:produit A1\nsuite')
+    view.buffer.write('ERROR:core:échec A2', logging.ERROR)
+    view.append('INFO:core:produit A3')
+    assert view.model.rowCount() == 0
+
+    view.flush()
+
+    assert view.model.text().splitlines() == [
+        'suite', 'ERROR:core:échec A2', 'INFO:core:produit A3'
+    ]
+    view.filter_edit.setText('PRODUIT')
+    assert view.proxy.rowCount() == 1
+    view.filter_edit.clear()
+    view.level_combo.setCurrentIndex(view.level_combo.findText('Erreurs'))
+    assert view.proxy.rowCount() == 1
+    assert view.full_text().startswith('INFO:core:produit A1\nsuite\n')
+
+    view.clear()
+    assert view.model.rowCount() == 0
+    assert view.full_text() == ''
+    view.buffer.close()
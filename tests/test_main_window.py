@@ -0,0 +1,232 @@
+import os
+
+import pytest
+
+pytest.importorskip('PySide6')
+pytest.importorskip('selenium')
+pytest.importorskip('pandas')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+import application_definitif as app_mod  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _load(app, window, path):
+    window.links_edit.setText(str(path))
+    window.load_ids(str(path))
+    loader = window.id_loader
+    assert loader.wait(10000)
+    for _ in range(10):
+        app.processEvents()
+
+
+def test_ids_load_in_background_and_select_ranges(app, tmp_path):
+    links = tmp_path / 'liens.txt'
+    links.write_text(
+        ''.join(f'{p}{n} http://shop.test/{p}{n}\n'
+                for p in ('A', 'B') for n in range(1, 5001)),
+        encoding='utf-8',
+    )
+    window = app_mod.MainWindow()
+    _load(app, window, links)
+
+    assert window.ids_progress.isHidden()
+    assert window.all_ids[:3] == ['A1', 'A2', 'A3']
+    assert window.id_list.id_model.rowCount() == 10000
+
+    window.min_id_edit.setText('a4999')
+    window.max_id_edit.setText('B2')
+    assert window.selected_ids == ['A4999', 'A5000', 'B1', 'B2']
+    assert window.id_list.selected_bounds() == (4998, 5001)
+
+    window.max_id_edit.clear()
+    window.min_id_edit.setText('B*')
+    assert len(window.selected_ids) == 5000
+    assert window.selected_ids[0] == 'B1'
+
+    window.id_list.show_span((2, 5))
+    assert window.min_id_edit.text() == 'A3'
+    assert window.max_id_edit.text() == 'A5'
+    assert window.selected_ids == ['A3', 'A4', 'A5']
+
+
+def test_unreadable_links_file_reports_the_error(app, monkeypatch, tmp_path):
+    links = tmp_path / 'liens.txt'
+    links.write_bytes('É1 http://shop.test/é\n'.encode('latin-1'))
+    errors = []
+    monkeypatch.setattr(
+        app_mod.QMessageBox, 'critical',
+        lambda parent, title, text: errors.append(text),
+    )
+    window = app_mod.MainWindow()
+    _load(app, window, links)
+
+    assert window.ids_progress.isHidden()
+    assert window.launch_btn.isEnabled()
+    assert len(errors) == 1 and str(links) in errors[0]
+    window.close()
+
+
+def test_tabs_are_built_on_first_display(app, monkeypatch):
+    checks = []
+    monkeypatch.setattr(
+        app_mod.MainWindow, 'refresh_deps_status',
+        lambda self: checks.append(True),
+    )
+    window = app_mod.MainWindow()
+    assert not hasattr(window, 'update_log')
+    assert checks == []
+
+    window.tabs.setCurrentIndex(1)
+    window.tabs.setCurrentIndex(2)
+    window.tabs.setCurrentIndex(1)
+
+    assert checks == [True]
+    assert window.update_log.isReadOnly()
+
+
+def test_metrics_table_shows_actions_and_hosts(app):
+    window = app_mod.MainWindow()
+    stats = {
+        'pages': 3, 'errors': 1, 'bytes': 2048,
+        'pages_per_minute': 4.0, 'error_rate': 1 / 3,
+        'load_p50': 1.5, 'load_p95': 2.0,
+        'parse_p50': None, 'parse_p95': None,
+    }
+    window.update_metrics({
+        'actions': {'fiches': stats}, 'hosts': {'a.com': stats}, 'eta': 3,
+    })
+
+    table = window.metrics_table
+    assert table.rowCount() == 2
+    row = [table.item(0, c).text() for c in range(table.columnCount())]
+    assert row == ['Fiches', '4.0', '1.50 / 2.00', '-', '2 Ko', '33%']
+    assert table.item(1, 0).text() == 'a.com'
+    window.close()
+
+
+def test_sessions_are_queued_within_the_budget(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(app_mod.ScrapingWorker, 'start', lambda self: None)
+    window = app_mod.MainWindow()
+    window.drivers_spin.setValue(1)
+    params = dict(
+        links_file=str(tmp_path / 'liens.txt'),
+        ids=['A1', 'A2'],
+        actions={'fiches': True},
+        batch_size=1,
+        session_paths={'fiches': str(tmp_path / 'fiches')},
+    )
+    first = window.submit_job(params, str(tmp_path / 'a'))
+    second = window.submit_job(params, str(tmp_path / 'b'))
+    third = window.submit_job(params, str(tmp_path / 'c'))
+
+    assert window.jobs_table.rowCount() == 3
+    assert [j.state for j in (first, second, third)] == [
+        'running', 'queued', 'queued',
+    ]
+    assert window.worker is first.worker
+    assert first.worker.slots.held.value == 0
+
+    window.stop_job(third)
+    assert window.jobs_table.rowCount() == 2
+
+    window.pause_job(first, True)
+    assert first.worker.cancel.paused
+    assert window.pause_btn.isChecked()
+    assert window.jobs_table.item(0, 1).text() == 'En pause'
+    window.pause_job(first, False)
+
+    window.on_finished()
+    assert window.jobs_table.item(0, 1).text() == 'Terminé'
+    assert second.state == 'running'
+    assert window.worker is second.worker
+    assert second.worker.slots is not first.worker.slots
+    assert second.worker.slots.semaphore is first.worker.slots.semaphore
+    assert os.path.dirname(second.params['metrics_path']) == str(
+        tmp_path / 'b'
+    )
+    window.close()
+
+
+def test_retry_queues_the_failed_ids_again(app, monkeypatch, tmp_path):
+    from core.progress import ITEM_FINISHED, ProgressEvent
+
+    monkeypatch.setattr(app_mod.ScrapingWorker, 'start', lambda self: None)
+    window = app_mod.MainWindow()
+    params = dict(
+        links_file=str(tmp_path / 'liens.txt'),
+        ids=['A1', 'A2', 'A3'],
+        actions={'variantes': True, 'fiches': True, 'export': True},
+        batch_size=1,
+        session_paths={'fiches': str(tmp_path / 'fiches')},
+    )
+    job = window.submit_job(params, str(tmp_path / 'out'))
+    model = window.id_results.model
+    for item, action, error in (
+        ('A1', 'variantes', 'timeout'),
+        ('A1', 'fiches', None),
+        ('A2', 'fiches', 'timeout'),
+        ('A3', 'variantes', None),
+    ):
+        model.update(
+            ProgressEvent(ITEM_FINISHED, action, item=item, error=error),
+            job.id,
+        )
+
+    window.id_results.table.selectAll()
+    window.id_results.retry_selected()
+
+    retry = window.job_list[-1]
+    assert retry is not job
+    assert retry.params['ids'] == ['A1', 'A2']
+    assert retry.params['actions'] == {'variantes': True, 'fiches': True}
+    assert retry.params['append']
+    assert {r.session for r in model.results if r.status == 'Erreur'} == {
+        retry.id
+    }
+    window.close()
+
+
+def test_retry_uses_the_session_of_each_result(app, monkeypatch, tmp_path):
+    from core.progress import ITEM_FINISHED, ProgressEvent
+
+    monkeypatch.setattr(app_mod.ScrapingWorker, 'start', lambda self: None)
+    window = app_mod.MainWindow()
+    window.drivers_spin.setValue(2)
+    jobs = []
+    for name in ('a', 'b'):
+        jobs.append(window.submit_job(
+            dict(
+                links_file=str(tmp_path / f'{name}.txt'),
+                ids=['A1'],
+                actions={'variantes': True},
+                batch_size=1,
+                session_paths={},
+            ),
+            str(tmp_path / name),
+        ))
+    model = window.id_results.model
+    model.update(
+        ProgressEvent(ITEM_FINISHED, 'variantes', item='A1', error='x'),
+        jobs[0].id,
+    )
+    model.update(
+        ProgressEvent(ITEM_FINISHED, 'variantes', item='A1'), jobs[1].id
+    )
+    assert model.rowCount() == 2
+
+    window.id_results.table.selectAll()
+    window.id_results.retry_selected()
+
+    retry = window.job_list[-1]
+    assert retry.params['links_file'] == str(tmp_path / 'a.txt')
+    assert os.path.dirname(retry.params['metrics_path']) == str(
+        tmp_path / 'a'
+    )
+    window.close()
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from core.metrics import SessionMetrics, _percentile
+from core.progress import (
+    FINISHED,
+    ITEM_FINISHED,
+    STARTED,
+    ProgressEvent,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _page(action, index, url, total=10, **fields):
+    return ProgressEvent(
+        ITEM_FINISHED, action, index=index, total=total, url=url, **fields
+    )
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert _percentile(values, 50) == 50
+    assert _percentile(values, 95) == 95
+    assert _percentile([3.0], 95) == 3
+    assert _percentile([], 50) is None
+
+
+def test_metrics_per_action_and_host():
+    clock = FakeClock()
+    metrics = SessionMetrics(clock=clock)
+    metrics.add(ProgressEvent(STARTED, 'variantes', total=4))
+    urls = [
+        'https://a.com/p1', 'https://a.com/p2',
+        'https://b.com/p1', 'https://b.com/p2',
+    ]
+    for index, url in enumerate(urls, start=1):
+        clock.now += 15
+        metrics.add(_page(
+            'variantes', index, url, total=4, elapsed=15, size=1000,
+            load=index, parse=0.1,
+            error='timeout' if index == 4 else None,
+        ))
+
+    snapshot = metrics.snapshot()
+    variantes = snapshot['actions']['variantes']
+    assert variantes['pages'] == 4
+    assert variantes['pages_per_minute'] == pytest.approx(4)
+    assert variantes['bytes'] == 4000
+    assert variantes['error_rate'] == 0.25
+    assert variantes['load_p50'] == 2
+    assert variantes['load_p95'] == 4
+    assert variantes['parse_p95'] == 0.1
+    assert set(snapshot['hosts']) == {'a.com', 'b.com'}
+    assert snapshot['hosts']['b.com']['errors'] == 1
+    assert snapshot['hosts']['a.com']['load_p95'] == 2
+
+
+def test_one_visit_counts_once_per_host():
+    metrics = SessionMetrics(clock=FakeClock())
+    metrics.add(_page('variantes', 1, 'https://a.com/p1', load=1.0, size=100))
+    metrics.add(_page('images', 1, 'https://a.com/p1', size=50))
+    metrics.add(_page('fiches', 1, 'https://a.com/p1'))
+
+    snapshot = metrics.snapshot()
+    host = snapshot['hosts']['a.com']
+    assert (host['pages'], host['bytes'], host['load_p50']) == (1, 150, 1)
+    assert snapshot['actions']['images']['bytes'] == 50
+    assert snapshot['actions']['fiches']['load_p50'] is None
+
+
+def test_eta_follows_recent_speed_of_each_action():
+    clock = FakeClock()
+    metrics = SessionMetrics(alpha=0.5, clock=clock)
+    assert metrics.eta() is None
+    metrics.add(ProgressEvent(STARTED, 'variantes', total=10))
+    for index, interval in enumerate((10, 10, 2), start=1):
+        clock.now += interval
+        metrics.add(_page('variantes', index, 'https://a.com/x'))
+
+    # EWMA: 10, then 10, then 0.5 * 2 + 0.5 * 10 = 6 s for 7 products.
+    assert metrics.eta() == pytest.approx(42)
+
+    # A faster action running at the same time does not add up.
+    metrics.add(ProgressEvent(STARTED, 'fiches', total=10))
+    clock.now += 1
+    metrics.add(_page('fiches', 1, 'https://a.com/x'))
+    assert metrics.eta() == pytest.approx(42)
+
+    metrics.add(ProgressEvent(FINISHED, 'variantes', total=10))
+    assert metrics.eta() == pytest.approx(9)
+
+
+def test_save_writes_the_snapshot(tmp_path):
+    metrics = SessionMetrics(clock=FakeClock())
+    metrics.add(_page('fiches', 1, 'https://a.com/x', size=10))
+    path = tmp_path / 'metriques.json'
+    metrics.save(str(path))
+
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved == json.loads(json.dumps(metrics.snapshot()))
+    assert saved['actions']['fiches']['bytes'] == 10
@@ -0,0 +1,154 @@
+import os
+import time
+
+import pytest
+
+pytest.importorskip('PySide6')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtCore import Qt  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+
+from core.progress import (  # noqa: E402
+    ITEM_FINISHED,
+    ITEM_STARTED,
+    ProgressEvent,
+)
+from ui.widgets.results_view import (  # noqa: E402
+    FAILED,
+    OK,
+    RUNNING,
+    ResultsModel,
+    ResultsView,
+)
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _started(item, action='variantes'):
+    return ProgressEvent(ITEM_STARTED, action, item=item)
+
+
+def _finished(item, action='variantes', error=None, **details):
+    return ProgressEvent(
+        ITEM_FINISHED, action, item=item, elapsed=2.5, load=1.25,
+        error=error, details=details or None,
+    )
+
+
+def _column(model, column):
+    return [
+        model.index(row, column).data() for row in range(model.rowCount())
+    ]
+
+
+def test_model_updates_rows_in_place(app):
+    model = ResultsModel()
+    model.update(_started('A2'), session=1)
+    model.update(_started('A1'), session=1)
+    model.update(_started('A1', 'fiches'), session=1)
+    assert model.rowCount() == 3
+    assert model.result(0).status == RUNNING
+
+    model.update(
+        _finished('A2', output='/out/woocommerce_mix.xlsx', price='9.99',
+                  variants=3),
+        session=1,
+    )
+    model.update(_finished('A1', error='timeout'), session=1)
+
+    assert model.rowCount() == 3
+    row = [model.index(0, c).data() for c in range(model.columnCount())]
+    assert row == [
+        'A2', 'variantes', '1', OK, '2.50', '1.25',
+        'woocommerce_mix.xlsx', '9.99', '3', '',
+    ]
+    assert model.result(1).status == FAILED
+    assert model.index(1, 9).data() == 'timeout'
+    assert model.index(1, 0).data(Qt.ForegroundRole) is not None
+
+
+def test_model_keeps_the_same_id_of_two_sessions_apart(app):
+    model = ResultsModel()
+    model.update(_finished('A1', error='timeout'), session=1)
+    model.update(_finished('A1', price='5.00'), session=2)
+
+    assert model.rowCount() == 2
+    assert [(r.session, r.status) for r in model.results] == [
+        (1, FAILED), (2, OK),
+    ]
+
+    model.move([model.result(0)], 3)
+    model.update(_finished('A1', price='4.00'), session=3)
+
+    assert model.rowCount() == 2
+    assert [(r.session, r.status, r.price) for r in model.results] == [
+        (3, OK, '4.00'), (2, OK, '5.00'),
+    ]
+    assert model.index(0, 2).data() == '3'
+
+
+def test_model_filters_and_sorts(app):
+    model = ResultsModel()
+    for n in (10, 2, 1):
+        model.update(_finished(f'A{n}', error='x' if n == 2 else None))
+    model.update(_finished('B1', 'fiches'))
+
+    model.sort(0, Qt.AscendingOrder)
+    assert _column(model, 0) == ['A1', 'A2', 'A10', 'B1']
+
+    model.set_filter(status=FAILED)
+    assert _column(model, 0) == ['A2']
+    # A row leaving the filter disappears, one entering it appears.
+    model.update(_finished('A2'))
+    model.update(_finished('A10', error='y'))
+    assert _column(model, 0) == ['A10']
+
+    model.set_filter(text='fiches', status=None)
+    assert _column(model, 0) == ['B1']
+    model.set_filter(text='')
+    model.sort(0, Qt.DescendingOrder)
+    assert _column(model, 0) == ['B1', 'A10', 'A2', 'A1']
+
+
+def test_model_sorts_50k_rows_quickly(app):
+    model = ResultsModel()
+    model.update_many([
+        (_finished(f'P{n}', error='x' if n % 7 == 0 else None), 1)
+        for n in range(50000)
+    ])
+    assert model.rowCount() == 50000
+
+    start = time.perf_counter()
+    model.sort(3, Qt.AscendingOrder)
+    model.sort(0, Qt.DescendingOrder)
+    model.set_filter(status=FAILED)
+    assert time.perf_counter() - start < 2
+    assert model.rowCount() == 7143
+    assert model.index(0, 0).data() == 'P49994'
+
+
+def test_view_retries_the_failed_selected_rows(app):
+    view = ResultsView()
+    view.model.update(_finished('A1', error='x'), session=2)
+    view.model.update(_finished('A2'), session=2)
+    view.model.update(_finished('A3', 'fiches', error='y'), session=2)
+    requested = []
+    view.retry_requested.connect(requested.append)
+    view.queue(_finished('A4'), 2)
+    view.flush()
+    assert view.model.rowCount() == 4
+
+    view.table.selectAll()
+    view.retry_selected()
+
+    assert [(r.item, r.action) for r in requested[0]] == [
+        ('A1', 'variantes'), ('A3', 'fiches'),
+    ]
+    view.table.clearSelection()
+    view.table.selectRow(1)
+    view.retry_selected()
+    assert len(requested) == 1
@@ -2,7 +2,11 @@ import pytest
 pytest.importorskip("selenium")
 pytest.importorskip("pandas")
 
-from core import scraper as scr
+import os  # noqa: E402
+import urllib.request  # noqa: E402
+
+from core import scraper as scr  # noqa: E402
+from core.cancellation import EXIT_CANCELLED, CancelToken  # noqa: E402
 
 
 class FakeDriver:
@@ -38,9 +42,11 @@ class FakePandas:
     def __init__(self):
         self.captured = None
         self.df = None
+        self.frames = []
 
     def DataFrame(self, data, **kwargs):
         self.captured = data
+        self.frames.append(data)
         self.df = FakeDataFrame()
         return self.df
 
@@ -105,3 +111,221 @@ def test_scrap_fiches_concurrents(monkeypatch, tmp_path, fake_pandas):
     assert fc_dir.exists()
     assert captured["headless"] is True
     assert isinstance(fake_pandas.captured, list)
+
+
+def test_scrap_produits_uses_structured_data(
+    monkeypatch, tmp_path, fake_pandas
+):
+    driver = FakeDriver()
+    driver.page_source = (
+        "<html><script type='application/ld+json'>"
+        '{"@type": "Product", "name": "Embedded Name",'
+        ' "offers": {"price": "19.90"}}'
+        "</script><h1>Title</h1></html>"
+    )
+
+    def no_dom(*args, **kwargs):
+        raise AssertionError("DOM lookup not expected")
+
+    monkeypatch.setattr(scr, "_get_driver", lambda headless=False: driver)
+    monkeypatch.setattr(scr, "_parse_price", no_dom)
+    monkeypatch.setattr(driver, "find_element", no_dom)
+    monkeypatch.setattr(scr, "_get_variant_names", lambda d: [])
+    monkeypatch.setattr("time.sleep", lambda x: None)
+
+    exit_code = scr.scrap_produits_par_ids(
+        {"A1": "http://example.com"}, ["A1"], str(tmp_path)
+    )
+
+    assert exit_code == 0
+    row = fake_pandas.captured[0]
+    assert row["Name"] == "Embedded Name"
+    assert row["Regular price"] == "19.90"
+
+
+def test_og_title_does_not_replace_h1(monkeypatch, tmp_path, fake_pandas):
+    driver = FakeDriver()
+    driver.page_source = (
+        "<html><head><meta property='og:title' content='Lampe – MaBoutique'>"
+        "</head><h1>Test Name</h1><div id='product_description'>Desc</div>"
+        "</html>"
+    )
+    monkeypatch.setattr(scr, "_get_driver", lambda headless=False: driver)
+    monkeypatch.setattr(scr, "_parse_price", lambda d: "9.99")
+    monkeypatch.setattr(scr, "_get_variant_names", lambda d: [])
+    monkeypatch.setattr("time.sleep", lambda x: None)
+    id_map = {"A1": "http://example.com"}
+
+    scr.scrap_produits_par_ids(id_map, ["A1"], str(tmp_path))
+    scr.scrap_fiches_concurrents(id_map, ["A1"], str(tmp_path))
+
+    row = fake_pandas.frames[0][0]
+    assert row["Name"] == "Test Name"
+    assert row["SKU"] == "TEST-NAME"
+    assert row["Nom du dossier"] == "test-name"
+    fiches = os.listdir(tmp_path / "fiches_concurrents")
+    assert fiches == ["test-name.txt"]
+
+
+def test_scrap_produits_reports_progress_events(
+    monkeypatch, tmp_path, fake_pandas
+):
+    driver = FakeDriver()
+    monkeypatch.setattr(scr, "_get_driver", lambda headless=False: driver)
+    monkeypatch.setattr(scr, "_parse_price", lambda d: "9.99")
+    monkeypatch.setattr(scr, "_get_variant_names", lambda d: [])
+    monkeypatch.setattr("time.sleep", lambda x: None)
+    events = []
+
+    scr.scrap_produits_par_ids(
+        {"A1": "http://example.com"}, ["A1", "A2"], str(tmp_path),
+        progress=events.append,
+    )
+
+    assert [(e.kind, e.index, e.item) for e in events] == [
+        ("started", 0, None),
+        ("item_started", 1, "A1"),
+        ("item_finished", 1, "A1"),
+        ("item_started", 2, "A2"),
+        ("item_finished", 2, "A2"),
+        ("finished", 2, None),
+    ]
+    assert all(e.action == "variantes" and e.total == 2 for e in events)
+    assert events[2].ok and events[2].size == len(driver.page_source)
+    assert events[2].url == "http://example.com"
+    assert events[2].load >= 0 and events[2].parse > 0
+    assert events[2].details == {
+        "output": os.path.join(str(tmp_path), "woocommerce_mix.xlsx"),
+        "price": "9.99",
+        "variants": 0,
+    }
+    assert events[4].error == "ID introuvable"
+
+
+def test_export_reports_one_event_per_batch(tmp_path):
+    source = tmp_path / "fiches_concurrents"
+    source.mkdir()
+    for name in ("a", "b", "c"):
+        (source / f"{name}.txt").write_text(
+            f"<h1>{name}</h1>", encoding="utf-8"
+        )
+    events = []
+
+    scr.export_fiches_concurrents_json(str(tmp_path), 2, events.append)
+
+    finished = [e for e in events if e.kind == "item_finished"]
+    assert [(e.index, e.item, e.size) for e in finished] == [
+        (1, "batch_1.json", 20),
+        (2, "batch_2.json", 10),
+    ]
+    assert events[0].total == 2
+    assert events[-1].kind == "finished"
+
+
+def test_une_visite_loads_each_page_once(monkeypatch, tmp_path, fake_pandas):
+    driver = FakeDriver()
+    driver.title = "Lampe | Shop"
+    driver.page_source = (
+        "<html><h1>Lampe</h1><div class='product-gallery__media'>"
+        "<img src='/img/a.webp'><img src='//cdn.test/b.webp'></div>"
+        "<div id='product_description'>Desc <a href='/x'>lien</a></div>"
+        "</html>"
+    )
+    monkeypatch.setattr(scr, "_get_driver", lambda headless=False: driver)
+    monkeypatch.setattr(scr, "_parse_price", lambda d: "9.99")
+    monkeypatch.setattr(scr, "_get_variant_names", lambda d: [])
+    monkeypatch.setattr("time.sleep", lambda x: None)
+    downloaded = []
+
+    def fake_retrieve(url, path):
+        downloaded.append(url)
+        with open(path, "wb") as f:
+            f.write(b"data")
+
+    monkeypatch.setattr(urllib.request, "urlretrieve", fake_retrieve)
+    paths = {
+        name: str(tmp_path / name)
+        for name in ("variantes", "fiches", "images")
+    }
+    events = []
+
+    exit_code = scr.scrap_produits_une_visite(
+        {"A1": "http://shop.test/p/1", "A2": "http://shop.test/p/2"},
+        ["A1", "A2", "A3"],
+        paths,
+        progress=events.append,
+    )
+
+    assert exit_code == 0
+    assert driver.visited == ["http://shop.test/p/1", "http://shop.test/p/2"]
+    assert driver.quit_called
+    rows, recap = fake_pandas.frames
+    assert [row["ID Produit"] for row in rows] == ["A1", "A2"]
+    assert recap[0] == ("lampe.txt", "Lampe", "http://shop.test/p/1",
+                        "Extraction OK")
+    assert recap[2] == ("?", "?", "A3", "ID non trouvé")
+    fiche = tmp_path / "fiches" / "fiches_concurrents" / "lampe.txt"
+    assert "[lien](/x)" in fiche.read_text(encoding="utf-8")
+    assert downloaded[:2] == [
+        "http://shop.test/img/a.webp", "http://cdn.test/b.webp"
+    ]
+    assert (tmp_path / "images" / "lampe" / "img_1.webp").exists()
+    finished = [
+        (e.action, e.item, e.ok) for e in events if e.kind == "item_finished"
+    ]
+    assert finished[:3] == [
+        ("variantes", "A1", True),
+        ("images", "A1", True),
+        ("fiches", "A1", True),
+    ]
+    assert finished[-1] == ("fiches", "A3", False)
+    first = [e for e in events if e.kind == "item_finished"][:3]
+    page = len(driver.page_source.encode("utf-8"))
+    assert [e.size for e in first] == [page, 2 * len(b"data"), 0]
+    assert first[0].load >= 0 and first[1].load == first[2].load == 0
+
+
+def test_cancel_saves_done_products_and_quits(
+    monkeypatch, tmp_path, fake_pandas
+):
+    cancel = CancelToken()
+    driver = FakeDriver()
+
+    def get(url):
+        driver.visited.append(url)
+        if len(driver.visited) == 2:
+            cancel.cancel()
+
+    driver.get = get
+    monkeypatch.setattr(scr, "_get_driver", lambda headless=False: driver)
+    monkeypatch.setattr(scr, "_parse_price", lambda d: "9.99")
+    monkeypatch.setattr(scr, "_get_variant_names", lambda d: [])
+    monkeypatch.setattr(scr, "sleep", lambda seconds, token: token.check())
+    events = []
+
+    exit_code = scr.scrap_produits_par_ids(
+        {"A1": "http://a", "A2": "http://b", "A3": "http://c"},
+        ["A1", "A2", "A3"],
+        str(tmp_path),
+        progress=events.append,
+        cancel=cancel,
+    )
+
+    assert exit_code == EXIT_CANCELLED
+    assert driver.visited == ["http://a", "http://b"]
+    assert driver.quit_called
+    assert [row["ID Produit"] for row in fake_pandas.captured] == ["A1"]
+    finished = [e.item for e in events if e.kind == "item_finished"]
+    assert finished == ["A1"]
+    assert events[-1].kind == "finished" and events[-1].error == "Annulé"
+
+
+def test_save_excel_appends_to_resumed_session(tmp_path):
+    pd = pytest.importorskip("pandas")
+    pytest.importorskip("openpyxl")
+    path = str(tmp_path / "recap.xlsx")
+
+    scr._save_excel(pd.DataFrame([{"ID": "A1"}]), path)
+    scr._save_excel(pd.DataFrame([{"ID": "A2"}]), path, append=True)
+
+    assert list(pd.read_excel(path)["ID"]) == ["A1", "A2"]
@@ -0,0 +1,140 @@
+import pytest
+
+from NEW_APPLICATION_EN_DEV import scraper_universel
+from NEW_APPLICATION_EN_DEV.scraper_universel import (
+    available_backends,
+    extract_fields,
+    set_default_backend,
+)
+
+PAGE = (
+    "<html><head><title>Lampe</title>"
+    "<style>.x > p { color: red }</style></head><body>"
+    "<h1 class='product-title'> Lampe   &amp; abat-jour </h1>"
+    "<div class='prose  long ' id='desc'>"
+    "<p>Une lampe de chevet en laiton, livrée avec son abat-jour.</p>"
+    "<p>Informations livraison : 48h.</p>"
+    "<p title='dit \"bonjour\"' data-q=\"l'été\" data-b='\"&apos;'>"
+    "a &lt; b &gt; c&nbsp;d<br>e<img src='x.png' alt=''></p>"
+    "<script>if (a < b && c) { run(); }</script>"
+    "<!-- commentaire -->"
+    "<a rel=' nofollow  next ' href='/p?a=1&amp;b=2'>Suite</a>"
+    "<input type='checkbox' checked=''>"
+    "</div>"
+    "<div class='gallery'>"
+    "<img class='thumb' src=' /img/1.jpg '>"
+    "<img class='thumb' src='/img/2.jpg'>"
+    "<span class='thumb'><img src='/img/3.jpg'></span>"
+    "</div>"
+    "<ul class='specs'><li>Hauteur : 40 cm</li><li>Poids : 1 kg</li>"
+    "<li></li></ul>"
+    "<div class='card'><div class='inner'>Sans paragraphe</div></div>"
+    "<div class='tpl'>A<template><p>T</p></template>B</div>"
+    "<div class='ruby'><ruby>漢<rp>(</rp><rt>kan</rt><rp>)</rp></ruby>"
+    "ji</div>"
+    "<div class='card'><section><p>Premier</p></section><p>Second</p></div>"
+    "</body></html>"
+)
+
+MAPPING = {
+    'title': 'h1.product-title',
+    'title_raw': {'selector': 'h1', 'raw_html': True},
+    'desc': '#desc',
+    'desc_first': {'selector': '.prose', 'first_paragraph': True},
+    'desc_clean': {'selector': '.prose p', 'clean': True},
+    'desc_raw': {'selector': '.prose', 'raw_html': True},
+    'desc_raw_first': {
+        'selector': '.prose',
+        'raw_html': True,
+        'first_paragraph': True,
+    },
+    'images': '.gallery .thumb',
+    'image': {'selector': 'img.thumb', 'first_paragraph': True},
+    'specs': 'ul.specs li',
+    'cards': {'selector': '.card', 'first_paragraph': True},
+    'nth': '.specs li:nth-of-type(2)',
+    'contains': 'li:-soup-contains("Poids")',
+    'template': '.tpl',
+    'ruby': '.ruby',
+    'missing': '.nothing',
+}
+
+
+@pytest.fixture(autouse=True)
+def reset_backend():
+    yield
+    set_default_backend(None)
+
+
+@pytest.fixture
+def reference():
+    doc = scraper_universel._PageDocument(PAGE.encode('utf-8'))
+    return scraper_universel._extract_document(doc, MAPPING, 'bs4')
+
+
+def test_reference_values(reference):
+    assert reference['title'] == 'Lampe   & abat-jour'
+    assert reference['desc_first'].startswith('Une lampe de chevet')
+    assert reference['images'] == ['/img/1.jpg', '/img/2.jpg']
+    assert reference['cards'] == ['Sans paragraphe', 'Premier']
+    assert reference['contains'] == 'Poids : 1 kg'
+    assert '<br/>' in reference['desc_raw']
+    assert reference['template'] == 'A\nB'
+    assert reference['ruby'] == '漢\nji'
+    assert reference['missing'] is None
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_backend_conformance(backend, reference):
+    doc = scraper_universel._PageDocument(PAGE.encode('utf-8'))
+    data = scraper_universel._extract_document(doc, MAPPING, backend)
+
+    for field in MAPPING:
+        assert data[field] == reference[field], field
+
+
+@pytest.mark.parametrize('backend', available_backends())
+def test_backend_per_call_and_global(backend, monkeypatch, requests_mock):
+    requests_mock.get('http://example.com', text=PAGE)
+    mapping = {'title': 'h1', 'desc': {'selector': '.prose', 'clean': True}}
+    used = []
+    real = scraper_universel._resolve_backend
+
+    def spy(backend, doc, mapping):
+        used.append(real(backend, doc, mapping))
+        return used[-1]
+
+    monkeypatch.setattr(scraper_universel, '_resolve_backend', spy)
+    per_call = extract_fields('http://example.com', mapping, backend=backend)
+    set_default_backend(backend)
+    default = extract_fields('http://example.com', mapping)
+
+    assert used == [backend, backend]
+    assert per_call == default
+    assert per_call['title'] == 'Lampe   & abat-jour'
+
+
+def test_automatic_backend_choice():
+    doc = scraper_universel._PageDocument(PAGE.encode('utf-8'))
+    fastest = available_backends()[0]
+
+    assert scraper_universel._resolve_backend(None, doc, {'t': 'h1'}) == (
+        fastest
+    )
+    if 'lxml' in available_backends():
+        for mapping in ({'t': '//h1'}, {'p': {'og': 'title'}}):
+            assert scraper_universel._resolve_backend(
+                None, doc, mapping
+            ) == 'lxml'
+
+
+def test_unknown_backend_rejected(monkeypatch):
+    with pytest.raises(ValueError):
+        set_default_backend('html5lib')
+    with pytest.raises(ValueError):
+        extract_fields('http://example.com', {'t': 'h1'}, backend='nope')
+
+    monkeypatch.setattr(scraper_universel, 'LexborHTMLParser', None)
+    assert 'selectolax' not in available_backends()
+    with pytest.raises(ValueError):
+        set_default_backend('selectolax')
@@ -0,0 +1,176 @@
+import json
+import logging
+import os
+
+import pytest
+
+pytest.importorskip('PySide6')
+pytest.importorskip('selenium')
+pytest.importorskip('pandas')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import application_definitif as app_mod  # noqa: E402
+from core import session as session_mod  # noqa: E402
+from core.progress import ProgressReporter  # noqa: E402
+
+
+def _fake_run(
+    id_url_map, ids, paths, headless=False, progress=None, cancel=None,
+    append=False,
+):
+    reporters = [
+        ProgressReporter(progress, action, len(ids)) for action in paths
+    ]
+    for reporter in reporters:
+        reporter.started()
+    for index, item in enumerate(ids, start=1):
+        for reporter in reporters:
+            reporter.item_started(index, item)
+            logging.getLogger('core.scraper').info(
+                '%s %s', reporter.action, item
+            )
+            reporter.item_finished(index, item)
+    for reporter in reporters:
+        reporter.finished()
+    return 0
+
+
+def _fake_action(action):
+    def run(
+        id_url_map, ids, base_dir, headless=False, progress=None, cancel=None,
+        append=False,
+    ):
+        return _fake_run(
+            id_url_map, ids, [action], headless, progress, cancel
+        )
+    return run
+
+
+def test_worker_follows_progress_events(monkeypatch, tmp_path):
+    links = tmp_path / 'liens.txt'
+    links.write_text('A1 http://a\nA2 http://b\n', encoding='utf-8')
+    monkeypatch.setattr(session_mod, 'scrap_produits_une_visite', _fake_run)
+
+    def fake_export(base_dir, batch_size, progress=None, cancel=None):
+        # One batch only, while the worker estimated two.
+        reporter = ProgressReporter(progress, 'export', 1)
+        reporter.started()
+        reporter.item_started(1, 'batch_1.json')
+        reporter.item_finished(1, 'batch_1.json')
+        reporter.finished()
+        return 0
+
+    monkeypatch.setattr(
+        session_mod, 'export_fiches_concurrents_json', fake_export
+    )
+    worker = app_mod.ScrapingWorker(
+        str(links),
+        ['A1', 'A2'],
+        {'variantes': True, 'fiches': True, 'export': True},
+        1,
+        {
+            'variantes': str(tmp_path / 'variantes'),
+            'fiches': str(tmp_path / 'fiches'),
+        },
+    )
+    actions, percents, logs = [], [], []
+    worker.action_progress.connect(lambda *args: actions.append(args))
+    worker.progress.connect(lambda p, *_: percents.append(p))
+    worker.log_message.connect(logs.append)
+    root = logging.getLogger()
+    level = root.level
+    root.setLevel(logging.INFO)
+    try:
+        worker.run()
+    finally:
+        root.setLevel(level)
+
+    assert worker.totals == {'variantes': 2, 'fiches': 2, 'export': 1}
+    assert actions == [
+        ('variantes', 1, 2),
+        ('fiches', 1, 2),
+        ('variantes', 2, 2),
+        ('fiches', 2, 2),
+        ('export', 0, 1),
+        ('export', 1, 1),
+    ]
+    # The export total is corrected when the export starts.
+    assert percents == [16, 33, 50, 66, 100, 100]
+    assert 'INFO:core.scraper:fiches A2\n' in logs
+    assert worker.overall_completed == worker.total
+    # The handler is removed once the run is over.
+    assert not any(
+        isinstance(h, app_mod.SignalLogHandler) for h in root.handlers
+    )
+
+
+def test_worker_runs_a_single_action_alone(monkeypatch, tmp_path):
+    links = tmp_path / 'liens.txt'
+    links.write_text('A1 http://a\n', encoding='utf-8')
+    monkeypatch.setattr(
+        session_mod, 'scrap_fiches_concurrents', _fake_action('fiches')
+    )
+
+    def no_fused(*args, **kwargs):
+        raise AssertionError('single action not fused')
+
+    monkeypatch.setattr(session_mod, 'scrap_produits_une_visite', no_fused)
+    worker = app_mod.ScrapingWorker(
+        str(links), ['A1'], {'fiches': True}, 1,
+        {'fiches': str(tmp_path / 'fiches')},
+    )
+    worker.run()
+
+    assert worker.completed_totals == {'fiches': 1}
+
+
+def test_stopped_worker_skips_the_export(monkeypatch, tmp_path):
+    links = tmp_path / 'liens.txt'
+    links.write_text('A1 http://a\n', encoding='utf-8')
+
+    def stopped(id_url_map, ids, base_dir, headless=False, progress=None,
+                cancel=None, append=False):
+        cancel.cancel()
+        return 130
+
+    def no_export(*args, **kwargs):
+        raise AssertionError('export after stop')
+
+    monkeypatch.setattr(session_mod, 'scrap_produits_par_ids', stopped)
+    monkeypatch.setattr(
+        session_mod, 'export_fiches_concurrents_json', no_export
+    )
+    worker = app_mod.ScrapingWorker(
+        str(links), ['A1'], {'variantes': True, 'export': True}, 1,
+        {
+            'variantes': str(tmp_path / 'variantes'),
+            'fiches': str(tmp_path / 'fiches'),
+        },
+    )
+    finished = []
+    worker.finished.connect(lambda: finished.append(True))
+    worker.run()
+
+    assert worker.cancel.cancelled
+    assert finished == [True]
+
+
+def test_worker_saves_its_metrics(monkeypatch, tmp_path):
+    links = tmp_path / 'liens.txt'
+    links.write_text('A1 http://a\nA2 http://b\n', encoding='utf-8')
+    monkeypatch.setattr(
+        session_mod, 'scrap_fiches_concurrents', _fake_action('fiches')
+    )
+    path = tmp_path / 'metriques.json'
+    worker = app_mod.ScrapingWorker(
+        str(links), ['A1', 'A2'], {'fiches': True}, 1,
+        {'fiches': str(tmp_path / 'fiches')},
+        metrics_path=str(path),
+    )
+    snapshots = []
+    worker.metrics_updated.connect(snapshots.append)
+    worker.run()
+
+    assert [s['actions']['fiches']['pages'] for s in snapshots] == [1, 2]
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['actions']['fiches']['pages'] == 2
@@ -0,0 +1,98 @@
+import logging
+import os
+import time
+
+import pytest
+
+from core.jobs import JobQueue, ResourceBudget
+from core.progress import ProgressReporter
+from core.session import CRASHED, DONE, EVENT, LOG, SessionProcess
+
+
+def _crash(progress=None, cancel=None):
+    ProgressReporter(progress, 'variantes', 2).started()
+    logging.getLogger('core.scraper').info('Chrome va planter')
+    # Let the queue send the messages before dying.
+    time.sleep(0.5)
+    os._exit(3)
+
+
+def _wait_for_stop(progress=None, cancel=None):
+    reporter = ProgressReporter(progress, 'variantes', 1)
+    reporter.started()
+    while True:
+        cancel.sleep(0.05)
+
+
+def test_crash_of_the_child_is_reported():
+    session = SessionProcess({}, target=_crash)
+    session.start()
+
+    messages = list(session.messages())
+
+    kinds = [kind for kind, _ in messages]
+    assert kinds == [EVENT, LOG, CRASHED]
+    assert messages[0][1].action == 'variantes'
+    assert messages[1][1].getMessage() == 'Chrome va planter'
+    assert messages[-1] == (CRASHED, 3)
+
+
+def _crash_while_downloading(progress=None, cancel=None):
+    from core.jobs import download_slot
+
+    with download_slot(cancel):
+        os._exit(3)
+
+
+def test_crashed_child_gives_its_download_slot_back():
+    slots = JobQueue(ResourceBudget(downloads=1)).download_slots()
+    session = SessionProcess({}, target=_crash_while_downloading, slots=slots)
+    session.start()
+
+    assert list(session.messages()) == [(CRASHED, 3)]
+    assert slots.held.value == 0
+    assert slots.semaphore.acquire(timeout=1)
+
+
+def test_child_is_cancellable():
+    session = SessionProcess({}, target=_wait_for_stop)
+    session.start()
+    messages = session.messages()
+    assert next(messages)[0] == EVENT
+
+    session.cancel.cancel()
+
+    assert list(messages) == [(DONE, 130)]
+    assert not session.process.is_alive()
+
+
+def test_isolated_worker_relays_events_and_logs(tmp_path):
+    pytest.importorskip('PySide6')
+    pytest.importorskip('pandas')
+    pytest.importorskip('selenium')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    import application_definitif as app_mod
+
+    fiches = tmp_path / 'fiches'
+    (fiches / 'fiches_concurrents').mkdir(parents=True)
+    for name in ('a', 'b', 'c'):
+        (fiches / 'fiches_concurrents' / f'{name}.txt').write_text(
+            f'<h1>{name}</h1>', encoding='utf-8'
+        )
+    links = tmp_path / 'liens.txt'
+    links.write_text('A1 http://a\n', encoding='utf-8')
+    worker = app_mod.ScrapingWorker(
+        str(links), ['A1', 'A2', 'A3'], {'export': True}, 2,
+        {'fiches': str(fiches)}, isolated=True,
+    )
+    logs = []
+    worker.log_message.connect(logs.append)
+
+    worker.run()
+
+    assert worker.crash_code is None
+    assert worker.completed_totals == {'export': 2}
+    assert any('batch' in line for line in logs)
+    assert sorted(p.name for p in fiches.rglob('*.json')) == [
+        'batch_1.json', 'batch_2.json'
+    ]
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('PySide6')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Modules only needed once a scraping starts or a window is shown.
+DEFERRED = (
+    'selenium',
+    'webdriver_manager',
+    'pandas',
+    'core.scraper',
+    'qt_material',
+    'qtawesome',
+)
+# Cumulative import time of application_definitif, in microseconds.
+IMPORT_BUDGET_US = 1_000_000
+
+
+def _import_times(module):
+    """Return the cumulative import time of every module imported."""
+    env = dict(os.environ, PYTHONPATH=ROOT, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line.split('|'))
+        times[name] = int(cumulative)
+    return times
+
+
+def test_gui_import_defers_heavy_modules():
+    times = _import_times('application_definitif')
+
+    assert 'application_definitif' in times
+    assert not [name for name in DEFERRED if name in times]
+    assert times['application_definitif'] < IMPORT_BUDGET_US
@@ -0,0 +1,87 @@
+import json
+
+from core.structured_data import (
+    extract_product_info,
+    extract_structured_data,
+    lookup,
+    resolve_path,
+)
+
+JSONLD = {
+    "@context": "https://schema.org",
+    "@graph": [
+        {"@type": "BreadcrumbList", "name": "Crumbs"},
+        {
+            "@type": "Product",
+            "name": "Sac cabas",
+            "sku": "SAC-01",
+            "image": ["https://x/1.jpg", {"url": "https://x/2.jpg"}],
+            "offers": [
+                {
+                    "@type": "Offer",
+                    "price": "49.90",
+                    "priceCurrency": "EUR",
+                    "availability": "https://schema.org/InStock",
+                }
+            ],
+        },
+    ],
+}
+
+PAGE = (
+    "<html><head>"
+    "<meta property='og:title' content='OG title'>"
+    "<meta property='og:image' content='https://x/og.jpg'>"
+    "<meta property='product:price:amount' content='12,00'>"
+    "<script type='application/ld+json'>" + json.dumps(JSONLD) + "</script>"
+    "<script type='application/ld+json'>{broken</script>"
+    "</head><body>"
+    "<div itemscope itemtype='https://schema.org/Product'>"
+    "<span itemprop='name'>Micro name</span>"
+    "<div itemprop='offers' itemscope itemtype='https://schema.org/Offer'>"
+    "<meta itemprop='price' content='10.00'>"
+    "<link itemprop='availability' href='https://schema.org/OutOfStock'>"
+    "</div></div></body></html>"
+)
+
+
+def test_extract_structured_data_blocks():
+    data = extract_structured_data(PAGE)
+    assert [o.get("@type") for o in data["jsonld"]] == [
+        None, "BreadcrumbList", "Product"
+    ]
+    item = data["microdata"][0]
+    assert item["@type"] == "Product"
+    assert item["name"] == "Micro name"
+    assert item["offers"]["price"] == "10.00"
+    assert item["offers"]["availability"] == "https://schema.org/OutOfStock"
+    assert data["opengraph"]["og:title"] == "OG title"
+
+
+def test_lookup_and_resolve_path():
+    data = extract_structured_data(PAGE)
+    assert lookup(data, "jsonld", "offers.price") == "49.90"
+    assert lookup(data, "jsonld", "image.1.url") == "https://x/2.jpg"
+    assert lookup(data, "microdata", "offers.price") == "10.00"
+    assert lookup(data, "og", "title") == "OG title"
+    assert lookup(data, "jsonld", "offers.missing") is None
+    assert resolve_path({"a": [{"b": None}, {"b": 2}]}, "a.b") == 2
+
+
+def test_extract_product_info_priorities():
+    info = extract_product_info(PAGE)
+    assert info == {
+        "name": "Sac cabas",
+        "price": "49.90",
+        "currency": "EUR",
+        "availability": "InStock",
+        "images": ["https://x/1.jpg", "https://x/2.jpg"],
+        "sku": "SAC-01",
+    }
+    og_only = extract_product_info(
+        "<html><head><meta property='og:title' content='T'>"
+        "<meta property='product:price:amount' content='12,00'>"
+        "</head></html>"
+    )
+    assert og_only == {"price": "12.00"}
+    assert extract_product_info("") == {}
@@ -0,0 +1,160 @@
+import json
+
+from core import templates
+from core.templates import TemplateIndex, page_fingerprint, similarity
+from NEW_APPLICATION_EN_DEV import scraper_universel
+
+HEADER = (
+    "<header class='site-header'><nav class='menu'><ul>"
+    "<li><a>Accueil</a></li><li><a>Boutique</a></li></ul></nav></header>"
+)
+FOOTER = "<footer class='footer'><p>Mentions</p></footer>"
+
+
+def product_page(title, variants=3, related=4):
+    items = "".join(
+        f"<li class='variant v-{i}'><span>{i}</span></li>"
+        for i in range(variants)
+    )
+    cards = "".join(
+        f"<div class='card product-{i * 7}'><a><img src='x.jpg'></a>"
+        f"<h3>Produit {i}</h3><span class='price'>{i}</span></div>"
+        for i in range(related)
+    )
+    return (
+        f"<html><body>{HEADER}<main class='product-page'>"
+        "<div class='gallery'><img class='main' src='m.jpg'></div>"
+        f"<div class='info'><h1 class='title'>{title}</h1>"
+        f"<p class='price'>19,90</p><ul class='variants'>{items}</ul>"
+        "<div class='desc'><p>Texte</p></div></div></main>"
+        f"<section class='related'>{cards}</section>{FOOTER}</body></html>"
+    )
+
+
+def category_page(count):
+    tiles = "".join(
+        "<article class='tile'><a><img src='t.jpg'></a>"
+        f"<h2 class='name'>Article {i}</h2></article>"
+        for i in range(count)
+    )
+    return (
+        f"<html><body><div class='top'><div class='logo'></div></div>"
+        f"<div class='grid'>{tiles}</div><div class='pager'><a>1</a></div>"
+        "</body></html>"
+    )
+
+
+PRODUCT_MAPPING = {'title': 'h1.title', 'price': '.info .price'}
+CATEGORY_MAPPING = {'names': '.tile .name'}
+
+
+def test_fingerprint_ignores_content_but_not_template():
+    a = page_fingerprint(product_page('Lampe', variants=2, related=4))
+    b = page_fingerprint(product_page('Chaise', variants=6, related=1))
+    c = page_fingerprint(category_page(12))
+
+    assert similarity(a, b) > 0.7
+    assert similarity(a, c) < 0.2
+    assert page_fingerprint(product_page('Autre')) == page_fingerprint(
+        product_page('Lampe')
+    )
+    assert page_fingerprint('') == frozenset()
+
+
+def test_index_match_unknown_clusters_and_persistence(tmp_path):
+    index = TemplateIndex()
+    index.add('product', PRODUCT_MAPPING, page_fingerprint(product_page('A')))
+
+    name, mapping, score = index.match(
+        page_fingerprint(product_page('B', variants=5))
+    )
+    assert (name, mapping) == ('product', PRODUCT_MAPPING)
+    assert score >= index.threshold
+    assert index.match(page_fingerprint(category_page(3))) is None
+
+    index.record_unknown('/c1', page_fingerprint(category_page(3)))
+    index.record_unknown('/c2', page_fingerprint(category_page(9)))
+    index.record_unknown('/odd', page_fingerprint('<p><b>x</b><i>y</i></p>'))
+    clusters = index.unknown_clusters()
+    assert [c['urls'] for c in clusters] == [['/c1', '/c2'], ['/odd']]
+
+    path = tmp_path / 'templates.json'
+    index.save(path)
+    loaded = TemplateIndex.load(path)
+    assert loaded.templates['product']['samples'] == (
+        index.templates['product']['samples']
+    )
+    assert [u['url'] for u in loaded.unknown] == ['/c1', '/c2', '/odd']
+
+    loaded.add('category', CATEGORY_MAPPING, clusters[0]['fingerprint'])
+    assert [u['url'] for u in loaded.unknown] == ['/odd']
+    assert TemplateIndex.load(tmp_path / 'missing.json').templates == {}
+
+
+def test_unknown_pages_are_deduped_and_capped(monkeypatch):
+    monkeypatch.setattr(templates, 'MAX_UNKNOWN', 3)
+    index = TemplateIndex()
+    fingerprint = page_fingerprint(category_page(3))
+    for run in range(3):
+        index.record_unknown('/c0', fingerprint)
+        index.record_unknown('/c1', fingerprint)
+    assert [u['url'] for u in index.unknown] == ['/c0', '/c1']
+    assert index.unknown_clusters()[0]['size'] == 2
+
+    for n in range(2, 6):
+        index.record_unknown(f'/c{n}', fingerprint)
+    assert [u['url'] for u in index.unknown] == ['/c3', '/c4', '/c5']
+
+
+def test_extract_fields_many_routes_pages(requests_mock):
+    pages = {
+        'http://shop.test/p1': product_page('Lampe'),
+        'http://shop.test/p2': product_page('Chaise', variants=7),
+        'http://shop.test/c1': category_page(2),
+    }
+    for url, page in pages.items():
+        requests_mock.get(url, text=page)
+    index = TemplateIndex()
+    assert scraper_universel.learn_template(
+        index, 'product', PRODUCT_MAPPING, ['http://shop.test/p1']
+    ) == 1
+
+    records = list(
+        scraper_universel.extract_fields_many(pages, index, ordered=True)
+    )
+    assert [r['template'] for r in records] == ['product', 'product', None]
+    assert records[1]['data'] == {'title': 'Chaise', 'price': '19,90'}
+    assert records[2]['data'] is None and records[2]['error'] is None
+    assert [u['url'] for u in index.unknown] == ['http://shop.test/c1']
+
+
+def test_cli_learn_route_review(tmp_path, requests_mock, capsys):
+    requests_mock.get('http://shop.test/p1', text=product_page('Lampe'))
+    requests_mock.get('http://shop.test/p2', text=product_page('Chaise'))
+    requests_mock.get('http://shop.test/c1', text=category_page(4))
+    index_path = tmp_path / 'templates.json'
+    urls = tmp_path / 'urls.txt'
+    urls.write_text('http://shop.test/p2\nhttp://shop.test/c1\n')
+
+    scraper_universel.main([
+        '--templates', str(index_path),
+        '--learn-template', 'product',
+        '--url', 'http://shop.test/p1',
+        '--mapping', json.dumps(PRODUCT_MAPPING),
+    ])
+    scraper_universel.main([
+        '--templates', str(index_path),
+        '--urls-file', str(urls),
+        '--ordered',
+    ])
+    scraper_universel.main(['--templates', str(index_path),
+                            '--review-templates'])
+
+    out = capsys.readouterr().out
+    learned, routed = out.split('\n', 1)
+    assert json.loads(learned) == {'template': 'product', 'pages': 1}
+    records = [json.loads(line) for line in routed.split('\n')[:2]]
+    assert records[0]['data'] == {'title': 'Chaise', 'price': '19,90'}
+    assert records[1]['template'] is None
+    clusters = json.loads('\n'.join(routed.split('\n')[2:]))
+    assert clusters == [{'size': 1, 'urls': ['http://shop.test/c1']}]
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from core.text_cleaning import (
+    TextCleaner,
+    clean_description,
+    clean_many,
+    get_cleaner,
+    load_rule_sets,
+    register_rule_set,
+)
+from NEW_APPLICATION_EN_DEV import scraper_universel
+
+TEXT = "\n".join([
+    "Une lampe de chevet en laiton massif, finition brossée.",
+    "Court",
+    "LIVRAISON offerte dès 50 euros d'achat en France.",
+    "Contactez notre Service Client pour toute question.",
+    "Une lampe de chevet en laiton massif, finition brossée.",
+    "Abat-jour en lin naturel, diamètre vingt-cinq centimètres.",
+])
+
+
+def legacy(text):
+    keywords = [
+        "livraison", "retour", "contact", "paiement", "bob crew",
+        "service client",
+    ]
+    return "\n".join(
+        line for line in text.splitlines()
+        if len(line.strip()) > 30
+        and not any(kw in line.lower() for kw in keywords)
+    )
+
+
+def test_default_rules_match_historical_behaviour():
+    assert clean_description(TEXT) == legacy(TEXT)
+    assert scraper_universel.clean_description(TEXT) == legacy(TEXT)
+    assert clean_many([TEXT, "", "a\r\nb"]) == [legacy(TEXT), "", ""]
+
+
+def test_dedupe_and_thresholds():
+    cleaner = TextCleaner(dedupe=True)
+    assert cleaner.clean(TEXT).splitlines() == [
+        "Une lampe de chevet en laiton massif, finition brossée.",
+        "Abat-jour en lin naturel, diamètre vingt-cinq centimètres.",
+    ]
+    short = TextCleaner(keywords=[], min_length=0)
+    assert short.clean("Court\n  \nLivraison") == "Court\nLivraison"
+
+
+def test_named_and_inline_rule_sets(tmp_path):
+    register_rule_set('lin', {'extra_keywords': ['LIN'], 'dedupe': True})
+    assert clean_description(TEXT, 'lin') == (
+        "Une lampe de chevet en laiton massif, finition brossée."
+    )
+    assert get_cleaner('lin') is get_cleaner({
+        'dedupe': True, 'extra_keywords': ['LIN'],
+    })
+
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({'site': {'keywords': ['laiton']}}))
+    assert load_rule_sets(path) == ['site']
+    assert clean_description(TEXT, 'site').splitlines() == [
+        "LIVRAISON offerte dès 50 euros d'achat en France.",
+        "Contactez notre Service Client pour toute question.",
+        "Abat-jour en lin naturel, diamètre vingt-cinq centimètres.",
+    ]
+
+    assert get_cleaner(1) is get_cleaner(True) is get_cleaner('default')
+    with pytest.raises(ValueError):
+        get_cleaner('unknown-site')
+    with pytest.raises(ValueError):
+        get_cleaner({'keyword': ['typo']})
+    with pytest.raises(ValueError):
+        register_rule_set('bad', {'extra_keywords': 'not a list'})
+
+
+def test_mapping_clean_rules(requests_mock):
+    html = '<html><div class="d">{}</div></html>'.format(
+        TEXT.replace("\n", "<br>")
+    )
+    requests_mock.get('http://example.com', text=html)
+    mapping = {
+        'default': {'selector': '.d', 'clean': True},
+        'numeric': {'selector': '.d', 'clean': 1},
+        'inline': {
+            'selector': '.d',
+            'clean': {'dedupe': True, 'extra_keywords': ['abat-jour']},
+        },
+    }
+
+    data = scraper_universel.extract_fields('http://example.com', mapping)
+    assert data['default'] == data['numeric'] == legacy(TEXT)
+    assert data['inline'] == (
+        "Une lampe de chevet en laiton massif, finition brossée."
+    )
+    with pytest.raises(ValueError):
+        scraper_universel.extract_fields(
+            'http://example.com',
+            {'d': {'selector': '.d', 'clean': 'unknown-site'}},
+        )
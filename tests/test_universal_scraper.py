@@ -111,11 +111,76 @@ def test_lxml_parser_used(monkeypatch, requests_mock):
         return real_bs(page, parser)
 
     monkeypatch.setattr(scraper_universel, 'BeautifulSoup', fake_bs)
-    scrap_fiche_generique('http://example.com', {'title': 'h1'})
+    mapping = {'title': {'selector': 'h1', 'raw_html': True}}
+    scrap_fiche_generique('http://example.com', mapping, backend='bs4')
 
     assert captured['parser'] == 'lxml'
 
 
+def test_single_parse_without_soup(monkeypatch, requests_mock):
+    pytest = __import__('pytest')
+    pytest.importorskip('lxml.cssselect')
+
+    html = (
+        "<html><h1>Title</h1><p class='price'>9.99</p>"
+        "<script>var x = 1;</script></html>"
+    )
+    requests_mock.get('http://example.com', text=html)
+
+    def fail_bs(page, parser):
+        raise AssertionError('BeautifulSoup should not be built')
+
+    monkeypatch.setattr(scraper_universel, 'BeautifulSoup', fail_bs)
+    data = scrap_fiche_generique(
+        'http://example.com',
+        {'title': 'h1', 'price': '.price', 'avail': '//p/text()'},
+    )
+    assert data == {'title': 'Title', 'price': '9.99', 'avail': '9.99'}
+
+
+def test_charset_sniffed_from_bytes(requests_mock):
+    meta_page = (
+        "<html><head><meta charset='iso-8859-1'></head>"
+        "<h1>Café</h1></html>"
+    ).encode('latin-1')
+    requests_mock.get('http://meta.com', content=meta_page)
+    header_page = "<html><h1>Thé</h1></html>".encode('cp1252')
+    requests_mock.get(
+        'http://header.com',
+        content=header_page,
+        headers={'Content-Type': 'text/html; charset=windows-1252'},
+    )
+    utf8_page = "<html><h1>Crème</h1></html>".encode('utf-8')
+    requests_mock.get('http://utf8.com', content=utf8_page)
+
+    assert scrap_fiche_generique('http://meta.com', {'t': 'h1'})['t'] == (
+        'Café'
+    )
+    assert scrap_fiche_generique('http://header.com', {'t': 'h1'})['t'] == (
+        'Thé'
+    )
+    assert scrap_fiche_generique('http://utf8.com', {'t': 'h1'})['t'] == (
+        'Crème'
+    )
+
+
+def test_euc_jp_page_with_xpath_field(requests_mock):
+    page = (
+        "<html><head><meta charset='EUC-JP'></head><h1>テスト</h1></html>"
+    ).encode('euc_jp')
+    requests_mock.get('http://jp.com', content=page)
+    requests_mock.get(
+        'http://jp-header.com',
+        content=page,
+        headers={'Content-Type': 'text/html; charset=EUC-JP'},
+    )
+
+    for url in ('http://jp.com', 'http://jp-header.com'):
+        assert scraper_universel.extract_fields(url, {'t': '//h1'}) == {
+            't': 'テスト'
+        }
+
+
 def test_html_parser_fallback(monkeypatch, requests_mock):
     captured = {}
     html = '<html><h1>Title</h1></html>'
@@ -129,6 +194,7 @@ def test_html_parser_fallback(monkeypatch, requests_mock):
 
     monkeypatch.setattr(scraper_universel, 'BeautifulSoup', fake_bs)
     monkeypatch.setattr(scraper_universel, 'html', None)
+    monkeypatch.setattr(scraper_universel, 'LexborHTMLParser', None)
     scrap_fiche_generique('http://example.com', {'title': 'h1'})
 
     assert captured['parser'] == 'html.parser'
@@ -154,3 +220,319 @@ def test_advanced_css_options(requests_mock):
     data = scrap_fiche_generique('http://example.com', mapping)
     assert data['desc'] == 'Intro paragraph with sufficient length to keep.'
 
+
+def test_extract_fields_many_records(requests_mock):
+    for i in range(5):
+        requests_mock.get(
+            f'http://shop{i % 2}.com/p{i}', text=f'<h1>Item {i}</h1>'
+        )
+    requests_mock.get('http://shop0.com/missing', status_code=404)
+    urls = [f'http://shop{i % 2}.com/p{i}' for i in range(5)]
+    urls.insert(2, 'http://shop0.com/missing')
+
+    records = list(
+        scraper_universel.extract_fields_many(
+            iter(urls), {'title': 'h1'}, workers=3, ordered=True
+        )
+    )
+
+    assert [r['url'] for r in records] == urls
+    assert [r['index'] for r in records] == list(range(6))
+    failed = records[2]
+    assert failed['data'] is None
+    assert '404' in failed['error']
+    assert records[0]['data'] == {'title': 'Item 0'}
+    assert records[5]['data'] == {'title': 'Item 4'}
+
+
+def test_extract_fields_many_leaves_caller_session_alone(requests_mock):
+    requests_mock.get('http://shop.com/p', text='<h1>Item</h1>')
+    session = requests.Session()
+    before = dict(session.headers)
+
+    records = list(
+        scraper_universel.extract_fields_many(
+            ['http://shop.com/p'], {'title': 'h1'}, session=session,
+            user_agent='Bot/1.0',
+        )
+    )
+
+    assert records[0]['data'] == {'title': 'Item'}
+    assert requests_mock.last_request.headers['User-Agent'] == 'Bot/1.0'
+    assert dict(session.headers) == before
+
+
+def test_extract_fields_many_per_host_limit(monkeypatch):
+    import time
+
+    lock = threading.Lock()
+    active = {}
+    peaks = {}
+
+    def fake_fetch(url, *, session=None, timeout=10, user_agent=None):
+        host = scraper_universel._host(url)
+        with lock:
+            active[host] = active.get(host, 0) + 1
+            peaks[host] = max(peaks.get(host, 0), active[host])
+        time.sleep(0.02)
+        with lock:
+            active[host] -= 1
+        return scraper_universel._PageDocument(b'<h1>ok</h1>')
+
+    monkeypatch.setattr(scraper_universel, '_fetch_document', fake_fetch)
+    urls = [f'http://a.com/{i}' for i in range(8)]
+    urls += [f'http://b.com/{i}' for i in range(8)]
+
+    records = list(
+        scraper_universel.extract_fields_many(
+            urls, {'t': 'h1'}, workers=6, per_host=2
+        )
+    )
+
+    assert sorted(r['index'] for r in records) == list(range(16))
+    assert all(r['error'] is None for r in records)
+    assert peaks == {'a.com': 2, 'b.com': 2}
+
+
+def test_cli_urls_file_ndjson(tmp_path):
+    pages = {'/a': '<h1>A</h1>', '/b': '<h1>B</h1>'}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header('Content-type', 'text/html')
+            self.end_headers()
+            self.wfile.write((body or '').encode())
+
+        def log_message(self, *args):
+            pass
+
+    with socketserver.ThreadingTCPServer(('localhost', 0), Handler) as server:
+        port = server.server_address[1]
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        urls = tmp_path / 'urls.txt'
+        urls.write_text(
+            '\n'.join(
+                f'http://localhost:{port}{path}' for path in ('/a', '/x', '/b')
+            )
+        )
+        try:
+            result = subprocess.run(
+                [
+                    sys.executable,
+                    '-m',
+                    'NEW_APPLICATION_EN_DEV.scraper_universel',
+                    '--urls-file',
+                    str(urls),
+                    '--mapping',
+                    '{"title": "h1"}',
+                    '--ordered',
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+        finally:
+            server.shutdown()
+            thread.join()
+
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r['data'] for r in records] == [
+        {'title': 'A'}, None, {'title': 'B'}
+    ]
+    assert records[1]['error']
+
+
+def _serve(pages):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = pages.get(self.path)
+            self.send_response(200 if body else 404)
+            self.send_header('Content-type', 'text/html')
+            self.end_headers()
+            self.wfile.write((body or '').encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = socketserver.ThreadingTCPServer(('localhost', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, thread
+
+
+def test_aextract_fields_many():
+    pytest = __import__('pytest')
+    pytest.importorskip('aiohttp')
+    import asyncio
+
+    pages = {f'/p{i}': f'<h1>P{i}</h1><p>x</p>' for i in range(20)}
+    server, thread = _serve(pages)
+    base = f'http://localhost:{server.server_address[1]}'
+    urls = [f'{base}/p{i}' for i in range(20)] + [f'{base}/missing']
+    mapping = {'title': 'h1', 'p': '//p'}
+
+    async def run():
+        single = await scraper_universel.aextract_fields(
+            f'{base}/p3', mapping
+        )
+        records = [
+            r async for r in scraper_universel.aextract_fields_many(
+                urls, mapping, concurrency=5, per_host=3, ordered=True
+            )
+        ]
+        return single, records
+
+    try:
+        single, records = asyncio.run(run())
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+    assert single == {'title': 'P3', 'p': 'x'}
+    assert [r['url'] for r in records] == urls
+    assert records[7]['data'] == {'title': 'P7', 'p': 'x'}
+    assert records[-1]['data'] is None
+    assert '404' in records[-1]['error']
+
+
+def _heavy_page():
+    head = (
+        "<html><body><h1>Product</h1><p class='price'>12,50</p>"
+        "<div class='desc'><p>Great product</p></div>"
+    )
+    footer = "<script>" + "var x = 1;" * 100000 + "</script>"
+    return (head + footer + "<footer>end</footer></body></html>").encode()
+
+
+def test_stream_stops_when_fields_resolved(requests_mock):
+    page = _heavy_page()
+    requests_mock.get('http://heavy.com', content=page)
+    mapping = {
+        'title': 'h1',
+        'price': '//p[@class="price"]',
+        'desc': {'selector': '.desc', 'first_paragraph': True},
+    }
+
+    doc = scraper_universel._stream_document(
+        'http://heavy.com', mapping, chunk_size=8192
+    )
+    assert len(doc.content) < len(page) // 10
+    data = scraper_universel._extract_document(doc, mapping)
+    assert data == {
+        'title': 'Product', 'price': '12,50', 'desc': 'Great product'
+    }
+    assert scrap_fiche_generique(
+        'http://heavy.com', mapping, stream=True
+    ) == data
+
+
+def test_stream_reads_to_end_or_cap(requests_mock):
+    page = _heavy_page()
+    requests_mock.get('http://heavy.com', content=page)
+
+    doc = scraper_universel._stream_document(
+        'http://heavy.com', {'end': 'footer'}, chunk_size=8192
+    )
+    assert len(doc.content) == len(page)
+    assert scraper_universel._extract_document(doc, {'end': 'footer'}) == {
+        'end': 'end'
+    }
+
+    doc = scraper_universel._stream_document(
+        'http://heavy.com',
+        {'end': 'footer'},
+        chunk_size=8192,
+        max_bytes=100000,
+    )
+    assert len(doc.content) < 120000
+    data = scraper_universel._extract_document(
+        doc, {'end': 'footer', 'title': 'h1'}
+    )
+    assert data == {'end': None, 'title': 'Product'}
+
+
+def test_structured_data_mapping(monkeypatch, requests_mock):
+    html = (
+        "<html><head><script type='application/ld+json'>"
+        '{"@type": "Product", "name": "Lamp",'
+        ' "offers": {"price": 19.5, "priceCurrency": "EUR"}}'
+        "</script><meta property='og:image' content='https://x/a.jpg'>"
+        "</head><body><h1>Lamp</h1><p class='sku'>L-1</p></body></html>"
+    )
+    requests_mock.get('http://example.com', text=html)
+    calls = []
+    real = scraper_universel.extract_structured_data
+
+    def counting(source):
+        calls.append(source)
+        return real(source)
+
+    monkeypatch.setattr(
+        scraper_universel, 'extract_structured_data', counting
+    )
+    mapping = {
+        'prix': {'jsonld': 'offers.price'},
+        'devise': {'jsonld': 'offers.priceCurrency'},
+        'image': {'og': 'image'},
+        'sku': {'jsonld': 'sku', 'selector': '.sku'},
+        'absent': {'microdata': 'name'},
+    }
+    data = scrap_fiche_generique('http://example.com', mapping)
+    assert data == {
+        'prix': '19.5',
+        'devise': 'EUR',
+        'image': 'https://x/a.jpg',
+        'sku': 'L-1',
+        'absent': None,
+    }
+    assert len(calls) == 1
+
+
+def test_single_walk_matches_per_field(monkeypatch):
+    page = (
+        "<html><body><div class='product'>"
+        "<h1>Lamp</h1><span class='price'>12</span>"
+        "<div class='desc'><p>First</p><p>Second</p></div>"
+        "<img class='main' src=' a.jpg '/>"
+        "<ul><li class='tag'>x</li><li class='tag'>y</li></ul>"
+        "</div><p class='legal'>BEST-SELLER</p></body></html>"
+    )
+    mapping = {
+        'title': '.product h1',
+        'price': '.product > .price',
+        'desc': {'selector': '.desc', 'first_paragraph': True},
+        'image': 'img.main',
+        'tags': 'li.tag',
+        'missing': '.nothing',
+        'second': 'li:nth-of-type(2)',
+        'xpath': '//h1',
+    }
+    doc = scraper_universel._PageDocument(page.encode())
+    expected = {
+        field: scraper_universel._extract_field(doc, selector)
+        for field, selector in mapping.items()
+    }
+
+    calls = []
+    real = scraper_universel._extract_with_cssselect
+
+    def counting(tree, css, options):
+        calls.append(css)
+        return real(tree, css, options)
+
+    monkeypatch.setattr(
+        scraper_universel, '_extract_with_cssselect', counting
+    )
+    data = scraper_universel._extract_document(doc, mapping)
+
+    assert data == expected
+    assert data['tags'] == ['x', 'y']
+    assert data['desc'] == 'First'
+    assert data['image'] == 'a.jpg'
+    assert calls == ['li:nth-of-type(2)']
@@ -1,3 +1,14 @@
 from .animated_progress_bar import AnimatedProgressBar
+from .id_list import IdListModel, IdListView
+from .log_view import LogBuffer, LogView
+from .results_view import ResultsModel, ResultsView
 
-__all__ = ["AnimatedProgressBar"]
+__all__ = [
+    "AnimatedProgressBar",
+    "IdListModel",
+    "IdListView",
+    "LogBuffer",
+    "LogView",
+    "ResultsModel",
+    "ResultsView",
+]
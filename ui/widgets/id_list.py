@@ -0,0 +1,75 @@
+"""List model of the product IDs, backed by a :class:`core.id_index.IdIndex`.
+
+The model only answers for the rows the view paints, so a links file of
+100 000 IDs costs no more to show than one of ten. The selected range is
+given to the view as one ``QItemSelection`` range.
+"""
+
+from typing import Any, Optional, Tuple
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QItemSelection,
+    QItemSelectionModel,
+    QModelIndex,
+    Qt,
+)
+from PySide6.QtWidgets import QAbstractItemView, QListView
+
+from core.id_index import IdIndex
+
+
+class IdListModel(QAbstractListModel):
+    """The IDs of an :class:`IdIndex`, one row per ID."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.index_ids = IdIndex()
+
+    def set_index(self, index: IdIndex) -> None:
+        self.beginResetModel()
+        self.index_ids = index
+        self.endResetModel()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.index_ids)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if index.isValid() and role == Qt.DisplayRole:
+            return self.index_ids[index.row()]
+        return None
+
+
+class IdListView(QListView):
+    """Virtualized list of the IDs showing the selected range."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.id_model = IdListModel(self)
+        self.setModel(self.id_model)
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.ExtendedSelection)
+
+    def show_span(self, span: Optional[Tuple[int, int]]) -> None:
+        """Select the rows of *span* (``None`` clears the selection)."""
+        selection = self.selectionModel()
+        if span is None or span[0] >= span[1]:
+            selection.clearSelection()
+            return
+        top = self.id_model.index(span[0])
+        bottom = self.id_model.index(span[1] - 1)
+        selection.select(
+            QItemSelection(top, bottom),
+            QItemSelectionModel.ClearAndSelect,
+        )
+        self.scrollTo(top, QAbstractItemView.PositionAtTop)
+
+    def selected_bounds(self) -> Optional[Tuple[int, int]]:
+        """Return the first and last selected rows."""
+        ranges = self.selectionModel().selection()
+        if ranges.isEmpty():
+            return None
+        return (
+            min(r.top() for r in ranges),
+            max(r.bottom() for r in ranges),
+        )
@@ -0,0 +1,267 @@
+"""Log view able to follow verbose scraping sessions.
+
+Log records are not sent to the GUI one by one: :class:`LogBuffer` is a
+``logging.Handler`` which, in the thread emitting the record, formats it,
+writes it to the session log file and queues its lines. The
+:class:`LogView` drains that queue every ``FLUSH_INTERVAL_MS`` and inserts
+the lines in one batch into :class:`LogModel`, a ring buffer keeping the
+last ``MAX_LINES`` lines. The list view only paints the visible rows and
+:class:`LogFilterProxy` filters them by text and level.
+
+The file keeps the whole log: "copy the log" reads it instead of the
+widget, which only holds the last lines.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+    QTimer,
+)
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QHBoxLayout,
+    QLineEdit,
+    QListView,
+    QVBoxLayout,
+    QWidget,
+)
+
+logger = logging.getLogger(__name__)
+
+# Lines kept in the view; the log file keeps everything.
+MAX_LINES = 10000
+# About 30 refreshes per second.
+FLUSH_INTERVAL_MS = 33
+
+LEVEL_ROLE = Qt.UserRole
+LEVELS = (
+    ("Tout", logging.NOTSET),
+    ("Infos", logging.INFO),
+    ("Avertissements", logging.WARNING),
+    ("Erreurs", logging.ERROR),
+)
+_COLORS = {
+    logging.WARNING: QColor("#f0ad4e"),
+    logging.ERROR: QColor("#ff6b6b"),
+}
+
+# (level, text) of one line.
+LogLine = Tuple[int, str]
+
+
+class LogBuffer(logging.Handler):
+    """Queue formatted log lines for the GUI, safe from any thread.
+
+    With *path*, every line is also appended to that file. Lines not yet
+    drained beyond *capacity* are dropped from the queue (never from the
+    file).
+    """
+
+    def __init__(
+        self, path: Optional[str] = None, capacity: int = MAX_LINES
+    ) -> None:
+        super().__init__()
+        self.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+        self.path = path
+        self._pending: Deque[LogLine] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8") if path else None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self.write(self.format(record), record.levelno)
+        except Exception:  # pragma: no cover - same policy as logging
+            self.handleError(record)
+
+    def write(self, text: str, level: int = logging.INFO) -> None:
+        """Queue *text*, one line per line of text."""
+        lines = text.rstrip("\n").split("\n")
+        with self._lock:
+            if self._file is not None:
+                self._file.write("\n".join(lines) + "\n")
+                self._file.flush()
+            self._pending.extend((level, line) for line in lines)
+
+    def drain(self) -> List[LogLine]:
+        """Return and forget the queued lines."""
+        with self._lock:
+            lines = list(self._pending)
+            self._pending.clear()
+        return lines
+
+    def read_all(self) -> str:
+        """Return the whole log from the file."""
+        if self.path is None:
+            return ""
+        with self._lock:
+            with open(self.path, encoding="utf-8") as f:
+                return f.read()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            if self._file is not None:
+                self._file.seek(0)
+                self._file.truncate()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        super().close()
+
+
+class LogModel(QAbstractListModel):
+    """The last *capacity* log lines, oldest first."""
+
+    def __init__(self, capacity: int = MAX_LINES, parent=None) -> None:
+        super().__init__(parent)
+        self.capacity = capacity
+        self._lines: Deque[LogLine] = deque()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._lines)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        level, text = self._lines[index.row()]
+        if role == Qt.DisplayRole:
+            return text
+        if role == LEVEL_ROLE:
+            return level
+        if role == Qt.ForegroundRole:
+            return _COLORS.get(min(level, logging.ERROR))
+        return None
+
+    def append_lines(self, lines: List[LogLine]) -> None:
+        """Add *lines*, dropping the oldest ones beyond the capacity."""
+        lines = lines[-self.capacity:]
+        if not lines:
+            return
+        overflow = len(self._lines) + len(lines) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._lines.popleft()
+            self.endRemoveRows()
+        start = len(self._lines)
+        self.beginInsertRows(QModelIndex(), start, start + len(lines) - 1)
+        self._lines.extend(lines)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self._lines.clear()
+        self.endResetModel()
+
+    def text(self) -> str:
+        return "\n".join(text for _, text in self._lines)
+
+
+class LogFilterProxy(QSortFilterProxyModel):
+    """Keep the lines containing a text, at or above a level."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.min_level = logging.NOTSET
+        self.setFilterCaseSensitivity(Qt.CaseInsensitive)
+
+    def set_min_level(self, level: int) -> None:
+        self.min_level = level
+        self.invalidate()
+
+    def filterAcceptsRow(self, row: int, parent: QModelIndex) -> bool:
+        index = self.sourceModel().index(row, 0, parent)
+        if index.data(LEVEL_ROLE) < self.min_level:
+            return False
+        return super().filterAcceptsRow(row, parent)
+
+
+class LogView(QWidget):
+    """Filterable list of the log lines queued in :attr:`buffer`."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        capacity: int = MAX_LINES,
+        parent=None,
+    ) -> None:
+        super().__init__(parent)
+        self.buffer = LogBuffer(path, capacity)
+        self.model = LogModel(capacity, self)
+        self.proxy = LogFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filtrer le journal...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(
+            self.proxy.setFilterFixedString
+        )
+        self.level_combo = QComboBox()
+        for label, level in LEVELS:
+            self.level_combo.addItem(label, level)
+        self.level_combo.currentIndexChanged.connect(self._level_changed)
+
+        self.list_view = QListView()
+        self.list_view.setObjectName("logArea")
+        self.list_view.setModel(self.proxy)
+        # Same height for every row: no need to lay out the hidden ones.
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(
+            QAbstractItemView.ExtendedSelection
+        )
+
+        filter_line = QHBoxLayout()
+        filter_line.setContentsMargins(0, 0, 0, 0)
+        filter_line.addWidget(self.filter_edit, 1)
+        filter_line.addWidget(self.level_combo)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(filter_line)
+        layout.addWidget(self.list_view)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(FLUSH_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def _level_changed(self) -> None:
+        self.proxy.set_min_level(self.level_combo.currentData())
+
+    def append(self, text: str, level: int = logging.INFO) -> None:
+        """Queue a message of the GUI itself."""
+        self.buffer.write(text, level)
+
+    def flush(self) -> None:
+        """Show the queued lines, following the end of the log."""
+        lines = self.buffer.drain()
+        if not lines:
+            return
+        bar = self.list_view.verticalScrollBar()
+        at_end = bar.value() == bar.maximum()
+        self.model.append_lines(lines)
+        if at_end:
+            self.list_view.scrollToBottom()
+
+    def full_text(self) -> str:
+        """Return the whole log: the file, else the lines kept."""
+        if self.buffer.path is not None:
+            return self.buffer.read_all()
+        self.flush()
+        return self.model.text()
+
+    def clear(self) -> None:
+        self.buffer.clear()
+        self.model.clear()
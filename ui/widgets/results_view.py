@@ -0,0 +1,390 @@
+"""Per-product results of the scraping sessions.
+
+:class:`ResultsModel` keeps one row per session, product ID and action,
+updated from the ``ITEM_STARTED`` / ``ITEM_FINISHED`` events of the
+workers: the first event of a product adds its row, the next ones change
+it in place. Sessions scraping different links files may share IDs, so
+the session is part of the key. Only
+the rows the view paints are formatted. Like the log view,
+:class:`ResultsView` queues the events and applies them every
+``FLUSH_INTERVAL_MS``; a large batch resets the model once instead of
+signalling every row.
+
+Sorting and filtering work on the list of the visible row numbers held by
+the model, not through a ``QSortFilterProxyModel`` calling back into Python
+for every comparison: sorting 50 000 rows is one ``list.sort`` with a key.
+Rows added while a sort is active go at the end until the next sort.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    Qt,
+    QTimer,
+    Signal,
+)
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QHBoxLayout,
+    QHeaderView,
+    QLineEdit,
+    QPushButton,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from core.id_index import natural_key
+from core.progress import ITEM_FINISHED, ITEM_STARTED, ProgressEvent
+
+from .log_view import FLUSH_INTERVAL_MS
+
+RUNNING = "En cours"
+OK = "OK"
+FAILED = "Erreur"
+STATUSES = (
+    ("Tous", None),
+    ("En cours", RUNNING),
+    ("OK", OK),
+    ("Erreurs", FAILED),
+)
+
+# Header and attribute of the columns.
+COLUMNS = (
+    ("ID", "item"),
+    ("Action", "action"),
+    ("Session", "session"),
+    ("Statut", "status"),
+    ("Durée (s)", "elapsed"),
+    ("Chargement (s)", "load"),
+    ("Fichier", "output"),
+    ("Prix", "price"),
+    ("Variantes", "variants"),
+    ("Erreur", "error"),
+)
+SESSION_COLUMN = [attribute for _, attribute in COLUMNS].index("session")
+_FAILED_COLOR = QColor("#ff6b6b")
+# Beyond this many events, a batch resets the model.
+RESET_THRESHOLD = 100
+
+
+class ProductResult:
+    """Last known result of one action on one product."""
+
+    __slots__ = tuple(attribute for _, attribute in COLUMNS)
+
+    def __init__(self, item: str, action: str, session: int = 0) -> None:
+        self.item = item
+        self.action = action
+        self.session = session
+        self.status = RUNNING
+        self.elapsed: Optional[float] = None
+        self.load: Optional[float] = None
+        self.output: Optional[str] = None
+        self.price: Optional[str] = None
+        self.variants: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def update(self, event: ProgressEvent) -> None:
+        if event.kind == ITEM_STARTED:
+            self.status = RUNNING
+            self.elapsed = self.load = self.error = None
+            return
+        self.status = OK if event.ok else FAILED
+        self.elapsed = event.elapsed
+        self.load = event.load or None
+        self.error = event.error
+        details = event.details or {}
+        self.output = details.get("output")
+        self.price = details.get("price")
+        self.variants = details.get("variants")
+
+    def text(self, attribute: str) -> str:
+        value = getattr(self, attribute)
+        if value is None:
+            return ""
+        if isinstance(value, float):
+            return f"{value:.2f}"
+        if attribute == "output":
+            return os.path.basename(value)
+        return str(value)
+
+
+def _sort_key(attribute: str):
+    if attribute == "item":
+        return lambda result: natural_key(result.item)
+
+    def key(result: ProductResult) -> Tuple:
+        value = getattr(result, attribute)
+        # Empty cells first, whatever the type of the others.
+        return (value is not None, value if value is not None else 0)
+    return key
+
+
+class ResultsModel(QAbstractTableModel):
+    """One row per session, product ID and action, sortable and
+    filterable."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.results: List[ProductResult] = []
+        self._keys: Dict[Tuple[int, str, str], int] = {}
+        # Numbers of the visible results, in display order.
+        self._rows: List[int] = []
+        self._row_of: Dict[int, int] = {}
+        self.filter_text = ""
+        self.filter_status: Optional[str] = None
+        self.sort_column = -1
+        self.sort_order = Qt.AscendingOrder
+
+    # ---------- Qt model ----------
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        result = self.results[self._rows[index.row()]]
+        attribute = COLUMNS[index.column()][1]
+        if role == Qt.DisplayRole:
+            return result.text(attribute)
+        if role == Qt.ToolTipRole and attribute in ("output", "error"):
+            return getattr(result, attribute)
+        if role == Qt.ForegroundRole and result.status == FAILED:
+            return _FAILED_COLOR
+        return None
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation,
+        role: int = Qt.DisplayRole,
+    ) -> Any:
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section][0]
+        return None
+
+    def sort(self, column: int, order: Qt.SortOrder = Qt.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        kept = [
+            (self._rows[index.row()], index.column()) for index in persistent
+        ]
+        self._sort_rows()
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(self._row_of[n], column) for n, column in kept],
+        )
+        self.layoutChanged.emit()
+
+    # ---------- Results ----------
+    def _apply(self, event: ProgressEvent, session: int) -> Optional[int]:
+        """Update the result of *event*; return its number."""
+        if event.kind not in (ITEM_STARTED, ITEM_FINISHED) or not event.item:
+            return None
+        key = (session, event.item, event.action)
+        number = self._keys.get(key)
+        if number is None:
+            number = self._keys[key] = len(self.results)
+            self.results.append(
+                ProductResult(event.item, event.action, session)
+            )
+        self.results[number].update(event)
+        return number
+
+    def update_many(self, events: List[Tuple[ProgressEvent, int]]) -> None:
+        """Apply ``(event, session)`` pairs, resetting the model once for
+        a large batch."""
+        if len(events) <= RESET_THRESHOLD:
+            for event, session in events:
+                self.update(event, session)
+            return
+        for event, session in events:
+            self._apply(event, session)
+        self.set_filter()
+
+    def update(self, event: ProgressEvent, session: int = 0) -> None:
+        """Apply an item event of *session* to the row of its product."""
+        number = self._apply(event, session)
+        if number is None:
+            return
+        result = self.results[number]
+        row = self._row_of.get(number)
+        accepted = self._accepts(result)
+        if row is not None and accepted:
+            self.dataChanged.emit(
+                self.index(row, 0), self.index(row, len(COLUMNS) - 1)
+            )
+        elif row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            self._index_rows()
+            self.endRemoveRows()
+        elif accepted:
+            row = len(self._rows)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._rows.append(number)
+            self._row_of[number] = row
+            self.endInsertRows()
+
+    def set_filter(
+        self, text: Optional[str] = None, status: Any = False
+    ) -> None:
+        """Show the rows containing *text* with *status* (``None`` for
+        every status); an omitted argument keeps its current value."""
+        if text is not None:
+            self.filter_text = text.strip().lower()
+        if status is not False:
+            self.filter_status = status
+        self.beginResetModel()
+        self._rows = [
+            n for n, result in enumerate(self.results)
+            if self._accepts(result)
+        ]
+        self._sort_rows()
+        self.endResetModel()
+
+    def move(self, results: List[ProductResult], session: int) -> None:
+        """Hand *results* over to *session*, e.g. the session retrying
+        them: its events then update these rows instead of adding new
+        ones."""
+        for result in results:
+            key = (result.session, result.item, result.action)
+            number = self._keys.get(key)
+            new_key = (session, result.item, result.action)
+            if number is None or new_key in self._keys:
+                continue
+            del self._keys[key]
+            self._keys[new_key] = number
+            result.session = session
+            row = self._row_of.get(number)
+            if row is not None:
+                index = self.index(row, SESSION_COLUMN)
+                self.dataChanged.emit(index, index)
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self.results.clear()
+        self._keys.clear()
+        self._rows.clear()
+        self._row_of.clear()
+        self.endResetModel()
+
+    def result(self, row: int) -> ProductResult:
+        return self.results[self._rows[row]]
+
+    def _accepts(self, result: ProductResult) -> bool:
+        if self.filter_status is not None and (
+            result.status != self.filter_status
+        ):
+            return False
+        if not self.filter_text:
+            return True
+        return any(
+            self.filter_text in result.text(attribute).lower()
+            for _, attribute in COLUMNS
+        )
+
+    def _sort_rows(self) -> None:
+        if 0 <= self.sort_column < len(COLUMNS):
+            key = _sort_key(COLUMNS[self.sort_column][1])
+            self._rows.sort(
+                key=lambda n: key(self.results[n]),
+                reverse=self.sort_order == Qt.DescendingOrder,
+            )
+        else:
+            self._rows.sort()
+        self._index_rows()
+
+    def _index_rows(self) -> None:
+        self._row_of = {number: row for row, number in enumerate(self._rows)}
+
+
+class ResultsView(QWidget):
+    """Filterable table of :class:`ResultsModel` with a retry button.
+
+    ``retry_requested`` sends the failed results among the selected rows.
+    """
+
+    retry_requested = Signal(object)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.model = ResultsModel(self)
+
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Filtrer les produits...")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self._text_changed)
+        self.status_combo = QComboBox()
+        for label, status in STATUSES:
+            self.status_combo.addItem(label, status)
+        self.status_combo.currentIndexChanged.connect(self._status_changed)
+        self.retry_btn = QPushButton("Relancer les échecs sélectionnés")
+        self.retry_btn.clicked.connect(self.retry_selected)
+
+        self.table = QTableView()
+        self.table.setObjectName("id_results_table")
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        rows = self.table.verticalHeader()
+        rows.setVisible(False)
+        # Fixed row height: the hidden rows are never measured.
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self._pending: List[Tuple[ProgressEvent, int]] = []
+
+        filter_line = QHBoxLayout()
+        filter_line.setContentsMargins(0, 0, 0, 0)
+        filter_line.addWidget(self.filter_edit, 1)
+        filter_line.addWidget(self.status_combo)
+        filter_line.addWidget(self.retry_btn)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(filter_line)
+        layout.addWidget(self.table)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(FLUSH_INTERVAL_MS)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def queue(self, event: ProgressEvent, session: int = 0) -> None:
+        """Apply *event* at the next :meth:`flush`."""
+        self._pending.append((event, session))
+
+    def flush(self) -> None:
+        if self._pending:
+            events, self._pending = self._pending, []
+            self.model.update_many(events)
+
+    def _text_changed(self, text: str) -> None:
+        self.model.set_filter(text=text)
+
+    def _status_changed(self) -> None:
+        self.model.set_filter(status=self.status_combo.currentData())
+
+    def selected_results(self) -> List[ProductResult]:
+        selection = self.table.selectionModel().selectedRows()
+        rows = sorted(index.row() for index in selection)
+        return [self.model.result(row) for row in rows]
+
+    def clear(self) -> None:
+        self._pending.clear()
+        self.model.clear()
+
+    def retry_selected(self) -> None:
+        failed = [r for r in self.selected_results() if r.status == FAILED]
+        if failed:
+            self.retry_requested.emit(failed)